@@ -14,6 +14,10 @@ from app.core.config import settings
 from app.db.session import Base
 from app.models.user import User 
 from app.models.task import Task # Importar modelos para registro
+from app.models.task_counter import TaskStatusCounter, TaskListVersion
+from app.models.task_import import TaskImport
+from app.models.revoked_token import RevokedToken
+from app.models.login_throttle import LoginThrottleState
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -33,6 +37,17 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Objetos que existen solo en la base de datos y no en los modelos ORM
+# (la columna generada de búsqueda y su índice GIN, exclusivos de PostgreSQL)
+DB_ONLY_OBJECTS = {"search_vector", "ix_tasks_search_vector"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Evita que autogenerate proponga eliminar los objetos exclusivos de la base de datos."""
+    if reflected and compare_to is None and name in DB_ONLY_OBJECTS:
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -55,6 +70,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -78,7 +94,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
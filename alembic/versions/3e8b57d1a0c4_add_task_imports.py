@@ -0,0 +1,49 @@
+"""add_task_imports
+
+Revision ID: 3e8b57d1a0c4
+Revises: f71d0c3b5e96
+Create Date: 2026-02-02 14:08:46.117529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8b57d1a0c4'
+down_revision: Union[str, Sequence[str], None] = 'f71d0c3b5e96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_imports',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('format', sa.Enum('csv', 'ndjson', name='taskimportformat'), nullable=False),
+    sa.Column('status', sa.Enum('processing', 'completed', 'failed', name='taskimportstatus'), nullable=False),
+    sa.Column('total_rows', sa.Integer(), nullable=False),
+    sa.Column('imported_rows', sa.Integer(), nullable=False),
+    sa.Column('rejected_rows', sa.Integer(), nullable=False),
+    sa.Column('rejected_path', sa.String(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_imports_id'), 'task_imports', ['id'], unique=False)
+    op.create_index(op.f('ix_task_imports_user_id'), 'task_imports', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_task_imports_user_id'), table_name='task_imports')
+    op.drop_index(op.f('ix_task_imports_id'), table_name='task_imports')
+    op.drop_table('task_imports')
+    sa.Enum(name='taskimportstatus').drop(op.get_bind())
+    sa.Enum(name='taskimportformat').drop(op.get_bind())
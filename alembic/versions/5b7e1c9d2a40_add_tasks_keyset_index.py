@@ -0,0 +1,30 @@
+"""add_tasks_keyset_index
+
+Revision ID: 5b7e1c9d2a40
+Revises: 09ca4d2f9fed
+Create Date: 2026-01-12 10:04:31.218377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e1c9d2a40'
+down_revision: Union[str, Sequence[str], None] = '09ca4d2f9fed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Índice compuesto para el listado por propietario ordenado por (created_at, id).
+    # Permite la paginación por cursor (keyset) sin recorrer filas descartadas.
+    op.create_index('ix_tasks_user_id_created_at_id', 'tasks', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_id_created_at_id', table_name='tasks')
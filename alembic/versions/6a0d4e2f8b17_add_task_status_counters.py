@@ -0,0 +1,63 @@
+"""add_task_status_counters
+
+Revision ID: 6a0d4e2f8b17
+Revises: 3e8b57d1a0c4
+Create Date: 2026-02-05 10:31:52.804416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a0d4e2f8b17'
+down_revision: Union[str, Sequence[str], None] = '3e8b57d1a0c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Se amplía la tabla user_task_counters (un contador de tareas activas por usuario)
+    # en lugar de crear otra: pasa a tener una fila por usuario y estado.
+    # Se reutiliza el tipo enumerado 'taskstatus' ya existente en la tabla tasks
+    task_status_enum = postgresql.ENUM('pending', 'in_progress', 'done', 'deleted', name='taskstatus', create_type=False)
+    op.rename_table('user_task_counters', 'task_status_counters')
+    op.execute("ALTER TABLE task_status_counters RENAME CONSTRAINT user_task_counters_pkey TO task_status_counters_pkey")
+    op.execute(
+        "ALTER TABLE task_status_counters "
+        "RENAME CONSTRAINT user_task_counters_user_id_fkey TO task_status_counters_user_id_fkey"
+    )
+    op.alter_column('task_status_counters', 'active_count', new_column_name='count')
+    op.drop_constraint('task_status_counters_pkey', 'task_status_counters', type_='primary')
+    op.add_column('task_status_counters', sa.Column('status', task_status_enum, nullable=True))
+
+    # Recarga por estado a partir de las tareas existentes (incluidas las eliminadas)
+    op.execute("DELETE FROM task_status_counters")
+    op.execute(
+        "INSERT INTO task_status_counters (user_id, status, count) "
+        "SELECT user_id, status, COUNT(*) FROM tasks GROUP BY user_id, status"
+    )
+    op.alter_column('task_status_counters', 'status', nullable=False)
+    op.create_primary_key('task_status_counters_pkey', 'task_status_counters', ['user_id', 'status'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('task_status_counters_pkey', 'task_status_counters', type_='primary')
+    op.drop_column('task_status_counters', 'status')
+    op.execute("DELETE FROM task_status_counters")
+    op.execute(
+        "INSERT INTO task_status_counters (user_id, count) "
+        "SELECT user_id, COUNT(*) FROM tasks WHERE status != 'deleted' GROUP BY user_id"
+    )
+    op.alter_column('task_status_counters', 'count', new_column_name='active_count')
+    op.execute(
+        "ALTER TABLE task_status_counters "
+        "RENAME CONSTRAINT task_status_counters_user_id_fkey TO user_task_counters_user_id_fkey"
+    )
+    op.rename_table('task_status_counters', 'user_task_counters')
+    op.create_primary_key('user_task_counters_pkey', 'user_task_counters', ['user_id'])
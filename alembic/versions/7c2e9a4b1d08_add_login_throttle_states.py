@@ -0,0 +1,37 @@
+"""add_login_throttle_states
+
+Revision ID: 7c2e9a4b1d08
+Revises: 4f1b7d9e2c63
+Create Date: 2026-02-18 09:41:07.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9a4b1d08'
+down_revision: Union[str, Sequence[str], None] = '4f1b7d9e2c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('login_throttle_states',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('failures', sa.JSON(), nullable=False),
+    sa.Column('locked_until', sa.Float(), nullable=False),
+    sa.Column('lockouts', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_login_throttle_states_expires_at'), 'login_throttle_states', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_login_throttle_states_expires_at'), table_name='login_throttle_states')
+    op.drop_table('login_throttle_states')
@@ -0,0 +1,39 @@
+"""add_user_task_counters
+
+Revision ID: 8d3f6a1e7c52
+Revises: 5b7e1c9d2a40
+Create Date: 2026-01-14 16:22:08.540112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f6a1e7c52'
+down_revision: Union[str, Sequence[str], None] = '5b7e1c9d2a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_task_counters',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('active_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Carga inicial del contador a partir de las tareas existentes
+    op.execute(
+        "INSERT INTO user_task_counters (user_id, active_count) "
+        "SELECT user_id, COUNT(*) FROM tasks WHERE status != 'deleted' GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_task_counters')
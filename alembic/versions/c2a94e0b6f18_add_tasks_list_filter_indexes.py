@@ -0,0 +1,50 @@
+"""add_tasks_list_filter_indexes
+
+Revision ID: c2a94e0b6f18
+Revises: 8d3f6a1e7c52
+Create Date: 2026-01-19 11:47:52.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a94e0b6f18'
+down_revision: Union[str, Sequence[str], None] = '8d3f6a1e7c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Índices que respaldan cada combinación de filtros y ordenamiento del listado
+    # (ver TASK_LIST_INDEXES en app/services/task_query.py)
+    op.create_index(
+        'ix_tasks_user_id_modified_at_id', 'tasks',
+        ['user_id', sa.text('coalesce(updated_at, created_at)'), 'id'], unique=False
+    )
+    op.create_index('ix_tasks_user_id_title_id', 'tasks', ['user_id', 'title', 'id'], unique=False)
+    op.create_index(
+        'ix_tasks_user_id_status_created_at_id', 'tasks',
+        ['user_id', 'status', 'created_at', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_tasks_user_id_status_modified_at_id', 'tasks',
+        ['user_id', 'status', sa.text('coalesce(updated_at, created_at)'), 'id'], unique=False
+    )
+    op.create_index(
+        'ix_tasks_user_id_has_description_created_at_id', 'tasks',
+        ['user_id', sa.text('(description IS NOT NULL)'), 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_id_has_description_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_status_modified_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_status_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_title_id', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_modified_at_id', table_name='tasks')
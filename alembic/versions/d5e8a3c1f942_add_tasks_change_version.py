@@ -0,0 +1,32 @@
+"""add_tasks_change_version
+
+Revision ID: d5e8a3c1f942
+Revises: b94c1f7e3a25
+Create Date: 2026-02-12 17:05:39.218764
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e8a3c1f942'
+down_revision: Union[str, Sequence[str], None] = 'b94c1f7e3a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Las tareas existentes quedan en la versión 0: la primera sincronización
+    # (sin token) las devuelve completas
+    op.add_column('tasks', sa.Column('change_version', sa.BigInteger(), nullable=False, server_default='0'))
+    op.create_index('ix_tasks_user_id_change_version_id', 'tasks', ['user_id', 'change_version', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_id_change_version_id', table_name='tasks')
+    op.drop_column('tasks', 'change_version')
@@ -1,65 +1,114 @@
-from typing import Generator
+from typing import AsyncIterator
 from fastapi import Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, AuthSessionLocal
 from app.core.config import settings
 from app.models.user import User
-from app.exceptions.auth import InvalidTokenException, ExpiredTokenException, UserNotFoundException
+from app.schemas.auth import UserPrincipal
+from app.core.enums import PrincipalMode
+from app.core.principal_cache import principal_cache
+from app.core.revocation import revocation_filter
+from app.services.token_revocation import TokenRevocationService
+from app.exceptions.auth import InvalidTokenException, ExpiredTokenException, UserNotFoundException, RevokedTokenException
 
 # Configuración del esquema para autenticación mediante Bearer Token (JWT)
 # Se utiliza HTTPBearer para que Swagger permita ingresar el token directamente
 security = HTTPBearer()
 
-def get_db() -> Generator:
+async def get_db() -> AsyncIterator[AsyncSession]:
     """
-    Inyección de dependencia para obtener una sesión de base de datos.
+    Inyección de dependencia para obtener una sesión de base de datos asíncrona.
     Asegura el cierre de la conexión al finalizar la petición.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    auth: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
+async def get_auth_db() -> AsyncIterator[AsyncSession]:
     """
-    Valida el token JWT y recupera el usuario autenticado de la base de datos.
-    
-    Args:
-        db: Sesión de base de datos.
-        auth: Credenciales de autorización que contienen el token.
-        
-    Returns:
-        Instancia del modelo User si el token es válido.
-        
+    Sesión sobre el pool de autenticación, separado del pool de tareas para que
+    una ráfaga de logins no agote las conexiones del resto de la API (y viceversa).
+    """
+    async with AuthSessionLocal() as db:
+        yield db
+
+async def get_token_claims(auth: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """
+    Verifica la firma y la expiración del token JWT y devuelve sus claims.
+
     Raises:
-        InvalidTokenException: Si el token está mal formado o falta.
+        InvalidTokenException: Si el token está mal formado o no contiene 'sub'.
         ExpiredTokenException: Si el token ha expirado.
-        UserNotFoundException: Si el usuario del token ya no existe.
     """
-    token = auth.credentials
     try:
         # Decodificación y validación del token
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        claims = jwt.decode(
+            auth.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise InvalidTokenException()
     except jwt.ExpiredSignatureError:
         raise ExpiredTokenException()
     except JWTError:
         raise InvalidTokenException()
+    if claims.get("sub") is None:
+        raise InvalidTokenException()
+    return claims
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_auth_db),
+    claims: dict = Depends(get_token_claims)
+) -> UserPrincipal:
+    """
+    Valida el token JWT y recupera el usuario autenticado.
+
+    La revocación se comprueba contra el filtro en memoria y solo sus positivos se
+    confirman en la base de datos. Con AUTH_PRINCIPAL_MODE=claims el usuario se construye
+    desde los claims del token sin consultar la tabla de usuarios; en modo database se lee
+    de la caché de principals y solo se consulta la base de datos cuando no está en caché
+    o su entrada venció. En ambos casos la conexión vuelve al pool sin esperar al fin de
+    la petición.
+    
+    Args:
+        db: Sesión de base de datos.
+        claims: Claims del token verificado.
+        
+    Returns:
+        Identidad (UserPrincipal) del usuario si el token es válido.
         
+    Raises:
+        RevokedTokenException: Si el token o los tokens del usuario fueron revocados.
+        UserNotFoundException: Si el usuario del token ya no existe.
+    """
+    try:
+        user_id = int(claims["sub"])
+    except ValueError:
+        raise InvalidTokenException()
+    jti = claims.get("jti")
+
+    if revocation_filter.might_be_revoked(jti, user_id):
+        revoked = await TokenRevocationService.is_revoked(db, jti, user_id)
+        await db.close()
+        if revoked:
+            revocation_filter.confirmed += 1
+            raise RevokedTokenException()
+
+    # Los tokens emitidos antes de incluir los claims del usuario se resuelven en la base de datos
+    if settings.AUTH_PRINCIPAL_MODE == PrincipalMode.CLAIMS and "email" in claims:
+        return UserPrincipal(id=user_id, email=claims["email"], full_name=claims.get("name"))
+
     # Recuperación del usuario a partir del ID (sub) almacenado en el token
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    snapshot = principal_cache.snapshot()
+    user = await db.get(User, user_id)
+    # La conexión vuelve al pool de autenticación sin esperar al fin de la petición
+    await db.close()
     if not user:
         raise UserNotFoundException()
-        
-    return user
+
+    principal = UserPrincipal.model_validate(user)
+    principal_cache.set(user_id, principal, snapshot)
+    return principal
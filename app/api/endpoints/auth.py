@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.schemas.auth import LoginRequest, TokenResponse, CustomResponse, ErrorResponse
+from app.schemas.auth import LoginRequest, TokenResponse, CustomResponse, ErrorResponse, UserPrincipal
 from app.services.auth import authenticate_user
+from app.services.token_revocation import TokenRevocationService
+from app.exceptions.auth import InvalidTokenException
 from app.core.logging import logger
 
 router = APIRouter()
@@ -14,16 +17,22 @@ router = APIRouter()
     responses={
         400: {"model": ErrorResponse, "description": "Contraseña inválida"},
         404: {"model": ErrorResponse, "description": "Usuario no encontrado"},
+        429: {
+            "model": ErrorResponse,
+            "description": "Email o IP bloqueados por intentos fallidos, o cola de verificación llena (ver Retry-After)"
+        },
+        503: {"model": ErrorResponse, "description": "Verificación de contraseña no iniciada a tiempo (ver Retry-After)"},
     },
     summary="Iniciar sesión",
     description="Autentica a un usuario con email y contraseña, devolviendo un token JWT de acceso."
 )
-def login(
+async def login(
     login_data: LoginRequest,
-    db: Session = Depends(deps.get_db)
+    request: Request,
+    db: AsyncSession = Depends(deps.get_auth_db)
 ):
     logger.info("Intento de inicio de sesión", email=login_data.email)
-    access_token = authenticate_user(db, login_data.email, login_data.password)
+    access_token = await authenticate_user(db, login_data.email, login_data.password, request.client.host)
     logger.info("Login exitoso", email=login_data.email)
     
     return CustomResponse(
@@ -35,3 +44,37 @@ def login(
             token_type="bearer"
         )
     )
+
+@router.post(
+    "/logout",
+    response_model=CustomResponse[None],
+    status_code=status.HTTP_200_OK,
+    responses={
+        401: {"model": ErrorResponse, "description": "Token inválido, expirado o ya revocado"},
+    },
+    summary="Cerrar sesión",
+    description=(
+        "Revoca el token de acceso utilizado en la petición hasta su expiración. La revocación es inmediata "
+        "en todos los workers con AUTH_CACHE_INVALIDATION_BACKEND=postgres; con el backend memory y varios "
+        "workers, los demás la aplican en su siguiente refresco (AUTH_REVOCATION_REFRESH_SECONDS)."
+    )
+)
+async def logout(
+    current_user: UserPrincipal = Depends(deps.get_current_user),
+    claims: dict = Depends(deps.get_token_claims),
+    db: AsyncSession = Depends(deps.get_auth_db)
+):
+    jti = claims.get("jti")
+    if jti is None:
+        # Tokens emitidos antes de incluir el identificador único
+        raise InvalidTokenException(detail="El token no admite revocación")
+    expires_at = datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+    await TokenRevocationService.revoke_token(db, jti, current_user.id, expires_at)
+    logger.info("Logout exitoso", user_id=current_user.id)
+
+    return CustomResponse(
+        success=True,
+        code=200,
+        message="Sesión cerrada",
+        data=None
+    )
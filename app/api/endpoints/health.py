@@ -1,7 +1,13 @@
+from typing import Any, Optional
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.db.session import get_db
+from app.db.session import ENGINES, get_db
+from app.db.pool import pool_status
+from app.core.principal_cache import principal_cache
+from app.core.revocation import revocation_filter
+from app.core.hashing import password_executor
+from app.core import logging as app_logging
 from pydantic import BaseModel
 import time
 
@@ -11,22 +17,38 @@ class HealthCheckResponse(BaseModel):
     status: str
     checks: dict[str, str]
     response_time_ms: int
+    # Estado de cada pool de conexiones: ocupación actual, timeouts e histograma de espera
+    pools: dict[str, dict[str, Any]]
+    # Métricas de las cachés en proceso (aciertos, fallos, desalojos e invalidaciones)
+    caches: dict[str, dict[str, Any]]
+    # Ocupación del filtro de revocación de tokens y sus positivos (confirmados o no)
+    revocation: dict[str, Any]
+    # Executors dedicados (ej. hashing de contraseñas): ocupación, rechazos y espera en cola
+    executors: dict[str, dict[str, Any]]
+    # Sink de logs: eventos en cola, escritos y descartados (buffer lleno, muestreo o límite por clave)
+    logging: Optional[dict[str, Any]]
 
 @router.get(
     "/",
     summary="Estado de salud del sistema",
-    description="Realiza una verificación técnica para asegurar que la API y sus dependencias (base de datos) están operativas.",
+    description=(
+        "Realiza una verificación técnica para asegurar que la API y sus dependencias (base de datos) están operativas. "
+        "Incluye las estadísticas de los pools de conexiones (conexiones en uso, overflow, timeouts y "
+        "histograma acumulado del tiempo de espera por una conexión, en milisegundos) y las métricas "
+        "de la caché de usuarios autenticados, del filtro de revocación de tokens, del executor de "
+        "hashing de contraseñas y del sink de logs."
+    ),
     tags=["Salud"],
     response_model=HealthCheckResponse
 )
-def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     checks = {}
     overall_status = "UP"
     start_time = time.time()
 
     # Verificación de conexión con la base de datos
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         checks["database"] = "UP"
     except Exception as e:
         checks["database"] = f"DOWN: {str(e)}"
@@ -37,5 +59,10 @@ def health_check(db: Session = Depends(get_db)):
     return {
         "status": overall_status,
         "checks": checks,
-        "response_time_ms": response_time_ms
+        "response_time_ms": response_time_ms,
+        "pools": {name: pool_status(pooled_engine) for name, pooled_engine in ENGINES.items()},
+        "caches": {"principal": principal_cache.stats()},
+        "revocation": revocation_filter.stats(),
+        "executors": {"password_hash": password_executor.status()},
+        "logging": app_logging.logging_stats()
     }
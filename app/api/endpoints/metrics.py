@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Response
+from app.core.metrics import registry
+
+router = APIRouter()
+
+# Tipo de contenido del formato de exposición de texto de Prometheus
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(
+    "",
+    summary="Métricas de la aplicación",
+    description=(
+        "Expone en formato de texto de Prometheus las peticiones HTTP por plantilla de ruta y código "
+        "de estado, los histogramas de latencia, las consultas a la base de datos por petición y la "
+        "ocupación de los pools de conexiones, del threadpool y del executor de hashing."
+    ),
+    tags=["Salud"],
+    response_class=Response
+)
+async def metrics():
+    return Response(content=registry.render(), media_type=METRICS_MEDIA_TYPE)
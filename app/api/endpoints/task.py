@@ -1,12 +1,25 @@
-from fastapi import APIRouter, Depends, status, Request, Response
-from sqlalchemy.orm import Session
+from typing import Any, Optional
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, Header, Query, status, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.schemas.task import TaskCreateDTO, TaskResponseDTO, TaskUpdateDTO
+from app.api.responses import json_response, representation_etag, resource_etags
+from app.schemas.task import (
+    TaskCreateDTO, TaskResponseDTO, TaskUpdateDTO, TaskFilterDTO,
+    TaskBulkCreateResponseDTO, TaskBulkSelectionDTO, TaskBulkUpdateDTO, TaskBulkResultDTO,
+    TaskImportResponseDTO, TaskSummaryDTO, TaskChangesDTO
+)
 from app.schemas.pagination import PaginatedResponse
 from app.schemas.auth import CustomResponse, ErrorResponse
 from app.services.task import TaskService
+from app.services.task_import import TaskImportService
 from app.mappers.task import TaskMapper
 from app.core.logging import logger
+from app.db.session import AsyncSessionLocal
+from app.core.enums import CountStrategy, TaskStatus, TaskImportFormat
+from app.core.utils import etag_matches
+from app.exceptions.task import UnsupportedTaskQueryException
 
 router = APIRouter()
 
@@ -21,6 +34,14 @@ OWNERSHIP_RESPONSES = {
     404: {"model": ErrorResponse, "description": "Tarea no encontrada"},
 }
 
+NOT_MODIFIED_RESPONSE = {
+    304: {"description": "Sin cambios - El ETag enviado en If-None-Match sigue vigente"},
+}
+
+def not_modified(etag: str) -> Response:
+    """Respuesta 304 sin cuerpo que conserva el ETag vigente (y, como la 200, varía según Accept)."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Vary": "Accept"})
+
 @router.post(
     "/", 
     response_model=CustomResponse[TaskResponseDTO], 
@@ -32,103 +53,410 @@ OWNERSHIP_RESPONSES = {
     summary="Crear una nueva tarea",
     description="Crea una tarea asociada al usuario autenticado. Devuelve la tarea creada y establece la cabecera 'Location'."
 )
-def create_task(
+async def create_task(
     task_dto: TaskCreateDTO,
     request: Request,
     response: Response,
-    db: Session = Depends(deps.get_db),
-    current_user: deps.User = Depends(deps.get_current_user)
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
 ):
-    logger.info("Petición para crear tarea", user_id=current_user.id, title=task_dto.title)
-    new_task_entity = TaskService.create_task(db, task_dto, current_user.id)
-    response_dto = TaskMapper.to_dto(new_task_entity)
+    response_dto = await TaskService.create_task(db, task_dto, current_user.id)
 
     response.headers["Location"] = str(
         request.url_for("get_task_by_id", task_id=response_dto.id)
     )
 
-    return CustomResponse(
-        success=True,
-        code=201,
-        message="Tarea creada exitosamente",
-        data=response_dto
+    return json_response(
+        request, response_dto, TaskResponseDTO,
+        "Tarea creada exitosamente", code=201, headers=response.headers
+    )
+
+@router.post(
+    "/bulk",
+    response_model=CustomResponse[TaskBulkCreateResponseDTO],
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        **AUTH_RESPONSES,
+        400: {"model": ErrorResponse, "description": "Se superó el máximo de tareas por petición o falló la inserción"},
+    },
+    summary="Crear tareas de forma masiva",
+    description=(
+        "Crea varias tareas del usuario autenticado en una sola transacción. Cada elemento se valida "
+        "por separado: los válidos se insertan y los inválidos se devuelven en `errors` con su posición."
+    )
+)
+async def bulk_create_tasks(
+    request: Request,
+    items: list[Any] = Body(...),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
+):
+    result = await TaskService.bulk_create_tasks(db, items, current_user.id)
+
+    return json_response(
+        request, result, TaskBulkCreateResponseDTO,
+        f"Tareas creadas: {len(result.created)}, rechazadas: {len(result.errors)}", code=201
+    )
+
+@router.patch(
+    "/bulk",
+    response_model=CustomResponse[TaskBulkResultDTO],
+    responses={
+        **AUTH_RESPONSES,
+        400: {"model": ErrorResponse, "description": "Demasiados ids o filtro no soportado"},
+    },
+    summary="Actualizar tareas de forma masiva",
+    description=(
+        "Aplica los mismos cambios (título, descripción y/o estado) a una lista de ids o a todas las tareas "
+        "que coinciden con un filtro, en una sola sentencia. Los ids inexistentes o ajenos se devuelven en `missing_ids`."
+    )
+)
+async def bulk_update_tasks(
+    bulk_dto: TaskBulkUpdateDTO,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
+):
+    result = await TaskService.bulk_update_tasks(db, bulk_dto, current_user.id)
+
+    return json_response(
+        request, result, TaskBulkResultDTO,
+        "Tareas actualizadas exitosamente"
+    )
+
+@router.post(
+    "/bulk/delete",
+    response_model=CustomResponse[TaskBulkResultDTO],
+    responses={
+        **AUTH_RESPONSES,
+        400: {"model": ErrorResponse, "description": "Demasiados ids o filtro no soportado"},
+    },
+    summary="Eliminar tareas de forma masiva",
+    description=(
+        "Realiza el borrado lógico (soft-delete) de una lista de ids o de todas las tareas que coinciden con un filtro, "
+        "en una sola sentencia. Los ids inexistentes o ajenos se devuelven en `missing_ids`."
+    )
+)
+async def bulk_delete_tasks(
+    selection: TaskBulkSelectionDTO,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
+):
+    result = await TaskService.bulk_delete_tasks(db, selection, current_user.id)
+
+    return json_response(
+        request, result, TaskBulkResultDTO,
+        "Tareas eliminadas exitosamente"
+    )
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        **AUTH_RESPONSES,
+        200: {"content": {"application/x-ndjson": {}}, "description": "Una tarea por línea en formato JSON"},
+    },
+    summary="Exportar tareas",
+    description=(
+        "Exporta todas las tareas del usuario autenticado en formato NDJSON mediante una respuesta en streaming. "
+        "No incluye tareas eliminadas suavemente (soft-delete) ni está limitada por el tamaño de página."
+    )
+)
+async def export_tasks(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
+):
+    return StreamingResponse(
+        TaskService.export_tasks(db, current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="tasks.ndjson"'}
+    )
+
+@router.get(
+    "/summary",
+    response_model=CustomResponse[TaskSummaryDTO],
+    responses=AUTH_RESPONSES,
+    summary="Resumen de tareas por estado",
+    description=(
+        "Devuelve la cantidad de tareas del usuario autenticado en cada estado (pending, in_progress, done) "
+        "y su total, sin incluir las eliminadas. Se obtiene de contadores mantenidos en cada escritura."
+    )
+)
+async def get_tasks_summary(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
+):
+    summary_dto = await TaskService.get_summary(db, current_user.id)
+
+    return json_response(
+        request, summary_dto, TaskSummaryDTO,
+        "Resumen de tareas obtenido exitosamente"
+    )
+
+@router.get(
+    "/changes",
+    response_model=CustomResponse[TaskChangesDTO],
+    responses={
+        **AUTH_RESPONSES,
+        400: {"model": ErrorResponse, "description": "Token de sincronización inválido"},
+    },
+    summary="Sincronizar cambios de tareas",
+    description=(
+        "Devuelve las tareas del usuario creadas o modificadas desde el token `since` y, como tombstones, "
+        "las que fueron eliminadas. Sin `since` se devuelve el estado completo. La respuesta incluye "
+        "`sync_token` para la siguiente llamada; si `has_more` es verdadero quedan cambios por descargar."
+    )
+)
+async def get_task_changes(
+    request: Request,
+    since: Optional[str] = None,
+    page_size: int = 100,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
+):
+    changes = await TaskService.get_changes(db, current_user.id, since, page_size)
+
+    return json_response(
+        request, changes, TaskChangesDTO,
+        "Cambios de tareas obtenidos exitosamente"
+    )
+
+IMPORT_RESPONSES = {
+    **AUTH_RESPONSES,
+    403: {"model": ErrorResponse, "description": "Acceso denegado - El usuario no es el propietario de la importación"},
+    404: {"model": ErrorResponse, "description": "Importación no encontrada"},
+}
+
+@router.post(
+    "/imports",
+    response_model=CustomResponse[TaskImportResponseDTO],
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        **AUTH_RESPONSES,
+        413: {"model": ErrorResponse, "description": "El archivo supera el tamaño máximo permitido"},
+    },
+    summary="Importar tareas desde un archivo",
+    description=(
+        "Importa tareas del usuario autenticado desde el cuerpo de la petición, en CSV (cabecera con "
+        "`title`, `description`, `status`) o NDJSON (un objeto por línea), según el parámetro `format`. "
+        "El archivo se recibe (hasta un tamaño máximo; si se supera se responde 413) y la importación se "
+        "procesa en segundo plano: se responde 202 con la importación en curso y su ubicación en `Location`. "
+        "Las filas se validan y cargan por lotes; el progreso puede consultarse en `/imports/{import_id}` "
+        "y las filas rechazadas se descargan en `/imports/{import_id}/rejected`."
+    )
+)
+async def import_tasks(
+    request: Request,
+    response: Response,
+    format: TaskImportFormat,
+    background_tasks: BackgroundTasks,
+    content_length: Optional[int] = Header(None),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
+):
+    # El archivo se recibe antes de registrar la importación: un cuerpo que supera el
+    # máximo no deja importaciones huérfanas ni ocupa una conexión mientras llega
+    upload = await TaskImportService.receive_upload(request.stream(), content_length)
+    try:
+        job = await TaskImportService.create_import(db, current_user.id, format)
+    except BaseException:
+        upload.close()
+        raise
+    background_tasks.add_task(TaskImportService.run_import_in_background, AsyncSessionLocal, job.id, upload)
+    response.headers["Location"] = str(request.url_for("get_task_import", import_id=job.id))
+
+    return json_response(
+        request, TaskImportResponseDTO.model_validate(job), TaskImportResponseDTO,
+        "Importación aceptada; se procesa en segundo plano", code=202, headers=response.headers
+    )
+
+@router.get(
+    "/imports/{import_id}",
+    response_model=CustomResponse[TaskImportResponseDTO],
+    name="get_task_import",
+    responses=IMPORT_RESPONSES,
+    summary="Consultar una importación",
+    description="Devuelve el estado y el progreso (filas leídas, importadas y rechazadas) de una importación del usuario."
+)
+async def get_task_import(
+    import_id: int,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
+):
+    logger.info("Petición para consultar importación", user_id=current_user.id, import_id=import_id)
+    job = await TaskImportService.get_import(db, import_id, current_user.id)
+
+    return json_response(
+        request, TaskImportResponseDTO.model_validate(job), TaskImportResponseDTO,
+        "Importación obtenida exitosamente"
+    )
+
+@router.get(
+    "/imports/{import_id}/rejected",
+    response_class=FileResponse,
+    responses={
+        **IMPORT_RESPONSES,
+        200: {"content": {"application/x-ndjson": {}}, "description": "Una fila rechazada por línea con sus errores"},
+    },
+    summary="Descargar filas rechazadas",
+    description="Descarga en NDJSON las filas rechazadas de una importación, con su número de línea y los errores de validación."
+)
+async def get_task_import_rejected(
+    import_id: int,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
+):
+    logger.info("Petición para descargar filas rechazadas", user_id=current_user.id, import_id=import_id)
+    path = await TaskImportService.get_rejected_path(db, import_id, current_user.id)
+    return FileResponse(
+        path,
+        media_type="application/x-ndjson",
+        filename=f"import_{import_id}_rejected.ndjson"
     )
 
 @router.get(
     "/{task_id}", 
     response_model=CustomResponse[TaskResponseDTO], 
     name="get_task_by_id",
-    responses=OWNERSHIP_RESPONSES,
+    responses={**OWNERSHIP_RESPONSES, **NOT_MODIFIED_RESPONSE},
     summary="Obtener una tarea",
-    description="Recupera los detalles de una tarea específica si el usuario autenticado es su propietario."
+    description=(
+        "Recupera los detalles de una tarea específica si el usuario autenticado es su propietario. "
+        "La respuesta incluye un ETag; si se reenvía en `If-None-Match` y la tarea no cambió, se responde 304 sin cuerpo."
+    )
 )
-def get_task(
+async def get_task(
     task_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: deps.User = Depends(deps.get_current_user)
+    request: Request,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
 ):
-    logger.info("Petición para obtener tarea", user_id=current_user.id, task_id=task_id)
-    task_entity = TaskService.get_task_by_id(db, task_id, current_user.id)
+    task_entity = await TaskService.get_task_by_id(db, task_id, current_user.id)
+    etag = representation_etag(request, TaskService.task_etag(task_entity))
+    if etag_matches(if_none_match, etag, weak=True):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
     response_dto = TaskMapper.to_dto(task_entity)
     
-    return CustomResponse(
-        success=True,
-        code=200,
-        message="Tarea obtenida exitosamente",
-        data=response_dto
+    return json_response(
+        request, response_dto, TaskResponseDTO,
+        "Tarea obtenida exitosamente", headers=response.headers
     )
 
 @router.get(
     "/", 
     response_model=CustomResponse[PaginatedResponse[TaskResponseDTO]],
-    responses=AUTH_RESPONSES,
+    responses={
+        **AUTH_RESPONSES,
+        **NOT_MODIFIED_RESPONSE,
+        400: {"model": ErrorResponse, "description": "Cursor inválido o combinación de filtros/ordenamiento no soportada"},
+    },
     summary="Listar tareas",
-    description="Lista las tareas del usuario autenticado de forma paginada. No incluye tareas eliminadas suavemente (soft-delete)."
+    description=(
+        "Lista las tareas del usuario autenticado de forma paginada. No incluye tareas eliminadas suavemente (soft-delete). "
+        "Admite paginación por número de página (`page`) o por cursor: cada respuesta incluye `next_cursor`, "
+        "que puede reenviarse en el parámetro `cursor` para obtener la página siguiente con latencia constante. "
+        "El parámetro `count` permite elegir cómo se calcula el total (exact, window, counter, estimate o none). "
+        "Se puede filtrar por estado, rangos de creación/actualización y presencia de descripción, y ordenar con "
+        "`sort` por `created_at`, `updated_at`, `title` o `status` (prefijo `-` para descendente, varias claves "
+        "separadas por comas). Las combinaciones sin un índice que las respalde se rechazan con 400. "
+        "Con `q` se realiza una búsqueda de texto completo en título y descripción (español e inglés), "
+        "con resultados ordenados por relevancia. "
+        "La respuesta incluye un ETag que cambia con cualquier escritura sobre las tareas del usuario; "
+        "si se reenvía en `If-None-Match` y no hubo cambios, se responde 304 sin ejecutar el listado."
+    )
 )
-def list_tasks(
+async def list_tasks(
+    request: Request,
+    response: Response,
     page: int = 1,
     page_size: int = 10,
-    db: Session = Depends(deps.get_db),
-    current_user: deps.User = Depends(deps.get_current_user)
+    cursor: Optional[str] = None,
+    count: Optional[CountStrategy] = None,
+    task_status: Optional[list[TaskStatus]] = Query(None, alias="status"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    updated_from: Optional[datetime] = None,
+    updated_to: Optional[datetime] = None,
+    has_description: Optional[bool] = None,
+    sort: Optional[str] = None,
+    q: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
 ):
-    logger.info("Petición para listar tareas", user_id=current_user.id, page=page, page_size=page_size)
-    paginated_response = TaskService.list_tasks(db, page, page_size, current_user.id)
+    etag = representation_etag(request, await TaskService.list_etag(db, current_user.id, request.query_params.multi_items()))
+    if etag_matches(if_none_match, etag, weak=True):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    filters = TaskFilterDTO(
+        status=task_status,
+        created_from=created_from,
+        created_to=created_to,
+        updated_from=updated_from,
+        updated_to=updated_to,
+        has_description=has_description
+    )
+    if q is not None:
+        if sort is not None:
+            raise UnsupportedTaskQueryException("Las búsquedas se ordenan por relevancia y no admiten el parámetro sort")
+        paginated_response = await TaskService.search_tasks(
+            db, q, page, page_size, current_user.id,
+            cursor=cursor, count_strategy=count, filters=filters
+        )
+    else:
+        paginated_response = await TaskService.list_tasks(
+            db, page, page_size, current_user.id,
+            cursor=cursor, count_strategy=count, filters=filters, sort=sort
+        )
     
-    return CustomResponse(
-        success=True,
-        code=200,
-        message="Tareas listadas exitosamente",
-        data=paginated_response
+    return json_response(
+        request, paginated_response, PaginatedResponse[TaskResponseDTO],
+        "Tareas listadas exitosamente", headers=response.headers
     )
 
 @router.put(
     "/{task_id}", 
     response_model=CustomResponse[TaskResponseDTO],
-    responses=OWNERSHIP_RESPONSES,
+    responses={
+        **OWNERSHIP_RESPONSES,
+        412: {"model": ErrorResponse, "description": "El ETag de If-Match no corresponde a la versión actual de la tarea"},
+    },
     summary="Actualizar una tarea",
-    description="Modifica una tarea existente. Solo el propietario puede realizar esta acción."
+    description=(
+        "Modifica una tarea existente. Solo el propietario puede realizar esta acción. "
+        "Si se envía `If-Match` con el ETag obtenido previamente, la actualización se rechaza con 412 "
+        "cuando la tarea fue modificada entretanto."
+    )
 )
-def update_task(
+async def update_task(
     task_id: int,
     update_dto: TaskUpdateDTO, 
     request: Request,
     response: Response,
-    db: Session = Depends(deps.get_db),
-    current_user: deps.User = Depends(deps.get_current_user)
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
 ):
-    logger.info("Petición para actualizar tarea", user_id=current_user.id, task_id=task_id)
-    updated_task = TaskService.update_task(db, task_id, update_dto, current_user.id)
-    response_dto = TaskMapper.to_dto(updated_task)
+    response_dto = await TaskService.update_task(
+        db, task_id, update_dto, current_user.id, if_match=resource_etags(if_match)
+    )
+    response.headers["ETag"] = representation_etag(request, TaskService.task_etag(response_dto))
 
     response.headers["Location"] = str(
         request.url_for("get_task_by_id", task_id=response_dto.id)
     )
     
-    return CustomResponse(
-        success=True,
-        code=200,
-        message="Tarea actualizada exitosamente",
-        data=response_dto
+    return json_response(
+        request, response_dto, TaskResponseDTO,
+        "Tarea actualizada exitosamente", headers=response.headers
     )
 
 @router.delete(
@@ -138,17 +466,15 @@ def update_task(
     summary="Eliminar una tarea",
     description="Realiza un borrado lógico (soft-delete) de una tarea. Solo el propietario puede eliminarla."
 )
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: deps.User = Depends(deps.get_current_user)
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: deps.UserPrincipal = Depends(deps.get_current_user)
 ):
-    logger.info("Petición para eliminar tarea", user_id=current_user.id, task_id=task_id)
-    TaskService.delete_task(db, task_id, current_user.id)
-
-    return CustomResponse(
-        success=True,
-        code=200,
-        message="Tarea eliminada exitosamente",
-        data=None
+    await TaskService.delete_task(db, task_id, current_user.id)
+
+    return json_response(
+        request, None, None,
+        "Tarea eliminada exitosamente"
     )
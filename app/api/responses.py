@@ -0,0 +1,100 @@
+from dataclasses import is_dataclass
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+import orjson
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from app.core.utils import dump_json_bytes
+
+"""
+Serialización directa de las respuestas JSON.
+
+Al devolver un modelo `CustomResponse`, FastAPI lo vuelca a un diccionario, lo valida de
+nuevo contra `response_model` y lo codifica con el módulo json de la biblioteca estándar.
+Los DTO de los servicios ya están validados, de modo que aquí se serializan una sola vez
+a bytes con el serializador de Pydantic (TypeAdapter.dump_json) y se devuelven como
+`Response`, sin segunda validación. Los modelos de lectura (dataclasses como
+`PaginatedRead[TaskReadModel]`) se serializan directamente con orjson. El
+`response_model` de cada ruta se conserva para la documentación OpenAPI.
+
+Con `Accept: application/vnd.logika.lean+json` el cuerpo es solo `data`, sin el sobre
+`success/code/message` (el código ya viaja en el estado HTTP). Al ser otra representación
+lleva su propio ETag (`representation_etag`), de modo que una revalidación nunca
+confunde una con la otra.
+"""
+
+JSON_MEDIA_TYPE = "application/json"
+LEAN_MEDIA_TYPE = "application/vnd.logika.lean+json"
+
+# Sufijo del ETag de la representación lean (el del sobre es el ETag del recurso)
+LEAN_ETAG_SUFFIX = "-lean"
+
+
+@lru_cache(maxsize=None)
+def _adapter(data_type: Any) -> TypeAdapter:
+    return TypeAdapter(data_type)
+
+
+def wants_lean(request: Request) -> bool:
+    """Indica si el cliente pidió el perfil sin sobre en la cabecera Accept."""
+    accept = request.headers.get("accept")
+    if not accept:
+        return False
+    return any(part.split(";", 1)[0].strip() == LEAN_MEDIA_TYPE for part in accept.split(","))
+
+
+def representation_etag(request: Request, etag: str) -> str:
+    """ETag de la representación negociada: el del recurso, con sufijo en el perfil lean."""
+    if not wants_lean(request):
+        return etag
+    return etag[:-1] + LEAN_ETAG_SUFFIX + '"'
+
+
+def resource_etags(header: Optional[str]) -> Optional[str]:
+    """
+    Cabecera If-Match con los ETags de cualquier representación traducidos al del recurso:
+    ambas identifican la misma versión de la tarea.
+    """
+    if header is None:
+        return None
+    return header.replace(LEAN_ETAG_SUFFIX + '"', '"')
+
+
+def render_json(data: Any, data_type: Any) -> bytes:
+    """Serializa `data` (ya validado como `data_type`, o un modelo de lectura) a JSON sin volver a validarlo."""
+    if data is None:
+        return b"null"
+    if is_dataclass(data):
+        return dump_json_bytes(data)
+    return _adapter(data_type).dump_json(data)
+
+
+def json_response(
+    request: Request,
+    data: Any,
+    data_type: Any,
+    message: str,
+    code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """
+    Construye la respuesta exitosa estándar (o solo `data` con el perfil lean).
+
+    Args:
+        request: Petición en curso (se consulta la cabecera Accept).
+        data: DTO o valor a devolver en `data`.
+        data_type: Tipo declarado de `data` (ej. `PaginatedResponse[TaskResponseDTO]`).
+        message: Mensaje descriptivo del sobre.
+        code: Código HTTP de la respuesta.
+        headers: Cabeceras adicionales (ej. las asignadas al `Response` inyectado).
+    """
+    body = render_json(data, data_type)
+    if wants_lean(request):
+        media_type = LEAN_MEDIA_TYPE
+    else:
+        media_type = JSON_MEDIA_TYPE
+        body = b'{"success":true,"code":%d,"message":%s,"data":%s}' % (code, orjson.dumps(message), body)
+    response = Response(content=body, status_code=code, media_type=media_type, headers=headers)
+    # La representación depende de Accept: las cachés deben distinguirlas
+    response.headers["Vary"] = "Accept"
+    return response
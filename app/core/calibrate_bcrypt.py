@@ -0,0 +1,23 @@
+import argparse
+from app.core.config import settings
+from app.core.logging import configure_logger
+from app.core.security import calibrate_bcrypt_rounds
+
+"""
+Calibración del coste de bcrypt en la máquina actual.
+
+Mide el tiempo de un hash con costes crecientes y sugiere el mayor que no supera el
+objetivo de latencia, para fijarlo en BCRYPT_ROUNDS en todos los workers. Uso:
+
+    python -m app.core.calibrate_bcrypt [--target-ms MS]
+"""
+
+if __name__ == "__main__":
+    configure_logger()
+    parser = argparse.ArgumentParser(description="Sugiere el coste de bcrypt para un objetivo de latencia.")
+    parser.add_argument(
+        "--target-ms", type=float, default=settings.BCRYPT_TARGET_MS,
+        help="Milisegundos máximos por hash (por defecto BCRYPT_TARGET_MS)"
+    )
+    args = parser.parse_args()
+    print(f"BCRYPT_ROUNDS={calibrate_bcrypt_rounds(args.target_ms)}")
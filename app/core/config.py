@@ -1,7 +1,10 @@
+import os
+import tempfile
 from typing import Optional, Any
 from pydantic import ValidationError, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from app.core.logging import logger
+from app.core.enums import CountStrategy, CacheInvalidationBackend, PrincipalMode, ThrottleStoreBackend
 
 class Settings(BaseSettings):
     """
@@ -19,12 +22,126 @@ class Settings(BaseSettings):
     DB_NAME: str
     DB_PORT: str
     DATABASE_URL: Optional[str] = None
-    
+
+    # Pool de conexiones del tráfico de tareas: conexiones base, adicionales en ráfagas,
+    # segundos de espera por una conexión libre, segundos de vida de cada conexión,
+    # verificación previa al uso y apertura anticipada durante el arranque
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_PREWARM: bool = True
+
+    # Pool separado para la autenticación (comparte timeout, reciclado y pre-ping)
+    DB_AUTH_POOL_SIZE: int = 5
+    DB_AUTH_MAX_OVERFLOW: int = 5
+
+    # Vigilancia de consultas: milisegundos a partir de los cuales una sentencia se
+    # registra como lenta, repeticiones de una misma sentencia en una petición que se
+    # señalan como posible N+1 y presupuesto de consultas por petición (None: sin límite),
+    # que con DB_QUERY_BUDGET_ENFORCE (pruebas) hace fallar la petición en lugar de advertir
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+    DB_QUERY_BUDGET: Optional[int] = None
+    DB_QUERY_BUDGET_ENFORCE: bool = False
+
     # Configuración de Seguridad JWT
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Caché en proceso del usuario autenticado (evita una consulta por petición):
+    # segundos de vigencia de cada entrada, cantidad máxima de usuarios (LRU) y
+    # mecanismo con el que las invalidaciones llegan a todos los workers
+    AUTH_CACHE_TTL_SECONDS: float = 60.0
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CACHE_INVALIDATION_BACKEND: CacheInvalidationBackend = CacheInvalidationBackend.MEMORY
+
+    # Conexión LISTEN del backend postgres: segundos entre comprobaciones de salud y
+    # espera máxima entre reintentos de reconexión (la caché se vacía al reconectar)
+    AUTH_CACHE_LISTEN_HEALTH_CHECK_SECONDS: float = 30.0
+    AUTH_CACHE_LISTEN_RECONNECT_MAX_SECONDS: float = 30.0
+
+    # Origen del usuario autenticado (base de datos o claims del token) y filtro de
+    # revocación: segundos entre reconstrucciones desde la tabla de tokens revocados
+    # y tasa de falsos positivos del filtro de Bloom (se confirman en la base de datos)
+    AUTH_PRINCIPAL_MODE: PrincipalMode = PrincipalMode.DATABASE
+    AUTH_REVOCATION_REFRESH_SECONDS: float = 30.0
+    AUTH_REVOCATION_FALSE_POSITIVE_RATE: float = 0.001
+
+    # Executor dedicado al hashing de contraseñas (bcrypt): hilos, tareas admitidas en
+    # cola antes de rechazar con 429 y segundos máximos de espera en cola (503)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 2.0
+
+    # Coste de bcrypt: BCRYPT_ROUNDS fija el factor de trabajo (ej. el sugerido por
+    # `python -m app.core.calibrate_bcrypt`); sin él y con BCRYPT_CALIBRATE_ON_STARTUP se
+    # calibra al arrancar para no superar BCRYPT_TARGET_MS por hash. Con varios workers
+    # conviene fijarlo para que todos usen el mismo coste. Los hashes con otro coste se
+    # recalculan en el siguiente login correcto
+    BCRYPT_ROUNDS: Optional[int] = None
+    BCRYPT_TARGET_MS: float = 250.0
+    BCRYPT_CALIBRATE_ON_STARTUP: bool = False
+
+    # Sink de logs: eventos en buffer antes de descartar (y contabilizar) los nuevos,
+    # líneas por escritura en stdout y espera máxima antes de escribir un lote incompleto
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 256
+    LOG_FLUSH_INTERVAL_SECONDS: float = 0.2
+
+    # Muestreo de logs: probabilidad de conservar cada evento según su mensaje (JSON en
+    # la variable de entorno, ej. {"Tareas listadas desde el servicio": 0.1}) y la del resto.
+    # Límite por clave: eventos admitidos por combinación de LOG_RATE_LIMIT_KEY_FIELDS en
+    # cada ventana (0 lo desactiva). Nunca se descartan los eventos de nivel
+    # LOG_ALWAYS_KEEP_LEVEL o superior ni los que superan LOG_SLOW_REQUEST_MS (las
+    # peticiones más lentas se registran además como advertencia con su duración completa)
+    LOG_SAMPLE_RATES: dict[str, float] = {
+        "Tareas listadas desde el servicio": 0.1,
+        "Búsqueda de tareas desde el servicio": 0.1,
+        "Tarea obtenida exitosamente en el servicio": 0.1,
+    }
+    LOG_SAMPLE_DEFAULT_RATE: float = 1.0
+    LOG_RATE_LIMIT_PER_KEY: int = 20
+    LOG_RATE_LIMIT_WINDOW_SECONDS: float = 1.0
+    LOG_RATE_LIMIT_KEY_FIELDS: list[str] = ["event", "user_id"]
+    LOG_RATE_LIMIT_MAX_KEYS: int = 10000
+    LOG_ALWAYS_KEEP_LEVEL: str = "warning"
+    LOG_SLOW_REQUEST_MS: float = 500.0
+
+    # Limitación de logins fallidos: máximo de fallos por email y por IP dentro de la
+    # ventana deslizante; el bloqueo empieza en LOGIN_THROTTLE_LOCKOUT_SECONDS y se
+    # duplica con cada bloqueo consecutivo hasta LOGIN_THROTTLE_MAX_LOCKOUT_SECONDS
+    LOGIN_THROTTLE_STORE: ThrottleStoreBackend = ThrottleStoreBackend.MEMORY
+    LOGIN_THROTTLE_WINDOW_SECONDS: float = 300.0
+    LOGIN_THROTTLE_MAX_FAILURES_PER_EMAIL: int = 5
+    LOGIN_THROTTLE_MAX_FAILURES_PER_IP: int = 20
+    LOGIN_THROTTLE_LOCKOUT_SECONDS: float = 30.0
+    LOGIN_THROTTLE_MAX_LOCKOUT_SECONDS: float = 3600.0
+    LOGIN_THROTTLE_MAX_ENTRIES: int = 100000
+
+    # Estrategia por defecto para el total de los listados paginados
+    # (puede sobrescribirse por petición con el parámetro `count`)
+    TASK_COUNT_STRATEGY: CountStrategy = CountStrategy.EXACT
+
+    # Filas leídas por lote del cursor de servidor durante la exportación NDJSON
+    TASK_EXPORT_BATCH_SIZE: int = 1000
+
+    # Cantidad máxima de tareas aceptadas en una creación masiva
+    TASK_BULK_MAX_ITEMS: int = 1000
+
+    # Importación masiva: filas validadas por lote (un COPY + merge por lote),
+    # bytes del archivo subido que se mantienen en memoria antes de volcarse a disco,
+    # tamaño máximo del archivo (413 si se supera), directorio donde se guardan los
+    # archivos de filas rechazadas y segundos sin progreso tras los que una importación
+    # en curso se marca como fallida (su worker se reinició o se detuvo)
+    TASK_IMPORT_BATCH_SIZE: int = 5000
+    TASK_IMPORT_SPOOL_MAX_MEMORY: int = 8 * 1024 * 1024
+    TASK_IMPORT_MAX_UPLOAD_BYTES: int = 512 * 1024 * 1024
+    TASK_IMPORT_REJECTS_DIR: str = os.path.join(tempfile.gettempdir(), "task_imports")
+    TASK_IMPORT_STALE_SECONDS: float = 900.0
+
     @field_validator("DATABASE_URL", mode="before")
     @classmethod
     def assemble_db_connection(cls, v: Optional[str], info: Any) -> Any:
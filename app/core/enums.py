@@ -9,3 +9,61 @@ class TaskStatus(str, Enum):
     IN_PROGRESS = "in_progress"
     DONE = "done"
     DELETED = "deleted"
+
+class CountStrategy(str, Enum):
+    """
+    Estrategias disponibles para calcular el total de registros en los listados paginados.
+
+    - exact: COUNT(*) exacto en una consulta independiente.
+    - window: COUNT(*) OVER () calculado en la misma consulta de la página (un solo viaje).
+    - counter: suma de los contadores por usuario y estado mantenidos en cada escritura.
+    - estimate: estimación del planificador de PostgreSQL (EXPLAIN), sin recorrer filas.
+    - none: no se calcula el total (`total` y `total_pages` se devuelven nulos).
+    """
+    EXACT = "exact"
+    WINDOW = "window"
+    COUNTER = "counter"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+class TaskImportFormat(str, Enum):
+    """Formatos admitidos para la importación masiva de tareas."""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+class TaskImportStatus(str, Enum):
+    """Estados del ciclo de vida de una importación masiva de tareas."""
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class CacheInvalidationBackend(str, Enum):
+    """
+    Mecanismo para propagar las invalidaciones de la caché de usuarios autenticados.
+
+    - memory: solo se invalida la caché del propio proceso (un único worker).
+    - postgres: se publican con NOTIFY y cada worker las recibe con LISTEN.
+    """
+    MEMORY = "memory"
+    POSTGRES = "postgres"
+
+class PrincipalMode(str, Enum):
+    """
+    Origen de la identidad del usuario autenticado en cada petición.
+
+    - database: se lee el usuario de la base de datos (con la caché de principals).
+    - claims: se construye directamente desde los claims del JWT verificado, sin
+      consultar la tabla de usuarios; la revocación se comprueba en memoria.
+    """
+    DATABASE = "database"
+    CLAIMS = "claims"
+
+class ThrottleStoreBackend(str, Enum):
+    """
+    Almacén de los contadores de intentos de login fallidos.
+
+    - memory: contadores en el propio proceso (un único worker).
+    - postgres: tabla compartida por todos los workers.
+    """
+    MEMORY = "memory"
+    POSTGRES = "postgres"
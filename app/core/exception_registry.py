@@ -1,14 +1,25 @@
 from fastapi import FastAPI
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from app.core import handlers
 from app.exceptions.auth import (
     InvalidCredentialsException,
     UserNotFoundException,
     InvalidTokenException,
-    ExpiredTokenException
+    ExpiredTokenException,
+    RevokedTokenException,
+    PasswordHashingSaturatedException,
+    PasswordHashingTimeoutException,
+    LoginThrottledException
 )
 from app.exceptions.task import (
     TaskNotFoundException,
-    NotTaskOwnerException
+    NotTaskOwnerException,
+    InvalidCursorException,
+    UnsupportedTaskQueryException,
+    TaskCreationException,
+    BulkLimitExceededException,
+    TaskPreconditionFailedException,
+    ImportTooLargeException
 )
 
 def register_exception_handlers(app: FastAPI) -> None:
@@ -22,5 +33,16 @@ def register_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(UserNotFoundException, handlers.user_not_found_exception_handler)
     app.add_exception_handler(InvalidTokenException, handlers.invalid_token_exception_handler)
     app.add_exception_handler(ExpiredTokenException, handlers.expired_token_exception_handler)
+    app.add_exception_handler(RevokedTokenException, handlers.revoked_token_exception_handler)
+    app.add_exception_handler(PasswordHashingSaturatedException, handlers.password_hashing_saturated_exception_handler)
+    app.add_exception_handler(PasswordHashingTimeoutException, handlers.password_hashing_timeout_exception_handler)
+    app.add_exception_handler(LoginThrottledException, handlers.login_throttled_exception_handler)
     app.add_exception_handler(TaskNotFoundException, handlers.task_not_found_exception_handler)
     app.add_exception_handler(NotTaskOwnerException, handlers.not_task_owner_exception_handler)
+    app.add_exception_handler(InvalidCursorException, handlers.invalid_cursor_exception_handler)
+    app.add_exception_handler(UnsupportedTaskQueryException, handlers.unsupported_task_query_exception_handler)
+    app.add_exception_handler(TaskCreationException, handlers.task_creation_exception_handler)
+    app.add_exception_handler(BulkLimitExceededException, handlers.bulk_limit_exceeded_exception_handler)
+    app.add_exception_handler(TaskPreconditionFailedException, handlers.task_precondition_failed_exception_handler)
+    app.add_exception_handler(ImportTooLargeException, handlers.import_too_large_exception_handler)
+    app.add_exception_handler(PoolTimeoutError, handlers.database_pool_timeout_exception_handler)
@@ -1,7 +1,20 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from app.exceptions.auth import InvalidCredentialsException, UserNotFoundException, InvalidTokenException, ExpiredTokenException
-from app.exceptions.task import TaskNotFoundException, NotTaskOwnerException
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.exceptions.auth import (
+    InvalidCredentialsException, UserNotFoundException, InvalidTokenException, ExpiredTokenException, RevokedTokenException,
+    PasswordHashingSaturatedException, PasswordHashingTimeoutException, LoginThrottledException
+)
+from app.exceptions.task import (
+    TaskNotFoundException,
+    NotTaskOwnerException,
+    InvalidCursorException,
+    UnsupportedTaskQueryException,
+    TaskCreationException,
+    BulkLimitExceededException,
+    TaskPreconditionFailedException,
+    ImportTooLargeException
+)
 from app.core.logging import logger
 
 """
@@ -78,6 +91,81 @@ async def expired_token_exception_handler(request: Request, exc: ExpiredTokenExc
         }
     )
 
+async def revoked_token_exception_handler(request: Request, exc: RevokedTokenException) -> JSONResponse:
+    """Maneja tokens revocados por cierre de sesión o por deshabilitación de la cuenta."""
+    logger.warning(
+        "Token revocado",
+        path=request.url.path,
+        error=exc.detail,
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=401,
+        content={
+            "success": False,
+            "code": 401,
+            "message": exc.detail
+        }
+    )
+
+async def password_hashing_saturated_exception_handler(
+    request: Request, exc: PasswordHashingSaturatedException
+) -> JSONResponse:
+    """Maneja el rechazo inmediato de logins cuando la cola de hashing está llena (429)."""
+    logger.warning(
+        "Login rechazado por saturación del hashing de contraseñas",
+        path=request.url.path,
+        error=exc.detail,
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "success": False,
+            "code": 429,
+            "message": exc.detail
+        }
+    )
+
+async def password_hashing_timeout_exception_handler(
+    request: Request, exc: PasswordHashingTimeoutException
+) -> JSONResponse:
+    """Maneja los logins descartados por esperar demasiado en la cola de hashing (503)."""
+    logger.warning(
+        "Login descartado por espera excesiva en la cola de hashing",
+        path=request.url.path,
+        error=exc.detail,
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "success": False,
+            "code": 503,
+            "message": exc.detail
+        }
+    )
+
+async def login_throttled_exception_handler(request: Request, exc: LoginThrottledException) -> JSONResponse:
+    """Maneja los logins rechazados por bloqueo tras intentos fallidos (429 con Retry-After)."""
+    logger.warning(
+        "Login rechazado por intentos fallidos",
+        path=request.url.path,
+        error=exc.detail,
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "success": False,
+            "code": 429,
+            "message": exc.detail
+        }
+    )
+
 async def task_not_found_exception_handler(request: Request, exc: TaskNotFoundException) -> JSONResponse:
     """Maneja casos donde la tarea solicitada no existe o ha sido eliminada."""
     logger.warning(
@@ -111,3 +199,126 @@ async def not_task_owner_exception_handler(request: Request, exc: NotTaskOwnerEx
             "message": exc.detail
         }
     )
+
+async def invalid_cursor_exception_handler(request: Request, exc: InvalidCursorException) -> JSONResponse:
+    """Maneja cursores de paginación malformados o manipulados por el cliente."""
+    logger.warning(
+        "Cursor de paginación inválido",
+        path=request.url.path,
+        error=exc.detail,
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=400,
+        content={
+            "success": False,
+            "code": 400,
+            "message": exc.detail
+        }
+    )
+
+async def unsupported_task_query_exception_handler(request: Request, exc: UnsupportedTaskQueryException) -> JSONResponse:
+    """Maneja filtros u ordenamientos rechazados por no contar con un índice que los respalde."""
+    logger.warning(
+        "Consulta de tareas no soportada",
+        path=request.url.path,
+        error=exc.detail,
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=400,
+        content={
+            "success": False,
+            "code": 400,
+            "message": exc.detail
+        }
+    )
+
+async def task_creation_exception_handler(request: Request, exc: TaskCreationException) -> JSONResponse:
+    """Maneja errores inesperados al persistir nuevas tareas."""
+    logger.warning(
+        "Error al crear tarea",
+        path=request.url.path,
+        error=exc.detail,
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=400,
+        content={
+            "success": False,
+            "code": 400,
+            "message": exc.detail
+        }
+    )
+
+async def bulk_limit_exceeded_exception_handler(request: Request, exc: BulkLimitExceededException) -> JSONResponse:
+    """Maneja operaciones masivas que superan el máximo de elementos configurado."""
+    logger.warning(
+        "Límite de operación masiva superado",
+        path=request.url.path,
+        error=exc.detail,
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=400,
+        content={
+            "success": False,
+            "code": 400,
+            "message": exc.detail
+        }
+    )
+
+async def task_precondition_failed_exception_handler(request: Request, exc: TaskPreconditionFailedException) -> JSONResponse:
+    """Maneja escrituras condicionales (If-Match) sobre una versión desactualizada de la tarea."""
+    logger.warning(
+        "Precondición If-Match no satisfecha",
+        path=request.url.path,
+        error=exc.detail,
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=412,
+        content={
+            "success": False,
+            "code": 412,
+            "message": exc.detail
+        }
+    )
+
+async def import_too_large_exception_handler(request: Request, exc: ImportTooLargeException) -> JSONResponse:
+    """Maneja las importaciones cuyo archivo supera TASK_IMPORT_MAX_UPLOAD_BYTES."""
+    logger.warning(
+        "Archivo de importación demasiado grande",
+        path=request.url.path,
+        error=exc.detail,
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=413,
+        content={
+            "success": False,
+            "code": 413,
+            "message": exc.detail
+        }
+    )
+
+async def database_pool_timeout_exception_handler(request: Request, exc: PoolTimeoutError) -> JSONResponse:
+    """
+    Maneja el agotamiento del pool de conexiones (no se obtuvo una conexión dentro de
+    DB_POOL_TIMEOUT). Se responde 503 con Retry-After en lugar de un error genérico.
+    """
+    logger.warning(
+        "Pool de conexiones agotado",
+        path=request.url.path,
+        error=str(exc),
+        ip=request.client.host
+    )
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": "1"},
+        content={
+            "success": False,
+            "code": 503,
+            "message": "El servicio está saturado, intenta nuevamente en unos segundos"
+        }
+    )
@@ -0,0 +1,140 @@
+import asyncio
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import WaitStats, registry
+from app.exceptions.auth import PasswordHashingSaturatedException, PasswordHashingTimeoutException
+
+"""
+Executor acotado para el hashing de contraseñas.
+
+bcrypt consume decenas de milisegundos de CPU por verificación. En el threadpool
+compartido de Starlette, una ráfaga de logins ocupa todos sus hilos y retrasa al resto
+de la API. Aquí se usa un pool de hilos propio, de tamaño fijo, con una cola acotada:
+cuando la cola está llena la petición se rechaza de inmediato (429) y si una tarea espera
+en la cola más de lo permitido se descarta sin ejecutar bcrypt (503).
+"""
+
+T = TypeVar("T")
+
+
+class _QueueTimeout(Exception):
+    def __init__(self, waited: float):
+        self.waited = waited
+
+
+class BoundedExecutor:
+    """
+    ThreadPoolExecutor con un máximo de tareas admitidas (en ejecución más en cola) y
+    métricas de espera en cola. `run` se invoca desde el bucle de eventos, por lo que
+    los contadores no requieren bloqueo.
+    """
+
+    def __init__(self, name: str, max_workers: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        # Histograma de la espera en cola (los timeouts son tareas descartadas por esperar demasiado)
+        self.stats = WaitStats()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self.queue_timeout))
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Ejecuta `fn(*args)` en el pool.
+
+        Raises:
+            PasswordHashingSaturatedException: Si la cola está llena.
+            PasswordHashingTimeoutException: Si la tarea esperó en cola más de `queue_timeout`.
+        """
+        if self.in_flight >= self.max_workers + self.queue_size:
+            self.rejected += 1
+            logger.warning("Cola de hashing de contraseñas llena", executor=self.name, in_flight=self.in_flight)
+            raise PasswordHashingSaturatedException(retry_after=self._retry_after())
+
+        submitted = time.perf_counter()
+
+        def job() -> tuple[float, T]:
+            waited = time.perf_counter() - submitted
+            if waited > self.queue_timeout:
+                raise _QueueTimeout(waited)
+            return waited, fn(*args)
+
+        self.in_flight += 1
+        try:
+            waited, result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), job)
+        except _QueueTimeout as e:
+            self.stats.observe_wait(e.waited * 1000)
+            self.stats.timeouts += 1
+            logger.warning(
+                "Tiempo de espera agotado en la cola de hashing de contraseñas",
+                executor=self.name, waited_ms=round(e.waited * 1000, 3)
+            )
+            raise PasswordHashingTimeoutException(retry_after=self._retry_after())
+        finally:
+            self.in_flight -= 1
+
+        self.stats.observe_wait(waited * 1000)
+        self.completed += 1
+        return result
+
+    def shutdown(self) -> None:
+        """Detiene los hilos del pool; las tareas en ejecución terminan, las encoladas se cancelan."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def status(self) -> dict[str, Any]:
+        """Ocupación actual y métricas acumuladas de la cola."""
+        return {
+            "workers": self.max_workers,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.stats.timeouts,
+            "wait_count": self.stats.wait_count,
+            "wait_sum_ms": round(self.stats.wait_sum_ms, 3),
+            "wait_ms_buckets": self.stats.wait_histogram(),
+        }
+
+
+password_executor = BoundedExecutor(
+    "password-hash",
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_QUEUE_SIZE,
+    settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+)
+
+
+def register_executor_metrics(executor: BoundedExecutor) -> None:
+    """Gauges de ocupación y contadores de rechazo de `executor`, calculados al exponer."""
+
+    def collect(key: str):
+        return lambda: [((executor.name,), executor.status()[key])]
+
+    for key, metric, documentation, kind in (
+        ("workers", "executor_workers", "Hilos del executor dedicado.", "gauge"),
+        ("in_flight", "executor_in_flight", "Tareas en ejecución o en cola en el executor.", "gauge"),
+        ("queue_size", "executor_queue_size", "Tareas admitidas en cola por encima de los hilos.", "gauge"),
+        ("rejected", "executor_rejected_total", "Tareas rechazadas por cola llena.", "counter"),
+        ("timeouts", "executor_queue_timeouts_total", "Tareas que superaron el tiempo máximo en cola.", "counter"),
+    ):
+        registry.gauge_callback(metric, documentation, ("executor",), collect(key), kind=kind)
+
+
+register_executor_metrics(password_executor)
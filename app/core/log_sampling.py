@@ -0,0 +1,138 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Iterable, Optional
+import structlog
+
+"""
+Muestreo y limitación de frecuencia de los logs.
+
+Las rutas más usadas (listar y obtener tareas) emiten varias líneas por petición, de modo
+que a tasas altas el logging ocupa una parte apreciable de la CPU y del almacenamiento.
+Estos procesadores de structlog descartan eventos antes de renderizarlos:
+
+* `SamplingProcessor` conserva cada evento con la probabilidad configurada para su
+  mensaje (`event`) y anota `sample_rate` en los conservados para poder extrapolar.
+* `RateLimitProcessor` admite como máximo N eventos por clave (ej. evento + usuario) en
+  cada ventana y anota en el siguiente evento conservado cuántos se suprimieron.
+
+Ninguno de los dos descarta eventos de nivel igual o superior al configurado (warning por
+defecto) ni los que informan una duración (`duration_ms`) de petición lenta.
+"""
+
+LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+
+class KeepRule:
+    """Decide qué eventos se conservan siempre, sin importar el muestreo ni los límites."""
+
+    def __init__(self, min_level: str, slow_ms: float):
+        self.min_level = LEVELS[min_level.upper()]
+        self.slow_ms = slow_ms
+
+    def __call__(self, event_dict: dict[str, Any]) -> bool:
+        if LEVELS.get(str(event_dict.get("level", "info")).upper(), logging.INFO) >= self.min_level:
+            return True
+        duration = event_dict.get("duration_ms")
+        return isinstance(duration, (int, float)) and duration >= self.slow_ms
+
+
+class SamplingProcessor:
+    """Conserva cada evento con la probabilidad configurada para su mensaje."""
+
+    def __init__(self, rates: dict[str, float], default_rate: float, keep: KeepRule):
+        self.rates = rates
+        self.default_rate = default_rate
+        self.keep = keep
+        self.sampled_out = 0
+
+    def __call__(self, logger: Any, method_name: str, event_dict: dict[str, Any]) -> dict[str, Any]:
+        rate = self.rates.get(event_dict.get("event"), self.default_rate)
+        if rate >= 1 or self.keep(event_dict):
+            return event_dict
+        if random.random() >= rate:
+            self.sampled_out += 1
+            raise structlog.DropEvent
+        event_dict["sample_rate"] = rate
+        return event_dict
+
+
+class RateLimitProcessor:
+    """
+    Ventana fija por clave: admite `limit` eventos por clave en cada ventana de
+    `window_seconds`. Si se supera `max_keys` se reinician todas las ventanas, lo que
+    acota la memoria ante claves de alta cardinalidad.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window_seconds: float,
+        key_fields: Iterable[str],
+        max_keys: int,
+        keep: KeepRule
+    ):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.key_fields = tuple(key_fields)
+        self.max_keys = max_keys
+        self.keep = keep
+        self.rate_limited = 0
+        # clave -> [inicio de la ventana, eventos admitidos, eventos suprimidos]
+        self._windows: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, logger: Any, method_name: str, event_dict: dict[str, Any]) -> dict[str, Any]:
+        if self.keep(event_dict):
+            return event_dict
+        key = tuple(event_dict.get(field) for field in self.key_fields)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window_seconds:
+                if window is None and len(self._windows) >= self.max_keys:
+                    self._windows.clear()
+                suppressed = window[2] if window is not None else 0
+                window = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    event_dict["suppressed"] = suppressed
+            if window[1] >= self.limit:
+                window[2] += 1
+                self.rate_limited += 1
+                raise structlog.DropEvent
+            window[1] += 1
+        return event_dict
+
+
+def build_processors(settings) -> list[Any]:
+    """Crea la cadena de muestreo a partir de la configuración (vacía si está desactivada)."""
+    keep = KeepRule(settings.LOG_ALWAYS_KEEP_LEVEL, settings.LOG_SLOW_REQUEST_MS)
+    processors: list[Any] = []
+    if settings.LOG_SAMPLE_RATES or settings.LOG_SAMPLE_DEFAULT_RATE < 1:
+        processors.append(SamplingProcessor(settings.LOG_SAMPLE_RATES, settings.LOG_SAMPLE_DEFAULT_RATE, keep))
+    if settings.LOG_RATE_LIMIT_PER_KEY > 0:
+        processors.append(RateLimitProcessor(
+            settings.LOG_RATE_LIMIT_PER_KEY,
+            settings.LOG_RATE_LIMIT_WINDOW_SECONDS,
+            settings.LOG_RATE_LIMIT_KEY_FIELDS,
+            settings.LOG_RATE_LIMIT_MAX_KEYS,
+            keep
+        ))
+    return processors
+
+
+def sampling_stats(processors: list[Any]) -> dict[str, Optional[int]]:
+    stats: dict[str, Optional[int]] = {"sampled_out": None, "rate_limited": None}
+    for processor in processors:
+        if isinstance(processor, SamplingProcessor):
+            stats["sampled_out"] = processor.sampled_out
+        elif isinstance(processor, RateLimitProcessor):
+            stats["rate_limited"] = processor.rate_limited
+    return stats
@@ -1,34 +1,206 @@
-import structlog
+import atexit
 import logging
+import queue
 import sys
+import threading
+from typing import Any, BinaryIO, Optional
+import orjson
+import structlog
+from app.core.log_sampling import build_processors, sampling_stats
+
+"""
+Logging estructurado con escritura asíncrona.
+
+Los eventos se renderizan a JSON (orjson) en el hilo que los emite y se encolan en un
+buffer acotado; un hilo en segundo plano los escribe en stdout por lotes. Así, si stdout
+se bloquea (ej. el runtime de contenedores no consume la salida a tiempo), las peticiones
+no esperan: cuando el buffer se llena los eventos se descartan y se contabilizan.
+"""
+
+
+class BatchingLogSink:
+    """
+    Buffer acotado de líneas de log vaciado por un hilo dedicado.
+
+    `emit` nunca bloquea: si la cola está llena, la línea se descarta y se cuenta en
+    `dropped`. `stop` escribe lo pendiente y, a partir de ahí, las líneas se escriben
+    directamente (ej. mensajes emitidos durante el cierre del proceso).
+    """
+
+    def __init__(self, stream: BinaryIO, max_queue: int, batch_size: int, flush_interval: float):
+        self._stream = stream
+        self._queue: queue.Queue[bytes] = queue.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self.max_queue = max_queue
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def emit(self, line: bytes) -> None:
+        if self._stopped.is_set():
+            self._write([line])
+            return
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while not (self._stopped.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self._flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: list[bytes]) -> None:
+        try:
+            with self._lock:
+                self._stream.write(b"\n".join(batch) + b"\n")
+                self._stream.flush()
+                self.written += len(batch)
+        except Exception:
+            # Un fallo de escritura no debe detener el hilo ni propagarse a las peticiones
+            with self._lock:
+                self.write_errors += 1
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Escribe los eventos pendientes y deja constancia de los descartados."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        if self.dropped:
+            self._write([orjson.dumps({
+                "event": "Eventos de log descartados por buffer lleno",
+                "level": "warning",
+                "dropped": self.dropped,
+            })])
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "written": self.written,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+        }
+
+
+class SinkLogger:
+    """Logger de structlog que recibe la línea ya renderizada (bytes) y la entrega al sink."""
+
+    def __init__(self, sink: BatchingLogSink):
+        self._sink = sink
+
+    def msg(self, message: bytes) -> None:
+        self._sink.emit(message)
+
+    log = debug = info = warn = warning = error = critical = exception = fatal = msg
+
+
+class SinkLoggerFactory:
+    def __init__(self, sink: BatchingLogSink):
+        self._sink = sink
+
+    def __call__(self, *args: Any) -> SinkLogger:
+        return SinkLogger(self._sink)
+
+
+class SinkHandler(logging.Handler):
+    """Envía al mismo sink los registros de logging estándar (uvicorn, SQLAlchemy, tenacity)."""
+
+    def __init__(self, sink: BatchingLogSink):
+        super().__init__()
+        self._sink = sink
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._sink.emit(self.format(record).encode())
+        except Exception:
+            self.handleError(record)
+
+
+# Sink del proceso y procesadores de muestreo; se crean en `configure_logger`
+log_sink: Optional[BatchingLogSink] = None
+sampling_processors: list[Any] = []
+
 
 def configure_logger():
     """
     Configura el sistema de logging estructurado utilizando structlog.
-    
+
     Establece los procesadores necesarios para incluir niveles de log,
     marcas de tiempo en formato ISO y renderizado final en JSON para
-    facilitar la trazabilidad en entornos dockerizados.
+    facilitar la trazabilidad en entornos dockerizados. Los eventos de
+    rutas calientes se muestrean y limitan por clave antes de renderizarse,
+    y la salida pasa por un sink con buffer acotado que escribe en stdout por lotes.
     """
+    global log_sink, sampling_processors
+    if log_sink is not None:
+        return
+    # Importación diferida: la configuración usa este módulo para sus propios logs
+    from app.core.config import settings
+
+    log_sink = BatchingLogSink(
+        sys.stdout.buffer, settings.LOG_QUEUE_SIZE, settings.LOG_BATCH_SIZE, settings.LOG_FLUSH_INTERVAL_SECONDS
+    )
+    log_sink.start()
+    sampling_processors = build_processors(settings)
+    atexit.register(log_sink.stop)
+
+    handler = SinkHandler(log_sink)
+    handler.setFormatter(logging.Formatter("%(message)s"))
     logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
+        handlers=[handler],
         level=logging.INFO,
+        force=True,
     )
 
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
             structlog.processors.add_log_level,
+            # Se descartan antes de formatear excepciones, fechas y JSON
+            *sampling_processors,
             structlog.processors.StackInfoRenderer(),
             structlog.dev.set_exc_info,
+            structlog.processors.format_exc_info,
             structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.JSONRenderer()
+            structlog.processors.JSONRenderer(serializer=orjson.dumps)
         ],
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
+        logger_factory=SinkLoggerFactory(log_sink),
+        # Descarta los niveles inferiores a INFO antes de ejecutar los procesadores
+        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
         cache_logger_on_first_use=True,
     )
 
+
+def logging_stats() -> Optional[dict[str, Any]]:
+    """Estadísticas del sink y eventos descartados por muestreo o por límite de frecuencia."""
+    if log_sink is None:
+        return None
+    return {**log_sink.stats(), **sampling_stats(sampling_processors)}
+
+
+def shutdown_logger() -> None:
+    """Vacía el buffer de logs (al detener el servidor)."""
+    if log_sink is not None:
+        log_sink.stop()
+
 # Instancia global del logger para ser utilizada en toda la aplicación
 logger = structlog.get_logger()
@@ -0,0 +1,191 @@
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.config import settings
+from app.core.enums import ThrottleStoreBackend
+from app.core.logging import logger
+from app.core.principal_cache import TTLCache
+from app.db.session import AuthSessionLocal
+from app.exceptions.auth import LoginThrottledException
+from app.models.login_throttle import LoginThrottleState
+
+"""
+Limitación de intentos de login.
+
+Cada login fallido cuesta una verificación bcrypt completa, por lo que un ataque de
+credential stuffing es también una denegación de servicio por CPU. Se cuentan los fallos
+por email y por IP en una ventana deslizante; al superar el máximo la clave queda
+bloqueada durante un tiempo que se duplica con cada bloqueo consecutivo. La comprobación
+se hace antes de buscar al usuario y de ejecutar bcrypt, de modo que los intentos
+bloqueados no consumen CPU ni conexiones.
+"""
+
+# Probabilidad de depurar los registros vencidos en cada escritura del almacén compartido
+PURGE_PROBABILITY = 0.01
+
+
+@dataclass
+class ThrottleState:
+    """Estado de una clave: fallos en la ventana, fin del bloqueo y bloqueos consecutivos."""
+    failures: list[float] = field(default_factory=list)
+    locked_until: float = 0.0
+    lockouts: int = 0
+
+
+class MemoryThrottleStore:
+    """Almacén en proceso: adecuado cuando la API se ejecuta en un único worker."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._states: TTLCache[str, ThrottleState] = TTLCache(max_entries, ttl_seconds)
+
+    async def get(self, key: str) -> Optional[ThrottleState]:
+        return self._states.get(key)
+
+    async def update(self, key: str, mutate: Callable[[ThrottleState], None]) -> ThrottleState:
+        # Sin esperas entre la lectura y la escritura: atómico dentro del bucle de eventos
+        state = self._states.get(key) or ThrottleState()
+        mutate(state)
+        self._states.set(key, state)
+        return state
+
+    async def delete(self, key: str) -> None:
+        self._states.invalidate(key)
+
+    def clear(self) -> None:
+        self._states.clear()
+
+
+class PostgresThrottleStore:
+    """
+    Almacén compartido entre workers sobre la tabla `login_throttle_states`. Cada
+    actualización bloquea la fila de la clave (SELECT ... FOR UPDATE) para que los
+    fallos concurrentes de distintos workers no se pierdan.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, ttl_seconds: float):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, key: str) -> Optional[ThrottleState]:
+        async with self.session_factory() as db:
+            row = await db.get(LoginThrottleState, key)
+            if row is None or row.expires_at <= time.time():
+                return None
+            return ThrottleState(list(row.failures), row.locked_until, row.lockouts)
+
+    async def update(self, key: str, mutate: Callable[[ThrottleState], None]) -> ThrottleState:
+        now = time.time()
+        async with self.session_factory() as db:
+            await db.execute(
+                pg_insert(LoginThrottleState)
+                .values(key=key, failures=[], locked_until=0, lockouts=0, expires_at=now + self.ttl_seconds)
+                .on_conflict_do_nothing(index_elements=[LoginThrottleState.key])
+            )
+            row = (await db.scalars(
+                select(LoginThrottleState).where(LoginThrottleState.key == key).with_for_update()
+            )).one()
+            state = ThrottleState() if row.expires_at <= now else ThrottleState(
+                list(row.failures), row.locked_until, row.lockouts
+            )
+            mutate(state)
+            row.failures, row.locked_until, row.lockouts = state.failures, state.locked_until, state.lockouts
+            row.expires_at = now + self.ttl_seconds
+            if random.random() < PURGE_PROBABILITY:
+                await db.execute(delete(LoginThrottleState).where(LoginThrottleState.expires_at <= now))
+            await db.commit()
+        return state
+
+    async def delete(self, key: str) -> None:
+        async with self.session_factory() as db:
+            await db.execute(delete(LoginThrottleState).where(LoginThrottleState.key == key))
+            await db.commit()
+
+
+class LoginThrottle:
+    """Ventana deslizante de fallos con bloqueo exponencial, por email y por IP."""
+
+    def __init__(
+        self,
+        store,
+        window_seconds: float,
+        max_failures_per_email: int,
+        max_failures_per_ip: int,
+        lockout_seconds: float,
+        max_lockout_seconds: float
+    ):
+        self.store = store
+        self.window_seconds = window_seconds
+        self.max_failures_per_email = max_failures_per_email
+        self.max_failures_per_ip = max_failures_per_ip
+        self.lockout_seconds = lockout_seconds
+        self.max_lockout_seconds = max_lockout_seconds
+
+    def _keys(self, email: str, ip: Optional[str]) -> list[tuple[str, int]]:
+        keys = [(f"email:{email.strip().lower()}", self.max_failures_per_email)]
+        if ip is not None:
+            keys.append((f"ip:{ip}", self.max_failures_per_ip))
+        return keys
+
+    async def check(self, email: str, ip: Optional[str]) -> None:
+        """
+        Raises:
+            LoginThrottledException: Si el email o la IP están bloqueados.
+        """
+        now = time.time()
+        for key, _ in self._keys(email, ip):
+            state = await self.store.get(key)
+            if state is not None and state.locked_until > now:
+                logger.warning("Intento de login bloqueado", key=key, locked_until=state.locked_until)
+                raise LoginThrottledException(retry_after=math.ceil(state.locked_until - now))
+
+    async def register_failure(self, email: str, ip: Optional[str]) -> None:
+        """Registra un fallo y bloquea la clave si alcanza el máximo dentro de la ventana."""
+        now = time.time()
+
+        def record(max_failures: int) -> Callable[[ThrottleState], None]:
+            def mutate(state: ThrottleState) -> None:
+                state.failures = [t for t in state.failures if t > now - self.window_seconds]
+                state.failures.append(now)
+                if len(state.failures) >= max_failures:
+                    state.lockouts += 1
+                    duration = min(self.lockout_seconds * 2 ** (state.lockouts - 1), self.max_lockout_seconds)
+                    state.locked_until = now + duration
+                    state.failures = []
+            return mutate
+
+        for key, max_failures in self._keys(email, ip):
+            state = await self.store.update(key, record(max_failures))
+            if state.locked_until > now:
+                logger.warning(
+                    "Clave de login bloqueada por intentos fallidos",
+                    key=key, lockouts=state.lockouts, seconds=round(state.locked_until - now)
+                )
+
+    async def register_success(self, email: str) -> None:
+        """Un login correcto reinicia el contador del email (no el de la IP, que puede ser compartida)."""
+        email_key, _ = self._keys(email, None)[0]
+        await self.store.delete(email_key)
+
+
+def create_store():
+    # El estado se conserva hasta LOGIN_THROTTLE_MAX_LOCKOUT_SECONDS sin actividad,
+    # de modo que el nivel de bloqueo decae tras un periodo sin fallos
+    ttl = max(settings.LOGIN_THROTTLE_WINDOW_SECONDS, settings.LOGIN_THROTTLE_MAX_LOCKOUT_SECONDS)
+    if settings.LOGIN_THROTTLE_STORE == ThrottleStoreBackend.POSTGRES:
+        return PostgresThrottleStore(AuthSessionLocal, ttl)
+    return MemoryThrottleStore(settings.LOGIN_THROTTLE_MAX_ENTRIES, ttl)
+
+
+login_throttle = LoginThrottle(
+    create_store(),
+    settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+    settings.LOGIN_THROTTLE_MAX_FAILURES_PER_EMAIL,
+    settings.LOGIN_THROTTLE_MAX_FAILURES_PER_IP,
+    settings.LOGIN_THROTTLE_LOCKOUT_SECONDS,
+    settings.LOGIN_THROTTLE_MAX_LOCKOUT_SECONDS,
+)
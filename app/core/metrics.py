@@ -0,0 +1,340 @@
+import bisect
+import time
+import anyio.to_thread
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Optional
+from app.core.config import settings
+from app.core.logging import logger
+
+"""
+Métricas en formato de exposición de texto de Prometheus.
+
+Registro mínimo, sin dependencias, con contadores e histogramas etiquetados y gauges
+calculados al momento de la lectura (ej. ocupación de los pools). Las métricas se
+actualizan desde el bucle de eventos, por lo que, como las estadísticas de los pools,
+no requieren bloqueo. `MetricsMiddleware` registra cada petición HTTP por plantilla de
+ruta (ej. `/api/v1/tasks/{task_id}`) para acotar la cardinalidad de las etiquetas, y
+expone en un ContextVar las estadísticas de consultas de la petición en curso, que
+completan los eventos de los engines (ver `app.db.instrumentation`). `WaitStats` reúne
+las estadísticas de espera compartidas por los pools de conexiones y los executors.
+"""
+
+# Límites superiores (en segundos) de los buckets de latencia de peticiones y consultas
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Límites superiores de la cantidad de consultas por petición
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Etiqueta de ruta de las peticiones que no corresponden a ninguna ruta registrada
+UNMATCHED_ROUTE = "unmatched"
+
+# Límites superiores (en milisegundos) de los buckets de los histogramas de espera
+# (conexiones de los pools y cola de los executors), expuestos en /health
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_labels(names: tuple[str, ...], values: Iterable[Any]) -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class WaitStats:
+    """
+    Esperas por un recurso acotado (una conexión del pool, un hilo de un executor):
+    histograma acumulado, cantidad, suma y timeouts. Se actualizan desde el bucle de
+    eventos, por lo que no requieren bloqueo.
+    """
+
+    def __init__(self):
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.timeouts = 0
+
+    def observe_wait(self, elapsed_ms: float) -> None:
+        """Registra una espera en el bucket correspondiente (el último es +Inf)."""
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, elapsed_ms)] += 1
+        self.wait_count += 1
+        self.wait_sum_ms += elapsed_ms
+
+    def wait_histogram(self) -> dict[str, int]:
+        """Histograma acumulado: cantidad de esperas menores o iguales a cada límite."""
+        histogram, accumulated = {}, 0
+        for bound, count in zip([*map(str, WAIT_BUCKETS_MS), "+Inf"], self.wait_buckets):
+            accumulated += count
+            histogram[bound] = accumulated
+        return histogram
+
+
+class Counter:
+    """Contador monótono etiquetado."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> Iterable[str]:
+        for label_values, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Histogram:
+    """Histograma etiquetado con buckets acumulados, suma y cantidad de observaciones."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # valores de etiquetas -> [conteo por bucket (el último es +Inf), suma, cantidad]
+        self._series: dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series is not None else 0
+
+    def samples(self) -> Iterable[str]:
+        bounds = [*map(_format_value, self.buckets), "+Inf"]
+        for label_values, (counts, total, count) in self._series.items():
+            accumulated = 0
+            for bound, bucket_count in zip(bounds, counts):
+                accumulated += bucket_count
+                labels = _format_labels((*self.labels, "le"), (*label_values, bound))
+                yield f"{self.name}_bucket{labels} {accumulated}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class GaugeCallback:
+    """
+    Gauge cuyo valor se calcula al exponer las métricas. `collect` devuelve pares
+    (valores de etiquetas, valor), de modo que la lectura no añade coste a las peticiones.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[LabelValues, float]]],
+        kind: str = "gauge"
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.collect = collect
+        self.kind = kind
+
+    def samples(self) -> Iterable[str]:
+        for label_values, value in self.collect():
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expuestas en /metrics, en orden de registro."""
+
+    def __init__(self):
+        self._metrics: dict[str, Any] = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"La métrica {metric.name} ya está registrada")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(
+        self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def gauge_callback(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[LabelValues, float]]],
+        kind: str = "gauge"
+    ) -> GaugeCallback:
+        return self.register(GaugeCallback(name, documentation, labels, collect, kind))
+
+    def render(self) -> str:
+        """Texto en formato de exposición de Prometheus (versión 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class RequestQueryStats:
+    """
+    Consultas ejecutadas durante una petición (las completan los eventos de los engines):
+    cantidad, tiempo total y repeticiones por sentencia normalizada.
+    """
+
+    __slots__ = ("scope", "count", "duration", "statements")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+        self.statements: dict[str, int] = {}
+
+    def endpoint(self) -> Optional[str]:
+        """Método y plantilla de ruta de la petición (ej. `GET /api/v1/tasks/{task_id}`)."""
+        if self.scope is None:
+            return None
+        return f"{self.scope['method']} {route_template(self.scope)}"
+
+
+# Estadísticas de consultas de la petición en curso (None fuera de una petición HTTP)
+current_request_queries: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_request_queries", default=None)
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "Peticiones HTTP atendidas por método, plantilla de ruta y código de estado.",
+    ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP, hasta enviar la respuesta completa.",
+    ("method", "route")
+)
+http_requests_in_progress = 0
+registry.gauge_callback(
+    "http_requests_in_progress", "Peticiones HTTP en curso.", (), lambda: [((), http_requests_in_progress)]
+)
+
+
+def _threadpool_tokens() -> list[tuple[LabelValues, float]]:
+    # Threadpool de Starlette/AnyIO (dependencias y endpoints síncronos, run_in_threadpool)
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+    except RuntimeError:
+        return []
+    return [(("total",), limiter.total_tokens), (("borrowed",), limiter.borrowed_tokens)]
+
+
+def _threadpool_waiting() -> list[tuple[LabelValues, float]]:
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+    except RuntimeError:
+        return []
+    return [((), limiter.statistics().tasks_waiting)]
+
+
+registry.gauge_callback(
+    "threadpool_threads", "Hilos del threadpool de la aplicación: límite y ocupados.", ("state",), _threadpool_tokens
+)
+registry.gauge_callback(
+    "threadpool_tasks_waiting", "Tareas esperando un hilo libre del threadpool.", (), _threadpool_waiting
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries", "Consultas a la base de datos por petición HTTP.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+http_request_db_duration_seconds = registry.histogram(
+    "http_request_db_duration_seconds", "Tiempo total de consultas a la base de datos por petición HTTP.", ("method", "route")
+)
+
+
+def route_template(scope: dict) -> str:
+    """
+    Plantilla de la ruta atendida (ej. `/api/v1/tasks/{task_id}`). Las rutas de los
+    routers incluidos pueden conservar su ruta relativa al prefijo, por lo que los
+    segmentos del prefijo se toman de la ruta real de la petición.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    route_segments = template.strip("/").split("/") if template.strip("/") else []
+    path_segments = scope.get("path", "").strip("/").split("/")
+    prefix = path_segments[:max(len(path_segments) - len(route_segments), 0)]
+    return "".join("/" + segment for segment in prefix if segment) + template
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra cantidad, código de estado y latencia por plantilla de
+    ruta, y las consultas a la base de datos de cada petición. Las peticiones que superan
+    LOG_SLOW_REQUEST_MS (incluido el envío del cuerpo) se registran además con su
+    `duration_ms`. Es un middleware ASGI puro (sin BaseHTTPMiddleware) para no añadir
+    tareas ni copias del cuerpo por petición.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global http_requests_in_progress
+        started = time.perf_counter()
+        status_code = 500
+        queries = RequestQueryStats(scope)
+        token = current_request_queries.set(queries)
+        http_requests_in_progress += 1
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_progress -= 1
+            current_request_queries.reset(token)
+            method, route = scope["method"], route_template(scope)
+            http_requests_total.inc(method, route, str(status_code))
+            duration = time.perf_counter() - started
+            http_request_duration_seconds.observe(duration, method, route)
+            http_request_db_queries.observe(queries.count, method, route)
+            http_request_db_duration_seconds.observe(queries.duration, method, route)
+            if duration * 1000 >= settings.LOG_SLOW_REQUEST_MS:
+                logger.warning(
+                    "Petición HTTP lenta",
+                    method=method, route=route, status_code=status_code,
+                    duration_ms=round(duration * 1000, 1), db_queries=queries.count,
+                )
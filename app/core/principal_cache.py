@@ -0,0 +1,309 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Iterable, Optional, TypeVar
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.enums import CacheInvalidationBackend
+from app.core.logging import logger
+from app.models.user import User
+from app.schemas.auth import UserPrincipal
+
+"""
+Caché en proceso del usuario autenticado.
+
+`get_current_user` se ejecuta en cada petición protegida y su resultado casi nunca
+cambia, por lo que se conserva en una caché LRU acotada con vigencia (TTL). Las
+escrituras sobre usuarios confirmadas por el ORM invalidan la entrada automáticamente;
+el backend de invalidación determina si la invalidación alcanza solo al proceso actual
+(memory) o a todos los workers (postgres, mediante LISTEN/NOTIFY).
+"""
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Canal de NOTIFY por el que se publican los ids de usuario a invalidar ("*" vacía la caché).
+# Los demás payloads (ej. claves `jti:`/`user:` del filtro de revocación) se entregan a los
+# suscriptores registrados con `subscribe`
+INVALIDATION_CHANNEL = "principal_cache_invalidation"
+INVALIDATE_ALL = "*"
+
+# Clave de `Session.info` donde se acumulan los usuarios modificados en la transacción
+_PENDING_KEY = "principal_cache_pending"
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Caché LRU acotada con vigencia por entrada y métricas de uso.
+
+    Se usa desde el bucle de eventos (sin esperas entre lectura y escritura),
+    por lo que no requiere bloqueo.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        # Se incrementa en cada invalidación; ver `snapshot`
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: K) -> Optional[V]:
+        """Devuelve el valor vigente de `key` (marcándolo como usado recientemente) o None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return None
+
+    def snapshot(self) -> int:
+        """
+        Marca de generación que debe tomarse antes de leer el valor de la fuente. Si se
+        invalida algo mientras tanto, `set` descarta el valor por estar posiblemente obsoleto.
+        """
+        return self._generation
+
+    def set(self, key: K, value: V, snapshot: Optional[int] = None) -> None:
+        """Guarda `value` con la vigencia configurada, desalojando la entrada menos usada si hace falta."""
+        if snapshot is not None and snapshot != self._generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """Elimina la entrada de `key`, si existe."""
+        self._generation += 1
+        self.invalidations += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Elimina todas las entradas."""
+        self._generation += 1
+        self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Métricas de uso acumuladas y ocupación actual."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+def _dispatch(cache: TTLCache, subscribers: list[Callable[[str], None]], payload: str) -> None:
+    """Aplica una notificación del canal: invalidación de la caché o mensaje para los suscriptores."""
+    if payload == INVALIDATE_ALL:
+        cache.clear()
+    elif payload.isdigit():
+        cache.invalidate(int(payload))
+    else:
+        for subscriber in subscribers:
+            subscriber(payload)
+
+
+class MemoryInvalidationBackend:
+    """Invalidación local: adecuada cuando la API se ejecuta en un único proceso."""
+
+    def subscribe(self, subscriber: Callable[[str], None]) -> None:
+        """Sin otros workers no hay mensajes que recibir: cada proceso aplica sus cambios localmente."""
+
+    def publish(self, session: Session, payloads: Iterable[str]) -> None:
+        """Las invalidaciones locales se aplican al confirmar la transacción; no hay nada que publicar."""
+
+    async def start(self, cache: TTLCache) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class PostgresInvalidationBackend:
+    """
+    Invalidación entre workers mediante LISTEN/NOTIFY de PostgreSQL.
+
+    NOTIFY se emite dentro de la transacción que modifica al usuario, por lo que solo se
+    entrega si esta se confirma. Cada worker mantiene una conexión asyncpg dedicada
+    (fuera de los pools) escuchando el canal. Una tarea en segundo plano la supervisa
+    (cierre detectado por asyncpg o consulta de salud periódica fallida) y reconecta con
+    espera exponencial; como las notificaciones emitidas sin conexión se pierden, la
+    caché se vacía cada vez que se vuelve a escuchar. El canal también transporta las
+    revocaciones de tokens; las perdidas durante una desconexión llegan con el siguiente
+    refresco periódico del filtro de revocación.
+    """
+
+    def __init__(
+        self,
+        health_check_seconds: float = settings.AUTH_CACHE_LISTEN_HEALTH_CHECK_SECONDS,
+        reconnect_max_seconds: float = settings.AUTH_CACHE_LISTEN_RECONNECT_MAX_SECONDS
+    ):
+        self.health_check_seconds = health_check_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self.reconnects = 0
+        self._subscribers: list[Callable[[str], None]] = []
+        self._connection = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, subscriber: Callable[[str], None]) -> None:
+        """Registra un receptor de los payloads del canal que no son invalidaciones de la caché."""
+        if subscriber not in self._subscribers:
+            self._subscribers.append(subscriber)
+
+    def publish(self, session: Session, payloads: Iterable[str]) -> None:
+        connection = session.connection()
+        for payload in payloads:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": INVALIDATION_CHANNEL, "payload": payload}
+            )
+
+    async def _listen(self, cache: TTLCache) -> asyncio.Event:
+        """Abre la conexión, escucha el canal y vacía la caché. Devuelve el evento de conexión perdida."""
+        import asyncpg
+
+        def on_notification(connection, pid, channel, payload) -> None:
+            _dispatch(cache, self._subscribers, payload)
+
+        lost = asyncio.Event()
+        dsn = make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._connection = await asyncpg.connect(dsn)
+        self._connection.add_termination_listener(lambda connection: lost.set())
+        await self._connection.add_listener(INVALIDATION_CHANNEL, on_notification)
+        # Lo cacheado antes de empezar a escuchar pudo perder invalidaciones
+        cache.clear()
+        logger.info("Escuchando invalidaciones de la caché de usuarios", channel=INVALIDATION_CHANNEL)
+        return lost
+
+    async def _is_alive(self, lost: asyncio.Event) -> bool:
+        """Espera un intervalo de salud: False si la conexión se cerró o no responde."""
+        try:
+            await asyncio.wait_for(lost.wait(), self.health_check_seconds)
+            return False
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await asyncio.wait_for(self._connection.fetchval("SELECT 1"), self.health_check_seconds)
+            return True
+        except Exception:
+            return False
+
+    async def _close(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            try:
+                await connection.close(timeout=self.health_check_seconds)
+            except Exception:
+                connection.terminate()
+
+    async def _supervise(self, cache: TTLCache, lost: asyncio.Event) -> None:
+        while True:
+            if await self._is_alive(lost):
+                continue
+            logger.warning("Conexión de invalidaciones de la caché de usuarios perdida; reconectando")
+            await self._close()
+            delay = 1.0
+            while True:
+                try:
+                    lost = await self._listen(cache)
+                    self.reconnects += 1
+                    break
+                except Exception as e:
+                    await self._close()
+                    logger.error(f"Error al reconectar la escucha de invalidaciones: {e}", retry_in_seconds=delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.reconnect_max_seconds)
+
+    async def start(self, cache: TTLCache) -> None:
+        lost = await self._listen(cache)
+        self._task = asyncio.create_task(self._supervise(cache, lost))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close()
+
+
+INVALIDATION_BACKENDS = {
+    CacheInvalidationBackend.MEMORY: MemoryInvalidationBackend,
+    CacheInvalidationBackend.POSTGRES: PostgresInvalidationBackend,
+}
+
+principal_cache: TTLCache[int, UserPrincipal] = TTLCache(
+    settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS
+)
+invalidation_backend = INVALIDATION_BACKENDS[settings.AUTH_CACHE_INVALIDATION_BACKEND]()
+
+
+def invalidate_principal(user_id: Optional[int] = None) -> None:
+    """
+    Invalida en el proceso actual la entrada de un usuario (o toda la caché).
+    Para escrituras que no pasan por el ORM (ej. UPDATE masivos) en varios workers,
+    usar `publish_invalidation` dentro de la transacción.
+    """
+    if user_id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate(user_id)
+
+
+def publish_invalidation(session: Session, user_id: Optional[int] = None) -> None:
+    """
+    Registra la invalidación de un usuario (o de todos) en la transacción de `session`.
+    Se aplica localmente y se propaga a los demás workers solo si la transacción se confirma.
+    """
+    payload = INVALIDATE_ALL if user_id is None else str(user_id)
+    session.info.setdefault(_PENDING_KEY, set()).add(payload)
+    invalidation_backend.publish(session, [payload])
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session: Session, flush_context) -> None:
+    """Registra la invalidación de los usuarios modificados o eliminados en el flush."""
+    payloads = {
+        str(obj.id) for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+        and (obj in session.deleted or session.is_modified(obj, include_collections=False))
+    }
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    payloads -= pending
+    if payloads:
+        pending.update(payloads)
+        invalidation_backend.publish(session, payloads)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    for payload in session.info.pop(_PENDING_KEY, ()):
+        invalidate_principal(None if payload == INVALIDATE_ALL else int(payload))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
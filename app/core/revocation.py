@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import math
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import settings
+from app.core.logging import logger
+
+"""
+Filtro de revocación de tokens en memoria.
+
+En el modo de principal por claims la petición no consulta la base de datos, por lo que
+la revocación (logout, cuenta deshabilitada) se comprueba contra un filtro de Bloom
+reconstruido periódicamente desde la tabla `revoked_tokens`. El filtro no tiene falsos
+negativos: si responde que un token no está revocado, no lo está (dentro del intervalo
+de refresco). Sus positivos se confirman con una consulta exacta.
+"""
+
+# Capacidad mínima del filtro, para no reconstruirlo por unas pocas revocaciones locales
+MIN_CAPACITY = 1024
+
+
+def jti_key(jti: str) -> str:
+    """Clave del filtro para la revocación de un token concreto."""
+    return f"jti:{jti}"
+
+
+def user_key(user_id: int) -> str:
+    """Clave del filtro para la revocación de todos los tokens de un usuario."""
+    return f"user:{user_id}"
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre un bytearray. Las k posiciones de cada clave se derivan de un
+    único hash blake2b de 128 bits mediante doble hashing (h1 + i * h2).
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        capacity = max(capacity, 1)
+        # Tamaño y número de hashes óptimos para la capacidad y tasa de error dadas
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenRevocationFilter:
+    """
+    Conjunto de revocaciones consultado en cada petición autenticada.
+
+    Se reconstruye completo cada AUTH_REVOCATION_REFRESH_SECONDS (así las revocaciones
+    vencidas salen del filtro y las de otros workers entran en él) y recibe
+    inmediatamente las revocaciones hechas en el proceso actual.
+    """
+
+    def __init__(self, false_positive_rate: float, refresh_seconds: float):
+        self.false_positive_rate = false_positive_rate
+        self.refresh_seconds = refresh_seconds
+        self._filter = BloomFilter(MIN_CAPACITY, false_positive_rate)
+        self._task: Optional[asyncio.Task] = None
+        # Reconstrucciones en curso y claves añadidas durante ellas: la instantánea leída
+        # de la base de datos puede no incluirlas, por lo que se vuelven a añadir al sustituir
+        self._rebuilds = 0
+        self._added_during_rebuild: list[str] = []
+        self.loaded_at: Optional[float] = None
+        self.checks = 0
+        self.positives = 0
+        self.confirmed = 0
+
+    def replace(self, keys: Iterable[str]) -> None:
+        """Sustituye el filtro por uno nuevo construido con `keys`."""
+        keys = list(keys)
+        # El doble de capacidad deja margen para las revocaciones locales hasta el próximo refresco
+        bloom = BloomFilter(max(2 * len(keys), MIN_CAPACITY), self.false_positive_rate)
+        for key in keys:
+            bloom.add(key)
+        self._filter = bloom
+        self.loaded_at = time.monotonic()
+
+    def add(self, key: str) -> None:
+        """Incorpora una revocación (local o notificada por otro worker) sin esperar al refresco."""
+        self._filter.add(key)
+        if self._rebuilds:
+            self._added_during_rebuild.append(key)
+
+    async def rebuild(self, load: Callable[[], Awaitable[Iterable[str]]]) -> None:
+        """
+        Sustituye el filtro por las claves que devuelve `load`, conservando las añadidas
+        con `add` mientras se leían (ej. un logout entre la lectura y la sustitución).
+        """
+        self._rebuilds += 1
+        try:
+            keys = list(await load())
+            self.replace([*keys, *self._added_during_rebuild])
+        finally:
+            self._rebuilds -= 1
+            if not self._rebuilds:
+                self._added_during_rebuild.clear()
+
+    def might_be_revoked(self, jti: Optional[str], user_id: int) -> bool:
+        """
+        True si el token podría estar revocado (debe confirmarse en la base de datos);
+        False garantiza que no lo está según el último refresco.
+        """
+        self.checks += 1
+        bloom = self._filter
+        positive = user_key(user_id) in bloom or (jti is not None and jti_key(jti) in bloom)
+        if positive:
+            self.positives += 1
+        return positive
+
+    async def refresh(
+        self,
+        session_factory: async_sessionmaker,
+        load_keys: Callable[[AsyncSession], Awaitable[Iterable[str]]]
+    ) -> None:
+        """Reconstruye el filtro con las revocaciones vigentes de la base de datos."""
+        async def load() -> Iterable[str]:
+            async with session_factory() as db:
+                return await load_keys(db)
+
+        await self.rebuild(load)
+
+    async def start(
+        self,
+        session_factory: async_sessionmaker,
+        load_keys: Callable[[AsyncSession], Awaitable[Iterable[str]]]
+    ) -> None:
+        """Carga el filtro y programa su reconstrucción periódica en segundo plano."""
+        await self.refresh(session_factory, load_keys)
+        logger.info("Filtro de revocación de tokens cargado", entries=self._filter.count)
+
+        async def refresh_periodically() -> None:
+            while True:
+                await asyncio.sleep(self.refresh_seconds)
+                try:
+                    await self.refresh(session_factory, load_keys)
+                except Exception as e:
+                    # Se conserva el filtro anterior; se reintenta en el siguiente intervalo
+                    logger.error(f"Error al refrescar el filtro de revocación: {e}")
+
+        self._task = asyncio.create_task(refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        """Ocupación del filtro y resultado de las comprobaciones."""
+        return {
+            "entries": self._filter.count,
+            "capacity": self._filter.capacity,
+            "size_bytes": len(self._filter._bits),
+            "hash_count": self._filter.hash_count,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 3) if self.loaded_at is not None else None,
+            "checks": self.checks,
+            "positives": self.positives,
+            "confirmed": self.confirmed,
+        }
+
+
+revocation_filter = TokenRevocationFilter(
+    settings.AUTH_REVOCATION_FALSE_POSITIVE_RATE, settings.AUTH_REVOCATION_REFRESH_SECONDS
+)
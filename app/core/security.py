@@ -1,32 +1,111 @@
+import time
+import uuid
 from datetime import datetime, timedelta
+from typing import Optional
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.hashing import password_executor
+from app.core.logging import logger
 
 # Configuración para el hashing de contraseñas utilizando bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Rango de la calibración del coste de bcrypt (cada ronda adicional duplica el tiempo)
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifica si una contraseña en texto plano coincide con su hash almacenado.
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verifica la contraseña y, si es correcta y su hash usa un coste distinto del
+    configurado, devuelve también el nuevo hash a persistir (None si no hace falta).
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """
     Genera un hash seguro para una contraseña utilizando bcrypt.
     """
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Versión asíncrona de `verify_password`. bcrypt es deliberadamente costoso en CPU,
+    por lo que se ejecuta en el executor acotado de hashing, fuera del bucle de eventos
+    y del threadpool compartido por el resto de la API.
+    """
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Versión asíncrona de `verify_and_update_password`, ejecutada en el executor de hashing."""
+    return await password_executor.run(verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Versión asíncrona de `get_password_hash`, ejecutada en el executor de hashing."""
+    return await password_executor.run(get_password_hash, password)
+
+def measure_bcrypt_ms(rounds: int, samples: int = 2) -> float:
+    """Milisegundos de un hash bcrypt con `rounds` en esta máquina (el mejor de `samples`)."""
+    handler = pwd_context.handler("bcrypt").using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("calibración")
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+def calibrate_bcrypt_rounds(target_ms: float) -> int:
+    """
+    Mayor coste de bcrypt cuyo hash no supera `target_ms` en esta máquina, dentro de
+    [BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS]. La medición se detiene al superar el objetivo.
+    """
+    rounds = BCRYPT_MIN_ROUNDS
+    for candidate in range(BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS + 1):
+        elapsed_ms = measure_bcrypt_ms(candidate)
+        logger.info("Coste de bcrypt medido", rounds=candidate, ms=round(elapsed_ms, 1))
+        if elapsed_ms > target_ms:
+            break
+        rounds = candidate
+    return rounds
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """
+    Fija el coste de los nuevos hashes. Al fijar también el mínimo y el máximo,
+    `verify_and_update_password` recalcula los hashes con cualquier otro coste.
+    """
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds)
+
+async def configure_bcrypt_rounds() -> Optional[int]:
+    """
+    Aplica BCRYPT_ROUNDS o, si no está definido y BCRYPT_CALIBRATE_ON_STARTUP está activo,
+    calibra el coste para BCRYPT_TARGET_MS. Devuelve el coste aplicado (None si se
+    mantiene el de passlib, sin forzar el recálculo de hashes existentes).
+    """
+    rounds = settings.BCRYPT_ROUNDS
+    if rounds is None and settings.BCRYPT_CALIBRATE_ON_STARTUP:
+        rounds = await password_executor.run(calibrate_bcrypt_rounds, settings.BCRYPT_TARGET_MS)
+    if rounds is not None:
+        set_bcrypt_rounds(rounds)
+        logger.info("Coste de bcrypt configurado", rounds=rounds)
+    return rounds
+
 def create_access_token(data: dict) -> str:
     """
     Crea un token de acceso JWT con un tiempo de expiración configurado.
+    Cada token lleva un identificador único (jti) que permite revocarlo individualmente.
     
     Args:
         data: Diccionario con los claims (ej. sub) a incluir en el token.
     """
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "iss": "Prueba Logika"})
+    now = datetime.utcnow()
+    expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex, "iss": "Prueba Logika"})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
@@ -1,3 +1,10 @@
+import base64
+import hashlib
+import json
+from typing import Any, Optional
+import orjson
+
+
 def sanitize_pagination(page: int, page_size: int) -> tuple[int, int]:
     """
     Sanitiza y valida los parámetros de paginación.
@@ -21,3 +28,74 @@ def sanitize_pagination(page: int, page_size: int) -> tuple[int, int]:
         page_size = 100
         
     return page, page_size
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """
+    Codifica la posición de un registro como un cursor opaco (base64 url-safe).
+
+    Args:
+        values: Valores de las claves de ordenamiento del último registro devuelto.
+            Deben ser serializables en JSON.
+
+    Returns:
+        Cadena opaca que el cliente debe reenviar sin modificar.
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """
+    Decodifica un cursor generado por `encode_cursor`.
+
+    Raises:
+        ValueError: Si el cursor está malformado o no contiene una lista.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Cursor malformado") from e
+
+    if not isinstance(values, list):
+        raise ValueError("Cursor malformado")
+    return values
+
+
+def dump_json_bytes(value: Any) -> bytes:
+    """
+    Serializa a JSON con orjson (dataclasses, fechas y enums incluidos). Las fechas en
+    UTC terminan en `Z`, igual que en la serialización de Pydantic.
+    """
+    return orjson.dumps(value, option=orjson.OPT_UTC_Z)
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Genera un ETag fuerte (entre comillas) a partir de los valores que identifican
+    una versión concreta de un recurso.
+    """
+    raw = "|".join(str(part) for part in parts).encode("utf-8")
+    return '"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = False) -> bool:
+    """
+    Indica si el valor de una cabecera If-None-Match / If-Match coincide con `etag`.
+
+    Admite listas separadas por comas y el comodín `*`. Con `weak=True` se ignora
+    el prefijo `W/` (comparación débil, la que usa If-None-Match); If-Match exige
+    comparación fuerte.
+    """
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if weak and candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -1,13 +1,15 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.models.task import Task
 from app.core.config import settings
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from app.core.logging import logger
 from app.core.enums import TaskStatus
+from app.services.task_count import TaskCountService
 import random
 
-def init_db(db: Session) -> None:
+async def init_db(db: AsyncSession) -> None:
     """
     Inicializa la base de datos con datos semilla (usuarios y tareas).
     
@@ -37,16 +39,16 @@ def init_db(db: Session) -> None:
     
     db_users = []
     for u_data in seed_users:
-        user = db.query(User).filter(User.email == u_data["email"]).first()
+        user = (await db.execute(select(User).where(User.email == u_data["email"]))).scalars().first()
         if not user:
             user = User(
                 email=u_data["email"],
-                hashed_password=get_password_hash(u_data["password"]),
+                hashed_password=await get_password_hash_async(u_data["password"]),
                 full_name=u_data["full_name"]
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             logger.info(f"Usuario semilla creado: {user.email}")
         else:
             logger.info(f"Usuario {user.email} ya existe")
@@ -54,7 +56,7 @@ def init_db(db: Session) -> None:
 
     # 2. Semillas de Tareas
     # Solo inyectar si la base de datos está vacía o tiene pocos registros
-    task_count = db.query(Task).count()
+    task_count = await db.scalar(select(func.count()).select_from(Task))
     if task_count < 20:
         logger.info(f"Inyectando tareas (actual: {task_count})...")
         
@@ -89,15 +91,18 @@ def init_db(db: Session) -> None:
             # Estado aleatorio para variedad visual en la app
             status = random.choice([TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.DONE])
             
+            # Las semillas no pasan por TaskService, por lo que se mantienen los contadores aquí
             new_task = Task(
                 title=title,
                 description=desc,
                 status=status,
-                user_id=owner.id
+                user_id=owner.id,
+                change_version=await TaskCountService.bump_version(db, owner.id)
             )
             db.add(new_task)
+            await TaskCountService.adjust(db, owner.id, {status: 1})
         
-        db.commit()
+        await db.commit()
         logger.info(f"{len(tareas_data)} tareas inyectadas exitosamente.")
     else:
         logger.info("Ya existen suficientes tareas en la base de datos.")
@@ -0,0 +1,250 @@
+import re
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import RequestQueryStats, registry, current_request_queries
+from app.db.pool import pool_status
+from app.db.session import ENGINES
+
+"""
+Instrumentación de los engines con eventos de SQLAlchemy.
+
+Cada sentencia enviada al driver se mide entre `before_cursor_execute` y
+`after_cursor_execute`: se acumula en las métricas por engine y en las estadísticas de
+la petición HTTP en curso (ContextVar de `app.core.metrics`, que se propaga al greenlet
+de SQLAlchemy). Los eventos se ejecutan en el bucle de eventos, sin coste de E/S.
+
+Sobre la misma medición se vigilan las regresiones de consultas: las sentencias que
+superan DB_SLOW_QUERY_MS se registran normalizadas junto al endpoint que las originó,
+las que se repiten DB_N_PLUS_ONE_THRESHOLD veces en una petición se señalan como posible
+N+1 y `QueryWatchMiddleware` compara cada petición con DB_QUERY_BUDGET (advierte, o falla
+con DB_QUERY_BUDGET_ENFORCE en las pruebas; ver también `query_budget`).
+
+Los eventos se registran al arrancar la aplicación (`instrument_engines`); los gauges de
+los pools se calculan al exponer las métricas.
+"""
+
+db_queries_total = registry.counter(
+    "db_queries_total", "Sentencias ejecutadas por engine.", ("engine",)
+)
+db_query_duration_seconds = registry.histogram(
+    "db_query_duration_seconds", "Duración de cada sentencia en la base de datos, por engine.", ("engine",)
+)
+db_query_errors_total = registry.counter(
+    "db_query_errors_total", "Sentencias que terminaron con error, por engine.", ("engine",)
+)
+db_slow_queries_total = registry.counter(
+    "db_slow_queries_total", "Sentencias que superaron DB_SLOW_QUERY_MS, por engine.", ("engine",)
+)
+db_repeated_statements_total = registry.counter(
+    "db_repeated_statements_total", "Sentencias señaladas como posible N+1, por endpoint.", ("endpoint",)
+)
+
+# Literales (cadenas y números) y listas de parámetros de IN expandidas (ej. asyncpg: `$1::INTEGER`)
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+(?:::\w+)?|:\w+)"
+_PARAMETER_LIST = re.compile(rf"\((?:\s*{_PLACEHOLDER}\s*,)+\s*{_PLACEHOLDER}\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+# Clave en `connection.info` con los inicios de las sentencias en curso (pila, por si
+# una sentencia dispara otra en la misma conexión)
+QUERY_START_KEY = "query_started_at"
+
+# Engines ya instrumentados y métricas de pools ya registradas (el evento de inicio
+# puede ejecutarse más de una vez por proceso)
+_instrumented: set[str] = set()
+_pool_metrics_registered = False
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Una petición (o un bloque `query_budget`) ejecutó más consultas que su presupuesto."""
+
+    def __init__(self, endpoint: Optional[str], count: int, budget: int):
+        self.detail = f"{endpoint or 'Bloque'} ejecutó {count} consultas (presupuesto: {budget})"
+        super().__init__(self.detail)
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """
+    Sentencia en una línea, sin literales y con las listas de parámetros colapsadas, de modo
+    que las ejecuciones de una misma consulta compartan texto (ej. `IN (?, ?, ?)` -> `IN (?)`).
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _PARAMETER_LIST.sub("(?)", normalized)
+    return _LITERAL.sub("?", normalized)
+
+
+def _record_statement(queries: RequestQueryStats, statement: str, name: str) -> None:
+    normalized = normalize_sql(statement)
+    repeated = queries.statements.get(normalized, 0) + 1
+    queries.statements[normalized] = repeated
+    # Se advierte una sola vez por sentencia y petición, al alcanzar el umbral
+    if repeated == settings.DB_N_PLUS_ONE_THRESHOLD:
+        endpoint = queries.endpoint()
+        db_repeated_statements_total.inc(endpoint or "")
+        logger.warning(
+            "Posible consulta N+1: sentencia repetida en la petición",
+            engine=name, endpoint=endpoint, repetitions=repeated, statement=normalized
+        )
+
+
+def warn_query_budget(queries: RequestQueryStats, budget: int) -> None:
+    """Registra una advertencia con las sentencias repetidas si `queries` superó el presupuesto."""
+    if queries.count <= budget:
+        return
+    logger.warning(
+        "Presupuesto de consultas superado",
+        endpoint=queries.endpoint(), queries=queries.count, budget=budget,
+        repeated={statement: count for statement, count in queries.statements.items() if count > 1}
+    )
+
+
+@contextmanager
+def query_budget(budget: int) -> Iterator[RequestQueryStats]:
+    """
+    Cuenta las consultas del bloque y lanza `QueryBudgetExceeded` si superan `budget`.
+    Pensado para las pruebas de servicios (ej. `with query_budget(2): await TaskService...`).
+    """
+    queries = RequestQueryStats()
+    token = current_request_queries.set(queries)
+    try:
+        yield queries
+    finally:
+        current_request_queries.reset(token)
+    if queries.count > budget:
+        raise QueryBudgetExceeded(None, queries.count, budget)
+
+
+class QueryWatchMiddleware:
+    """
+    Middleware ASGI que compara las consultas de cada petición con DB_QUERY_BUDGET. Usa
+    las estadísticas de `MetricsMiddleware` si se ejecuta dentro de él.
+
+    Con DB_QUERY_BUDGET_ENFORCE el presupuesto se comprueba al iniciar la respuesta: si se
+    superó, se envía un 500 en su lugar antes de que salga ningún byte. Las consultas
+    posteriores (respuestas en streaming) solo pueden advertirse al terminar.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        budget = settings.DB_QUERY_BUDGET
+        if scope["type"] != "http" or budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        queries = current_request_queries.get()
+        token = None
+        if queries is None:
+            queries = RequestQueryStats(scope)
+            token = current_request_queries.set(queries)
+        rejected = False
+
+        async def send_wrapper(message):
+            nonlocal rejected
+            if rejected:
+                return
+            if (
+                message["type"] == "http.response.start"
+                and settings.DB_QUERY_BUDGET_ENFORCE
+                and queries.count > budget
+            ):
+                rejected = True
+                error = QueryBudgetExceeded(queries.endpoint(), queries.count, budget)
+                logger.error("Presupuesto de consultas superado", endpoint=queries.endpoint(), error=error.detail)
+                response = JSONResponse(
+                    status_code=500,
+                    content={"success": False, "code": 500, "message": error.detail}
+                )
+                await response(scope, receive, send)
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                current_request_queries.reset(token)
+        if not rejected:
+            warn_query_budget(queries, budget)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Registra los eventos que miden las sentencias del engine con la etiqueta `name`."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(QUERY_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info[QUERY_START_KEY].pop()
+        db_queries_total.inc(name)
+        db_query_duration_seconds.observe(elapsed, name)
+        queries = current_request_queries.get()
+        if queries is not None:
+            queries.count += 1
+            queries.duration += elapsed
+            _record_statement(queries, statement, name)
+        if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+            db_slow_queries_total.inc(name)
+            logger.warning(
+                "Consulta lenta",
+                engine=name, duration_ms=round(elapsed * 1000, 1), statement=normalize_sql(statement),
+                endpoint=queries.endpoint() if queries is not None else None
+            )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get(QUERY_START_KEY) if context.connection is not None else None
+        if started:
+            started.pop()
+        db_query_errors_total.inc(name)
+
+
+def instrument_engines() -> None:
+    """
+    Instrumenta los engines de la aplicación que aún no lo estén y registra, una sola
+    vez, las métricas de sus pools. Se invoca en el arranque de la aplicación.
+    """
+    global _pool_metrics_registered
+    if not _pool_metrics_registered:
+        register_pool_metrics(ENGINES)
+        _pool_metrics_registered = True
+    for name, pooled_engine in ENGINES.items():
+        if name not in _instrumented:
+            instrument_engine(pooled_engine, name)
+            _instrumented.add(name)
+
+
+def register_pool_metrics(engines: dict[str, AsyncEngine]) -> None:
+    """Gauges de ocupación y contadores de espera de los pools de `engines`, calculados al exponer."""
+
+    def collect(key: str):
+        def samples():
+            return [((name,), pool_status(pooled_engine)[key]) for name, pooled_engine in engines.items()]
+        return samples
+
+    for key, metric, documentation, kind in (
+        ("size", "db_pool_size", "Tamaño base del pool de conexiones.", "gauge"),
+        ("checked_out", "db_pool_checked_out", "Conexiones del pool en uso.", "gauge"),
+        ("overflow", "db_pool_overflow", "Conexiones abiertas por encima del tamaño base (negativo si hay huecos).", "gauge"),
+        ("timeouts", "db_pool_timeouts_total", "Esperas por una conexión que terminaron en timeout.", "counter"),
+        ("wait_count", "db_pool_waits_total", "Conexiones obtenidas del pool.", "counter"),
+    ):
+        registry.gauge_callback(metric, documentation, ("pool",), collect(key), kind=kind)
+    registry.gauge_callback(
+        "db_pool_wait_seconds_total", "Tiempo total de espera por una conexión del pool.", ("pool",),
+        lambda: [((name,), pool_status(pooled_engine)["wait_sum_ms"] / 1000) for name, pooled_engine in engines.items()],
+        kind="counter"
+    )
+
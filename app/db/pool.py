@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Any
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.logging import logger
+from app.core.metrics import WaitStats
+
+"""
+Pool de conexiones instrumentado.
+
+Registra cuánto espera cada petición para obtener una conexión (histograma acumulado
+al estilo Prometheus) y cuántas esperas terminan en timeout, de modo que el agotamiento
+del pool sea visible en /health en lugar de aparecer solo como peticiones lentas.
+"""
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool que mide el tiempo de obtención de cada conexión (incluida
+    la espera por una conexión libre y el pre-ping) y cuenta los timeouts.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = WaitStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            logger.warning(
+                "Tiempo de espera agotado al obtener una conexión del pool",
+                pool=self.logging_name, size=self.size(), checked_out=self.checkedout(), overflow=self.overflow()
+            )
+            raise
+        self.stats.observe_wait((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self) -> "InstrumentedAsyncPool":
+        # Las estadísticas se conservan cuando el engine descarta el pool (dispose)
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def pool_status(engine: AsyncEngine) -> dict[str, Any]:
+    """Estado actual y estadísticas acumuladas del pool de un engine."""
+    pool = engine.sync_engine.pool
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(
+            timeouts=stats.timeouts,
+            wait_count=stats.wait_count,
+            wait_sum_ms=round(stats.wait_sum_ms, 3),
+            wait_ms_buckets=stats.wait_histogram(),
+        )
+    return status
+
+
+async def prewarm_pool(engine: AsyncEngine) -> int:
+    """
+    Abre en paralelo tantas conexiones como el tamaño base del pool y las devuelve,
+    para que las primeras peticiones no paguen el coste de conexión. Devuelve la
+    cantidad de conexiones abiertas.
+    """
+    size = engine.sync_engine.pool.size()
+    # Esperar cada AsyncConnection la inicia, obteniendo una conexión DBAPI del pool
+    connections = await asyncio.gather(*(engine.connect() for _ in range(size)))
+    for connection in connections:
+        await connection.close()
+    logger.info("Pool de conexiones precalentado", pool=engine.sync_engine.pool.logging_name, connections=size)
+    return size
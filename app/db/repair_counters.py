@@ -0,0 +1,38 @@
+import argparse
+import asyncio
+from typing import Optional
+from app.db.session import AsyncSessionLocal, dispose_engines
+from app.services.task_count import TaskCountService
+from app.core.logging import configure_logger, logger
+
+"""
+Tarea de reparación de los contadores de tareas por usuario y estado.
+
+Recalcula los contadores a partir de la tabla de tareas, por ejemplo tras una carga
+manual de datos o si se detecta una desviación. Uso:
+
+    python -m app.db.repair_counters [--user-id ID]
+"""
+
+async def repair_counters(user_id: Optional[int] = None) -> int:
+    """Recalcula los contadores de un usuario (o de todos) y devuelve la cantidad escrita."""
+    async with AsyncSessionLocal() as db:
+        try:
+            return await TaskCountService.rebuild(db, user_id)
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error al recalcular los contadores de tareas: {e}", user_id=user_id)
+            raise
+
+async def main(user_id: Optional[int] = None) -> None:
+    try:
+        await repair_counters(user_id)
+    finally:
+        await dispose_engines()
+
+if __name__ == "__main__":
+    configure_logger()
+    parser = argparse.ArgumentParser(description="Recalcula los contadores de tareas por usuario y estado.")
+    parser.add_argument("--user-id", type=int, default=None, help="Limita el recálculo a un usuario")
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id))
@@ -1,59 +1,113 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from typing import AsyncIterator
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from tenacity import retry, stop_after_attempt, wait_fixed, before_log, after_log, retry_if_exception_type
 import logging
 from sqlalchemy.exc import OperationalError
 from app.core.config import settings
 from app.core.logging import logger
+from app.db.pool import InstrumentedAsyncPool, prewarm_pool
 
 """
-Configuración de la conexión a la base de datos PostgreSQL utilizando SQLAlchemy.
-Incluye una política de reintentos para manejar fallos temporales de conexión durante el inicio.
+Configuración de la conexión asíncrona a la base de datos PostgreSQL utilizando SQLAlchemy
+(AsyncSession sobre asyncpg). Las peticiones esperan a la base de datos sin ocupar hilos
+del threadpool de Starlette. Incluye una política de reintentos para manejar fallos
+temporales de conexión durante el inicio.
+
+Se usan dos pools independientes y configurables desde Settings: uno para el tráfico de
+tareas y otro, más pequeño, para la autenticación (login y resolución del usuario del
+token), de modo que una ráfaga en uno no agote las conexiones del otro.
 """
 
 # Configuración de reintentos: 10 intentos con pausa de 4 segundos entre cada uno
 max_tries = 10
 wait_seconds = 4
 
+# Controlador asíncrono que se usa para cada motor admitido
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+def get_async_url(url: str) -> str:
+    """
+    Adapta la URL de conexión (ej. postgresql://... o postgresql+psycopg2://...) al
+    controlador asíncrono correspondiente. Alembic sigue usando la URL original.
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+def create_pooled_engine(name: str, pool_size: int, max_overflow: int):
+    """Crea un engine asíncrono con un pool instrumentado y la configuración común de Settings."""
+    return create_async_engine(
+        get_async_url(settings.DATABASE_URL),
+        poolclass=InstrumentedAsyncPool,
+        pool_logging_name=name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+# Inicialización única de los engines para toda la aplicación (no abren conexiones hasta su uso)
+engine = create_pooled_engine("tasks", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+auth_engine = create_pooled_engine("auth", settings.DB_AUTH_POOL_SIZE, settings.DB_AUTH_MAX_OVERFLOW)
+
+# Pools expuestos en /health, por nombre
+ENGINES = {"tasks": engine, "auth": auth_engine}
+
+# Fábricas de sesiones asíncronas. Sin expire_on_commit para poder leer las entidades
+# tras confirmar sin lanzar cargas implícitas (no permitidas en modo asíncrono)
+AsyncSessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+AuthSessionLocal = async_sessionmaker(bind=auth_engine, autoflush=False, expire_on_commit=False)
+
+# Clase base para la definición de modelosORM
+Base = declarative_base()
+
 @retry(
     stop=stop_after_attempt(max_tries),
     wait=wait_fixed(wait_seconds),
-    retry=retry_if_exception_type(OperationalError),
+    # asyncpg puede propagar errores de red sin envolver (ej. conexión rechazada)
+    retry=retry_if_exception_type((OperationalError, OSError)),
     before=before_log(logging.getLogger("tenacity.retry"), logging.INFO),
     after=after_log(logging.getLogger("tenacity.retry"), logging.WARN),
 )
-def get_engine():
+async def wait_for_database() -> None:
     """
-    Crea y verifica la conexión con el motor de la base de datos.
+    Verifica la conexión con la base de datos durante el arranque.
     Utiliza una política de reintentos para asegurar que la DB esté lista.
     """
     logger.info("Intentando conectar a la base de datos...")
-    engine = create_engine(settings.DATABASE_URL)
     try:
-        # Intento de conexión simple para verificar disponibilidad inmediata
-        with engine.connect() as connection:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
             logger.info("Conexión a la base de datos establecida exitosamente.")
-        return engine
     except Exception as e:
         logger.error(f"Fallo al conectar a la base de datos: {e}")
         raise e
 
-# Inicialización única del engine para toda la aplicación
-engine = get_engine()
+async def prewarm_pools() -> None:
+    """Abre las conexiones base de cada pool durante el arranque, si DB_POOL_PREWARM está activo."""
+    if not settings.DB_POOL_PREWARM:
+        return
+    for pooled_engine in ENGINES.values():
+        await prewarm_pool(pooled_engine)
 
-# Fábrica de sesiones para interactuar con la DB
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async def dispose_engines() -> None:
+    """Cierra las conexiones de todos los pools."""
+    for pooled_engine in ENGINES.values():
+        await pooled_engine.dispose()
 
-# Clase base para la definición de modelosORM
-Base = declarative_base()
-
-def get_db():
+async def get_db() -> AsyncIterator[AsyncSession]:
     """
     Generador de sesiones de base de datos para inyección de dependencias.
     Asegura que la sesión se cierre correctamente después de cada uso.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -21,3 +21,26 @@ class ExpiredTokenException(AuthenticationException):
     """Lanzada cuando un token JWT válido ha superado su fecha de expiración."""
     def __init__(self, detail: str = "El token ha expirado"):
         self.detail = detail
+
+class RevokedTokenException(AuthenticationException):
+    """Lanzada cuando el token fue revocado (cierre de sesión o cuenta deshabilitada)."""
+    def __init__(self, detail: str = "El token ha sido revocado"):
+        self.detail = detail
+
+class PasswordHashingSaturatedException(AuthenticationException):
+    """Lanzada cuando la cola de hashing de contraseñas está llena y el login se rechaza sin esperar."""
+    def __init__(self, detail: str = "Demasiados intentos de inicio de sesión simultáneos", retry_after: int = 1):
+        self.detail = detail
+        self.retry_after = retry_after
+
+class PasswordHashingTimeoutException(AuthenticationException):
+    """Lanzada cuando la verificación de la contraseña esperó en cola más de lo permitido."""
+    def __init__(self, detail: str = "Servicio de autenticación saturado", retry_after: int = 1):
+        self.detail = detail
+        self.retry_after = retry_after
+
+class LoginThrottledException(AuthenticationException):
+    """Lanzada cuando el email o la IP están bloqueados por demasiados intentos fallidos."""
+    def __init__(self, detail: str = "Demasiados intentos fallidos de inicio de sesión", retry_after: int = 1):
+        self.detail = detail
+        self.retry_after = retry_after
@@ -16,3 +16,28 @@ class NotTaskOwnerException(TaskException):
     """Lanzada cuando un usuario intenta acceder o modificar una tarea que pertenece a otro usuario."""
     def __init__(self, detail: str = "No tienes permisos para modificar este recurso"):
         self.detail = detail
+
+class InvalidCursorException(TaskException):
+    """Lanzada cuando el cursor de paginación enviado por el cliente no es válido."""
+    def __init__(self, detail: str = "El cursor de paginación no es válido"):
+        self.detail = detail
+
+class UnsupportedTaskQueryException(TaskException):
+    """Lanzada cuando la combinación de filtros y ordenamiento solicitada no está respaldada por un índice."""
+    def __init__(self, detail: str = "La combinación de filtros y ordenamiento no está soportada"):
+        self.detail = detail
+
+class BulkLimitExceededException(TaskException):
+    """Lanzada cuando una operación masiva supera la cantidad máxima de elementos permitida."""
+    def __init__(self, detail: str = "La operación masiva supera el máximo de elementos permitido"):
+        self.detail = detail
+
+class TaskPreconditionFailedException(TaskException):
+    """Lanzada cuando el ETag enviado en If-Match no corresponde a la versión actual de la tarea."""
+    def __init__(self, detail: str = "La tarea fue modificada por otra petición; vuelve a obtenerla antes de actualizarla"):
+        self.detail = detail
+
+class ImportTooLargeException(TaskException):
+    """Lanzada cuando el archivo de una importación supera el tamaño máximo permitido."""
+    def __init__(self, detail: str = "El archivo supera el tamaño máximo permitido para una importación"):
+        self.detail = detail
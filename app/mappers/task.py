@@ -1,8 +1,15 @@
 from app.models.task import Task
-from app.schemas.task import TaskCreateDTO, TaskResponseDTO
-from app.schemas.pagination import PaginatedResponse
+from app.schemas.task import TaskCreateDTO, TaskResponseDTO, TaskReadModel
+from app.schemas.pagination import PaginatedRead
+from app.core.enums import TaskStatus
+from dataclasses import fields
+from typing import Any, Optional, Sequence
 import math
 
+# Columnas de una fila proyectada que corresponden al modelo de lectura (las demás,
+# como el total de la ventana o la relevancia de la búsqueda, van al final)
+READ_MODEL_WIDTH = len(fields(TaskReadModel))
+
 class TaskMapper:
     """
     Transformador de datos entre entidades del dominio (ORM) y DTOs de la API.
@@ -10,44 +17,48 @@ class TaskMapper:
     """
 
     @staticmethod
-    def to_paginated_dto(items: list[Task], total: int, page: int, page_size: int) -> PaginatedResponse[TaskResponseDTO]:
-        """Convierte una lista de entidades en una respuesta paginada estructurada."""
-        dtos = [TaskResponseDTO.model_validate(item) for item in items]
-        total_pages = math.ceil(total / page_size) if page_size > 0 else 0
-        
-        return PaginatedResponse[TaskResponseDTO](
-            items=dtos,
+    def to_read_models(rows: Sequence[Sequence[Any]]) -> list[TaskReadModel]:
+        """
+        Convierte filas proyectadas (las columnas de TaskReadModel primero, en su orden)
+        en modelos de lectura, sin pasar por entidades ORM ni por la validación de Pydantic.
+        """
+        return [TaskReadModel(*row[:READ_MODEL_WIDTH]) for row in rows]
+
+    @staticmethod
+    def to_paginated_read(
+        items: list[TaskReadModel],
+        total: Optional[int],
+        page: Optional[int],
+        page_size: int,
+        next_cursor: Optional[str] = None
+    ) -> PaginatedRead[TaskReadModel]:
+        """Construye la respuesta paginada de solo lectura a partir de modelos de lectura."""
+        return PaginatedRead(
+            items=items,
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=TaskMapper._total_pages(total, page_size),
+            next_cursor=next_cursor
         )
 
     @staticmethod
-    def to_entity(create_dto: TaskCreateDTO, user_id: int) -> Task:
-        """Crea una instancia de la entidad Task a partir de un DTO de creación."""
-        return Task(
-            title=create_dto.title,
-            description=create_dto.description,
-            status=create_dto.status,
-            user_id=user_id
-        )
+    def _total_pages(total: Optional[int], page_size: int) -> Optional[int]:
+        if total is None:
+            return None
+        return math.ceil(total / page_size) if page_size > 0 else 0
+
+    @staticmethod
+    def to_insert_values(create_dto: TaskCreateDTO, user_id: int) -> dict:
+        """Convierte un DTO de creación en los valores de una fila para un INSERT masivo."""
+        return {
+            "title": create_dto.title,
+            "description": create_dto.description,
+            "status": create_dto.status or TaskStatus.PENDING,
+            "user_id": user_id,
+        }
 
     @staticmethod
     def to_dto(entity: Task) -> TaskResponseDTO:
         """Convierte una entidad individual en un DTO de respuesta."""
         return TaskResponseDTO.model_validate(entity)
-
-    @staticmethod
-    def update_entity(entity: Task, update_dto) -> Task:
-        """
-        Aplica los cambios de un DTO de actualización sobre una entidad existente.
-        Solo actualiza los campos que no son None en el DTO.
-        """
-        if update_dto.title is not None:
-            entity.title = update_dto.title
-        if update_dto.description is not None:
-            entity.description = update_dto.description
-        if update_dto.status is not None:
-            entity.status = update_dto.status
-        return entity
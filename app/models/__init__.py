@@ -1,4 +1,8 @@
 from app.models.user import User
 from app.models.task import Task
+from app.models.task_counter import TaskStatusCounter, TaskListVersion
+from app.models.task_import import TaskImport
+from app.models.revoked_token import RevokedToken
+from app.models.login_throttle import LoginThrottleState
 
-__all__ = ["User", "Task"]
+__all__ = ["User", "Task", "TaskStatusCounter", "TaskListVersion", "TaskImport", "RevokedToken", "LoginThrottleState"]
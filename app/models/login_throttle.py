@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Float, Integer, String, JSON
+from app.db.session import Base
+
+class LoginThrottleState(Base):
+    """
+    Estado compartido de la limitación de intentos de login, asociado a la tabla
+    'login_throttle_states'. Solo se usa con LOGIN_THROTTLE_STORE=postgres.
+
+    Los instantes se guardan como segundos epoch (time.time()), igual que en el
+    almacén en memoria, para que ambos compartan la lógica de la ventana deslizante.
+    """
+    __tablename__ = "login_throttle_states"
+
+    # Clave del contador (ej. "email:juan@example.com" o "ip:10.0.0.1")
+    key = Column(String, primary_key=True)
+    # Instantes de los fallos dentro de la ventana
+    failures = Column(JSON, nullable=False, default=list)
+    locked_until = Column(Float, nullable=False, default=0)
+    # Bloqueos consecutivos: determinan la duración exponencial del siguiente
+    lockouts = Column(Integer, nullable=False, default=0)
+    # A partir de este instante el registro puede descartarse
+    expires_at = Column(Float, nullable=False, index=True)
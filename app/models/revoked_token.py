@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class RevokedToken(Base):
+    """
+    Revocación de tokens de acceso, asociada a la tabla 'revoked_tokens'.
+
+    Con `jti` se revoca un token concreto (ej. logout) hasta su expiración; sin `jti`
+    se revocan todos los tokens del usuario (ej. cuenta deshabilitada) hasta que se
+    elimine el registro. A partir de esta tabla se reconstruye el filtro de revocación
+    que se consulta en memoria en cada petición.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String, unique=True, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Expiración del token revocado; a partir de ella el registro puede depurarse
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Enum, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 from app.core.enums import TaskStatus
 from sqlalchemy.sql import func
@@ -10,6 +10,13 @@ class Task(Base):
     Asociado a la tabla 'tasks'.
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Índice compuesto que respalda el listado por propietario ordenado por
+        # (created_at, id), tanto en modo página como en modo cursor (keyset)
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Respalda la sincronización incremental (GET /tasks/changes) por versión de cambio
+        Index("ix_tasks_user_id_change_version_id", "user_id", "change_version", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -22,6 +29,40 @@ class Task(Base):
     # Sellos de tiempo automáticos
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Versión del listado del usuario (task_list_versions) en la que se escribió la tarea
+    # por última vez. A diferencia de updated_at, se asigna también al crearla y sigue el
+    # orden de confirmación de las transacciones del usuario.
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0")
     
     # Navegación hacia el propietario
     owner = relationship("User", back_populates="tasks")
+
+
+# Índices compuestos para los filtros y ordenamientos admitidos en el listado.
+# Se declaran fuera de la clase porque algunos se construyen sobre expresiones.
+Index("ix_tasks_user_id_modified_at_id", Task.user_id, func.coalesce(Task.updated_at, Task.created_at), Task.id)
+Index("ix_tasks_user_id_title_id", Task.user_id, Task.title, Task.id)
+Index("ix_tasks_user_id_status_created_at_id", Task.user_id, Task.status, Task.created_at, Task.id)
+Index("ix_tasks_user_id_status_modified_at_id", Task.user_id, Task.status, func.coalesce(Task.updated_at, Task.created_at), Task.id)
+Index("ix_tasks_user_id_has_description_created_at_id", Task.user_id, Task.description.isnot(None), Task.created_at, Task.id)
+
+
+# Búsqueda de texto completo en SQLite (entornos de prueba): tabla virtual FTS5 con
+# contenido externo sincronizada mediante triggers. En PostgreSQL la búsqueda usa la
+# columna generada `search_vector` creada por Alembic.
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Task.__table__, "before_drop", DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"))
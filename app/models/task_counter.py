@@ -0,0 +1,31 @@
+from sqlalchemy import BigInteger, Column, Integer, Enum, ForeignKey
+from app.core.enums import TaskStatus
+from app.db.session import Base
+
+class TaskStatusCounter(Base):
+    """
+    Contador desnormalizado de tareas por usuario y estado.
+    Asociado a la tabla 'task_status_counters'.
+
+    Se actualiza en la misma transacción que las escrituras de TaskService, lo que
+    permite obtener el resumen por estado y el total de tareas activas sin recorrer
+    la tabla de tareas. Puede recalcularse con app/db/repair_counters.py.
+    """
+    __tablename__ = "task_status_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    status = Column(Enum(TaskStatus, values_callable=lambda x: [e.value for e in x]), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class TaskListVersion(Base):
+    """
+    Versión del conjunto de tareas de cada usuario.
+    Asociado a la tabla 'task_list_versions'.
+
+    Se incrementa en la misma transacción que cualquier escritura sobre las tareas
+    del usuario y se usa para calcular el ETag de los listados sin ejecutarlos.
+    """
+    __tablename__ = "task_list_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
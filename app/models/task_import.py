@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy.sql import func
+from app.core.enums import TaskImportFormat, TaskImportStatus
+from app.db.session import Base
+
+class TaskImport(Base):
+    """
+    Registro de una importación masiva de tareas y de su progreso.
+    Asociado a la tabla 'task_imports'.
+
+    Los contadores se confirman al terminar cada lote, por lo que pueden
+    consultarse mientras la importación sigue en curso. Una importación en curso
+    sin progreso durante TASK_IMPORT_STALE_SECONDS se considera interrumpida.
+    """
+    __tablename__ = "task_imports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    format = Column(Enum(TaskImportFormat, values_callable=lambda x: [e.value for e in x]), nullable=False)
+    status = Column(Enum(TaskImportStatus, values_callable=lambda x: [e.value for e in x]), nullable=False, default=TaskImportStatus.PROCESSING)
+
+    # Progreso: filas leídas, insertadas y rechazadas hasta el momento
+    total_rows = Column(Integer, nullable=False, default=0)
+    imported_rows = Column(Integer, nullable=False, default=0)
+    rejected_rows = Column(Integer, nullable=False, default=0)
+
+    # Ruta del archivo NDJSON con las filas rechazadas (si las hubo)
+    rejected_path = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Se actualiza con cada lote confirmado; sirve para detectar importaciones interrumpidas
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
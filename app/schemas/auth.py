@@ -1,5 +1,5 @@
 from typing import Generic, TypeVar, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 """
 Esquemas comunes para la estandarización de respuestas y autenticación.
@@ -33,3 +33,14 @@ class TokenResponse(BaseModel):
     """Esquema para la entrega del token JWT generado."""
     access_token: str
     token_type: str
+
+class UserPrincipal(BaseModel):
+    """
+    Identidad del usuario autenticado que reciben los endpoints protegidos.
+    Es inmutable y no contiene la contraseña, por lo que puede conservarse en caché.
+    """
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    email: str
+    full_name: Optional[str] = None
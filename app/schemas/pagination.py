@@ -1,4 +1,5 @@
-from typing import Generic, TypeVar, List
+from dataclasses import dataclass
+from typing import Generic, TypeVar, List, Optional
 from pydantic import BaseModel
 
 T = TypeVar('T')
@@ -7,15 +8,36 @@ class PaginatedResponse(BaseModel, Generic[T]):
     """
     Estructura genérica para respuestas que incluyen paginación.
     
+    Soporta dos modos: por número de página (`page`) y por cursor (`cursor`).
+    En modo cursor `page` es nulo y el cliente avanza reenviando `next_cursor`.
+    `total` y `total_pages` son nulos cuando la estrategia de conteo es `none`.
+    
     Attributes:
         items: Lista de elementos de tipo T.
         total: Cantidad total de registros en la base de datos.
-        page: Página actual consultada.
+        page: Página actual consultada (nulo en modo cursor).
         page_size: Cantidad de registros por página.
         total_pages: Cálculo total de páginas disponibles.
+        next_cursor: Cursor opaco para obtener la siguiente página (nulo si no hay más).
+    """
+    items: List[T]
+    total: Optional[int] = None
+    page: Optional[int] = None
+    page_size: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+@dataclass(slots=True)
+class PaginatedRead(Generic[T]):
+    """
+    Variante de solo lectura de `PaginatedResponse` para los modelos de lectura
+    (ej. `TaskReadModel`): no valida sus campos y se serializa con orjson. Conserva los
+    mismos campos y en el mismo orden, por lo que produce el mismo JSON.
     """
     items: List[T]
-    total: int
-    page: int
+    total: Optional[int]
+    page: Optional[int]
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str]
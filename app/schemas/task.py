@@ -1,7 +1,8 @@
+from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict
-from app.core.enums import TaskStatus
+from pydantic import BaseModel, ConfigDict, model_validator
+from app.core.enums import TaskStatus, TaskImportFormat, TaskImportStatus
 
 """
 Esquemas Pydantic para la validación y serialización de datos de tareas.
@@ -19,6 +20,19 @@ class TaskUpdateDTO(BaseModel):
     description: Optional[str] = None
     status: Optional[TaskStatus] = None
 
+class TaskFilterDTO(BaseModel):
+    """
+    Filtros opcionales para el listado de tareas.
+    Los rangos de fechas son inclusivos en el extremo inicial y exclusivos en el final.
+    `updated_*` se evalúa sobre la fecha de última modificación (creación si nunca se actualizó).
+    """
+    status: Optional[list[TaskStatus]] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    updated_from: Optional[datetime] = None
+    updated_to: Optional[datetime] = None
+    has_description: Optional[bool] = None
+
 class TaskResponseDTO(BaseModel):
     """Esquema para la respuesta detallada de una tarea."""
     id: int
@@ -31,3 +45,102 @@ class TaskResponseDTO(BaseModel):
 
     # Permite crear el DTO directamente desde un objeto ORM de SQLAlchemy
     model_config = ConfigDict(from_attributes=True)
+
+@dataclass(slots=True)
+class TaskReadModel:
+    """
+    Proyección de solo lectura de una tarea para los listados. Se construye directamente
+    desde las columnas seleccionadas (sin entidad ORM ni validación de Pydantic) y se
+    serializa con orjson. Los campos siguen el orden de TaskResponseDTO, de modo que el
+    JSON resultante es el mismo.
+    """
+    id: int
+    title: str
+    description: Optional[str]
+    status: TaskStatus
+    user_id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+class TaskBulkItemErrorDTO(BaseModel):
+    """Errores de validación de un elemento de una operación masiva."""
+    index: int
+    errors: list[str]
+
+class TaskBulkCreateResponseDTO(BaseModel):
+    """Resultado de una creación masiva: tareas creadas y elementos rechazados por posición."""
+    created: list[TaskResponseDTO]
+    errors: list[TaskBulkItemErrorDTO]
+
+class TaskBulkSelectionDTO(BaseModel):
+    """
+    Selección de tareas para una operación masiva: una lista de ids o un filtro,
+    pero no ambos. Siempre se limita a las tareas del usuario autenticado.
+    """
+    ids: Optional[list[int]] = None
+    filters: Optional[TaskFilterDTO] = None
+
+    @model_validator(mode="after")
+    def check_single_selector(self) -> "TaskBulkSelectionDTO":
+        if (self.ids is None) == (self.filters is None):
+            raise ValueError("Debe indicarse exactamente uno de 'ids' o 'filters'")
+        return self
+
+class TaskBulkUpdateDTO(TaskBulkSelectionDTO):
+    """Actualización masiva: selección de tareas y cambios a aplicar sobre todas ellas."""
+    changes: TaskUpdateDTO
+
+    @model_validator(mode="after")
+    def check_changes(self) -> "TaskBulkUpdateDTO":
+        if not self.changes.model_dump(exclude_none=True):
+            raise ValueError("Debe indicarse al menos un campo en 'changes'")
+        return self
+
+class TaskBulkResultDTO(BaseModel):
+    """
+    Resultado de una actualización o borrado masivo.
+    `missing_ids` contiene los ids solicitados que no existen, ya fueron eliminados
+    o pertenecen a otro usuario (solo en selección por ids).
+    """
+    affected_ids: list[int]
+    missing_ids: list[int]
+
+class TaskImportResponseDTO(BaseModel):
+    """
+    Estado y progreso de una importación masiva.
+    Las filas rechazadas pueden descargarse en NDJSON si `rejected_rows` es mayor que cero.
+    """
+    id: int
+    format: TaskImportFormat
+    status: TaskImportStatus
+    total_rows: int
+    imported_rows: int
+    rejected_rows: int
+    error: Optional[str]
+    created_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+class TaskSummaryDTO(BaseModel):
+    """Cantidad de tareas activas del usuario por estado y su total."""
+    pending: int
+    in_progress: int
+    done: int
+    total: int
+
+class TaskTombstoneDTO(BaseModel):
+    """Marca de una tarea eliminada (soft delete) dentro de una sincronización incremental."""
+    id: int
+    deleted_at: Optional[datetime]
+
+class TaskChangesDTO(BaseModel):
+    """
+    Cambios de las tareas del usuario desde un token de sincronización.
+    `sync_token` debe reenviarse en `since` para continuar; si `has_more` es verdadero
+    quedan cambios pendientes y conviene pedir la siguiente página de inmediato.
+    """
+    changed: list[TaskResponseDTO]
+    deleted: list[TaskTombstoneDTO]
+    sync_token: str
+    has_more: bool
@@ -1,10 +1,13 @@
-from sqlalchemy.orm import Session
-from app.core.security import verify_password, create_access_token
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import verify_and_update_password_async, create_access_token
 from app.models.user import User
 from app.exceptions.auth import InvalidCredentialsException, UserNotFoundException
+from app.core.login_throttle import login_throttle
 from app.core.logging import logger
 
-def authenticate_user(db: Session, email: str, password: str) -> str:
+async def authenticate_user(db: AsyncSession, email: str, password: str, ip: Optional[str] = None) -> str:
     """
     Valida las credenciales de un usuario y genera un token de acceso.
     
@@ -12,24 +15,41 @@ def authenticate_user(db: Session, email: str, password: str) -> str:
         db: Sesión de base de datos.
         email: Correo electrónico del usuario.
         password: Contraseña en texto plano.
+        ip: Dirección del cliente, para limitar los intentos fallidos por IP.
         
     Returns:
         Token JWT de acceso si las credenciales son válidas.
         
     Raises:
+        LoginThrottledException: Si el email o la IP están bloqueados por intentos fallidos.
         UserNotFoundException: Si el email no está registrado.
         InvalidCredentialsException: Si la contraseña no coincide.
     """
-    user = db.query(User).filter(User.email == email).first()
+    # Los intentos bloqueados se rechazan antes de consultar la base de datos y de ejecutar bcrypt
+    await login_throttle.check(email, ip)
+
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     if not user:
         logger.warning("Fallo de autenticación: Usuario no encontrado", email=email)
+        await login_throttle.register_failure(email, ip)
         raise UserNotFoundException(detail="Usuario no encontrado")
         
-    if not verify_password(password, user.hashed_password):
+    # bcrypt se verifica fuera del bucle de eventos
+    valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not valid:
         logger.warning("Fallo de autenticación: Contraseña incorrecta", email=email)
+        await login_throttle.register_failure(email, ip)
         raise InvalidCredentialsException(detail="Contraseña invalida")
     
+    if new_hash is not None:
+        # El hash usa un coste distinto del configurado: se reemplaza con la contraseña ya verificada
+        user.hashed_password = new_hash
+        await db.commit()
+        logger.info("Hash de contraseña actualizado al coste configurado", user_id=user.id)
+
+    await login_throttle.register_success(email)
     logger.info("Usuario autenticado correctamente en el servicio", user_id=user.id, email=email)
     
-    # El 'sub' del token contiene el ID del usuario como cadena
-    return create_access_token(data={"sub": str(user.id)})
+    # El 'sub' del token contiene el ID del usuario como cadena; email y name permiten
+    # construir el principal desde el token (AUTH_PRINCIPAL_MODE=claims)
+    return create_access_token(data={"sub": str(user.id), "email": user.email, "name": user.full_name})
@@ -1,13 +1,37 @@
-from sqlalchemy.orm import Session
+from collections import Counter
+from typing import Any, AsyncIterator, Optional, Union
+from pydantic import ValidationError
+from sqlalchemy import Select, func, select, insert, update, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.task import Task
-from app.exceptions.task import TaskNotFoundException, TaskCreationException, NotTaskOwnerException
+from app.exceptions.task import (
+    TaskNotFoundException, TaskCreationException, NotTaskOwnerException, BulkLimitExceededException,
+    TaskPreconditionFailedException, InvalidCursorException
+)
 from app.mappers.task import TaskMapper
-from app.schemas.task import TaskCreateDTO, TaskResponseDTO
+from app.schemas.task import (
+    TaskCreateDTO, TaskResponseDTO, TaskReadModel, TaskFilterDTO, TaskBulkCreateResponseDTO, TaskBulkItemErrorDTO,
+    TaskBulkSelectionDTO, TaskBulkUpdateDTO, TaskBulkResultDTO, TaskSummaryDTO, TaskChangesDTO, TaskTombstoneDTO
+)
 from app.core.logging import logger
 from datetime import datetime
-from app.core.utils import sanitize_pagination
-from app.schemas.pagination import PaginatedResponse
-from app.core.enums import TaskStatus
+from app.core.utils import sanitize_pagination, make_etag, etag_matches, encode_cursor, decode_cursor, dump_json_bytes
+from app.schemas.pagination import PaginatedRead
+from app.core.enums import TaskStatus, CountStrategy
+from app.core.config import settings
+from app.services.task_count import TaskCountService
+from app.services.task_query import TaskQueryBuilder
+from app.services.task_search import TaskSearch
+
+# Identificador de los tokens de sincronización incremental
+SYNC_TOKEN_KIND = "changes"
+
+# Columnas de la respuesta: las devuelven con RETURNING las escrituras (para construir
+# TaskResponseDTO sin volver a leer la fila) y las proyectan las lecturas, en el orden
+# de TaskReadModel
+RESPONSE_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.status, Task.user_id, Task.created_at, Task.updated_at
+)
 
 class TaskService:
     """
@@ -16,51 +40,488 @@ class TaskService:
     """
 
     @staticmethod
-    def list_tasks(db: Session, page: int, page_size: int, user_id: int) -> PaginatedResponse[TaskResponseDTO]:
+    async def list_tasks(
+        db: AsyncSession,
+        page: int,
+        page_size: int,
+        user_id: int,
+        cursor: Optional[str] = None,
+        count_strategy: Optional[CountStrategy] = None,
+        filters: Optional[TaskFilterDTO] = None,
+        sort: Optional[str] = None
+    ) -> PaginatedRead[TaskReadModel]:
         """
         Obtiene una lista paginada de tareas que pertenecen específicamente al usuario autenticado.
+
+        Si se recibe un `cursor`, se usa paginación por keyset sobre las claves de
+        ordenamiento (más el id): la consulta salta directamente a la posición indicada
+        mediante el índice compuesto, por lo que el coste no crece con la profundidad
+        de la página. En caso contrario se usa la paginación clásica por `page` (OFFSET).
+
+        Los filtros y el ordenamiento (`sort`, por defecto `-created_at`) solo se aceptan
+        si existe un índice que los respalde; en caso contrario se lanza
+        UnsupportedTaskQueryException en lugar de recorrer la tabla.
+
+        El total se obtiene según `count_strategy` (por defecto la configurada en
+        `TASK_COUNT_STRATEGY`). La estrategia WINDOW no aplica en modo cursor, ya que
+        la ventana solo vería las filas posteriores al cursor, y COUNTER no aplica con
+        filtros; en ambos casos se recurre al conteo exacto.
+
+        La consulta proyecta solo las columnas de la respuesta y devuelve modelos de
+        lectura (TaskReadModel) que se serializan sin validación adicional.
         """
         page, page_size = sanitize_pagination(page, page_size)
-        
-        # Filtro por estado no eliminado y pertenencia al usuario
-        query = db.query(Task).filter(
-            Task.status != TaskStatus.DELETED,
-            Task.user_id == user_id
+        task_sort = TaskQueryBuilder.parse_sort(sort)
+        index = TaskQueryBuilder.find_index(filters, task_sort)
+
+        strategy = TaskService._resolve_count_strategy(
+            count_strategy, cursor, counter_applies=not TaskQueryBuilder.is_filtered(filters)
         )
         
-        total = query.count()
-        offset = (page - 1) * page_size
-        items = query.order_by(Task.created_at.desc()).offset(offset).limit(page_size).all()
+        # Filtro por estado no eliminado, pertenencia al usuario y filtros opcionales
+        conditions = TaskQueryBuilder.filter_conditions(user_id, filters)
+        query = select(Task).where(*conditions)
+
+        # Solo las columnas de la respuesta: filas compactas, sin entidades en el identity map
+        columns = list(RESPONSE_COLUMNS)
+        if strategy == CountStrategy.WINDOW:
+            # El total viaja como columna adicional de cada fila de la página
+            columns.append(func.count().over())
+        ordered = select(*columns).where(*conditions).order_by(*TaskQueryBuilder.order_by(task_sort))
+
+        if cursor is not None:
+            page = None
+            ordered = ordered.where(TaskQueryBuilder.keyset_condition(task_sort, cursor))
+        else:
+            ordered = ordered.offset((page - 1) * page_size)
+
+        # Se solicita un registro extra para saber si existe una página siguiente
+        rows = (await db.execute(ordered.limit(page_size + 1))).all()
+        total = await TaskService._page_total(db, query, user_id, strategy, rows, page)
+
+        items = TaskMapper.to_read_models(rows[:page_size])
+        next_cursor = None
+        if len(rows) > page_size:
+            next_cursor = TaskQueryBuilder.encode_next_cursor(task_sort, items[-1])
         
-        logger.info("Tareas listadas desde el servicio", user_id=user_id, count=len(items), total=total)
-        # Importación local para evitar dependencia circular
-        from app.mappers.task import TaskMapper
-        return TaskMapper.to_paginated_dto(items, total, page, page_size)
+        logger.info(
+            "Tareas listadas desde el servicio",
+            user_id=user_id, page=page, page_size=page_size, count=len(items), total=total,
+            count_strategy=strategy.value, sort=task_sort.spec, index=index.name
+        )
+        return TaskMapper.to_paginated_read(items, total, page, page_size, next_cursor)
+
+    @staticmethod
+    async def search_tasks(
+        db: AsyncSession,
+        q: str,
+        page: int,
+        page_size: int,
+        user_id: int,
+        cursor: Optional[str] = None,
+        count_strategy: Optional[CountStrategy] = None,
+        filters: Optional[TaskFilterDTO] = None
+    ) -> PaginatedRead[TaskReadModel]:
+        """
+        Busca por texto completo en el título y la descripción de las tareas del usuario.
+
+        Los resultados se ordenan por relevancia (y por id como desempate) y admiten
+        paginación por página o por cursor sobre (relevancia, id). El índice de texto
+        completo acota las filas candidatas, por lo que los filtros se aplican como
+        condiciones adicionales sin pasar por el catálogo de índices del listado.
+        """
+        page, page_size = sanitize_pagination(page, page_size)
+        search = TaskSearch(db.get_bind().dialect.name, q)
+        # Los contadores por usuario no conocen el término de búsqueda
+        strategy = TaskService._resolve_count_strategy(count_strategy, cursor, counter_applies=False)
+
+        conditions = TaskQueryBuilder.filter_conditions(user_id, filters)
+        query = search.apply(select(Task).where(*conditions))
+
+        columns = [*RESPONSE_COLUMNS, search.rank]
+        if strategy == CountStrategy.WINDOW:
+            columns.append(func.count().over())
+        ordered = search.apply(select(*columns).where(*conditions)).order_by(search.rank.desc(), Task.id.desc())
+
+        if cursor is not None:
+            page = None
+            ordered = ordered.where(search.keyset_condition(cursor))
+        else:
+            ordered = ordered.offset((page - 1) * page_size)
+
+        rows = (await db.execute(ordered.limit(page_size + 1))).all()
+        total = await TaskService._page_total(db, query, user_id, strategy, rows, page)
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_cursor = search.encode_next_cursor(last[len(RESPONSE_COLUMNS)], last.id)
+        items = TaskMapper.to_read_models(rows)
+
+        logger.info(
+            "Búsqueda de tareas desde el servicio",
+            user_id=user_id, page=page, page_size=page_size, count=len(items), total=total, count_strategy=strategy.value
+        )
+        return TaskMapper.to_paginated_read(items, total, page, page_size, next_cursor)
+
+    @staticmethod
+    async def export_tasks(db: AsyncSession, user_id: int) -> AsyncIterator[bytes]:
+        """
+        Genera todas las tareas activas del usuario en formato NDJSON (una tarea por línea).
+
+        La consulta se ejecuta con un cursor de servidor (`yield_per`, que activa
+        `stream_results`) y solo proyecta columnas, sin entidades ORM en el identity map,
+        por lo que la memoria se mantiene constante sin importar cuántas tareas tenga
+        el usuario. Cada lote se emite como un único fragmento, serializado con orjson
+        desde modelos de lectura.
+        """
+        stmt = (
+            select(*RESPONSE_COLUMNS)
+            .where(Task.user_id == user_id, Task.status != TaskStatus.DELETED)
+            .order_by(Task.created_at, Task.id)
+            .execution_options(yield_per=settings.TASK_EXPORT_BATCH_SIZE)
+        )
+        result = await db.stream(stmt)
+        exported = 0
+        try:
+            async for partition in result.partitions():
+                exported += len(partition)
+                yield b"".join(
+                    dump_json_bytes(task) + b"\n" for task in TaskMapper.to_read_models(partition)
+                )
+        finally:
+            await result.close()
+            logger.info("Exportación de tareas finalizada en el servicio", user_id=user_id, count=exported)
+
+    @staticmethod
+    async def get_changes(db: AsyncSession, user_id: int, since: Optional[str], page_size: int) -> TaskChangesDTO:
+        """
+        Devuelve las tareas del usuario creadas, modificadas o eliminadas después del token
+        `since`, en orden de versión de cambio, junto con el token para la siguiente llamada.
+
+        Sin token se devuelve el estado completo (sin tareas eliminadas). Con token, las
+        tareas que pasaron a DELETED se devuelven como tombstones. La consulta recorre el
+        índice (user_id, change_version, id) por keyset.
+
+        Raises:
+            InvalidCursorException: Si el token está malformado.
+        """
+        _, page_size = sanitize_pagination(1, page_size)
+        conditions = [Task.user_id == user_id]
+        if since is None:
+            conditions.append(Task.status != TaskStatus.DELETED)
+        else:
+            conditions.append(tuple_(Task.change_version, Task.id) > TaskService._decode_sync_token(since))
+
+        rows = (await db.execute(
+            select(*RESPONSE_COLUMNS, Task.change_version)
+            .where(*conditions)
+            .order_by(Task.change_version, Task.id)
+            .limit(page_size + 1)
+        )).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        changed, deleted = [], []
+        for task in rows:
+            if task.status == TaskStatus.DELETED:
+                deleted.append(TaskTombstoneDTO(id=task.id, deleted_at=task.updated_at))
+            else:
+                changed.append(TaskMapper.to_dto(task))
+
+        if rows:
+            sync_token = encode_cursor([SYNC_TOKEN_KIND, rows[-1].change_version, rows[-1].id])
+        else:
+            sync_token = since or encode_cursor([SYNC_TOKEN_KIND, 0, 0])
+
+        logger.info(
+            "Cambios de tareas obtenidos en el servicio",
+            user_id=user_id, changed=len(changed), deleted=len(deleted), has_more=has_more
+        )
+        return TaskChangesDTO(changed=changed, deleted=deleted, sync_token=sync_token, has_more=has_more)
+
+    @staticmethod
+    def _decode_sync_token(token: str) -> tuple[int, int]:
+        """
+        Raises:
+            InvalidCursorException: Si el token no fue generado por `get_changes`.
+        """
+        try:
+            kind, change_version, task_id = decode_cursor(token)
+            if kind != SYNC_TOKEN_KIND or not isinstance(change_version, int) or not isinstance(task_id, int):
+                raise ValueError("El token no corresponde a una sincronización")
+        except (ValueError, TypeError):
+            raise InvalidCursorException("El token de sincronización no es válido")
+        return change_version, task_id
+
+    @staticmethod
+    def _resolve_count_strategy(
+        count_strategy: Optional[CountStrategy],
+        cursor: Optional[str],
+        counter_applies: bool
+    ) -> CountStrategy:
+        """
+        Determina la estrategia de conteo efectiva de un listado.
+        WINDOW no aplica en modo cursor y COUNTER solo aplica sin filtros;
+        en esos casos se recurre al conteo exacto.
+        """
+        strategy = count_strategy or settings.TASK_COUNT_STRATEGY
+        if strategy == CountStrategy.WINDOW and cursor is not None:
+            return CountStrategy.EXACT
+        if strategy == CountStrategy.COUNTER and not counter_applies:
+            return CountStrategy.EXACT
+        return strategy
+
+    @staticmethod
+    async def _page_total(
+        db: AsyncSession,
+        query: Select,
+        user_id: int,
+        strategy: CountStrategy,
+        rows: list,
+        page: Optional[int]
+    ) -> Optional[int]:
+        """
+        Obtiene el total del listado. Con WINDOW se lee de la última columna de las filas
+        de la página; si la página está fuera de rango se recurre al conteo exacto.
+        """
+        if strategy != CountStrategy.WINDOW:
+            return await TaskCountService.count(db, query, user_id, strategy)
+        if rows:
+            return rows[0][-1]
+        return 0 if page == 1 else await TaskCountService.count_exact(db, query, user_id)
+
+    @staticmethod
+    async def get_summary(db: AsyncSession, user_id: int) -> TaskSummaryDTO:
+        """
+        Resumen de tareas activas del usuario por estado, leído de los contadores
+        mantenidos en cada escritura (sin recorrer la tabla de tareas).
+        """
+        counts = await TaskCountService.summary(db, user_id)
+        logger.info("Resumen de tareas obtenido en el servicio", user_id=user_id)
+        return TaskSummaryDTO(
+            pending=counts[TaskStatus.PENDING],
+            in_progress=counts[TaskStatus.IN_PROGRESS],
+            done=counts[TaskStatus.DONE],
+            total=sum(counts.values())
+        )
 
     @staticmethod
-    def create_task(db: Session, task_dto: TaskCreateDTO, user_id: int) -> Task:
+    async def create_task(db: AsyncSession, task_dto: TaskCreateDTO, user_id: int) -> TaskResponseDTO:
         """
         Crea una nueva tarea vinculándola al usuario proporcionado.
+
+        La fila se inserta con INSERT ... RETURNING, que devuelve los valores generados
+        por la base de datos (id, created_at) sin un SELECT posterior.
         """
         try:
-            task = TaskMapper.to_entity(task_dto, user_id)
-            db.add(task)
-            db.commit()
-            db.refresh(task)
-            logger.info("Tarea creada exitosamente en el servicio", user_id=user_id, task_id=task.id)
-            return task
+            values = TaskMapper.to_insert_values(task_dto, user_id)
+            values["change_version"] = await TaskCountService.bump_version(db, user_id)
+            row = (await db.execute(insert(Task).values(**values).returning(*RESPONSE_COLUMNS))).one()
+            await TaskCountService.adjust(db, user_id, {values["status"]: 1})
+            await db.commit()
         except Exception as e:
             logger.error(f"Error al crear la tarea: {e}", user_id=user_id)
             raise TaskCreationException()
+        task = TaskResponseDTO.model_validate(row)
+        logger.info("Tarea creada exitosamente en el servicio", user_id=user_id, task_id=task.id)
+        return task
 
     @staticmethod
-    def get_task_by_id(db: Session, task_id: int, user_id: int) -> Task:
+    async def bulk_create_tasks(db: AsyncSession, items: list[Any], user_id: int) -> TaskBulkCreateResponseDTO:
+        """
+        Crea varias tareas del usuario en una sola transacción.
+
+        Cada elemento se valida por separado contra TaskCreateDTO; los inválidos se
+        reportan por su posición y los válidos se insertan con un único INSERT de
+        múltiples filas con RETURNING, sin cargar entidades ORM ni refrescarlas.
+
+        Raises:
+            BulkLimitExceededException: Si se supera TASK_BULK_MAX_ITEMS.
+            TaskCreationException: Si la inserción falla en la base de datos.
+        """
+        if len(items) > settings.TASK_BULK_MAX_ITEMS:
+            raise BulkLimitExceededException(
+                f"Se permiten como máximo {settings.TASK_BULK_MAX_ITEMS} tareas por petición"
+            )
+
+        values: list[dict] = []
+        errors: list[TaskBulkItemErrorDTO] = []
+        for index, item in enumerate(items):
+            try:
+                task_dto = TaskCreateDTO.model_validate(item)
+            except ValidationError as e:
+                errors.append(TaskBulkItemErrorDTO(index=index, errors=TaskService._format_errors(e)))
+                continue
+            values.append(TaskMapper.to_insert_values(task_dto, user_id))
+
+        created: list[TaskResponseDTO] = []
+        if values:
+            stmt = insert(Task).returning(*RESPONSE_COLUMNS, sort_by_parameter_order=True)
+            try:
+                version = await TaskCountService.bump_version(db, user_id)
+                rows = (await db.execute(stmt, [{**row, "change_version": version} for row in values])).all()
+                await TaskCountService.adjust(db, user_id, Counter(row["status"] for row in values))
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Error en la creación masiva de tareas: {e}", user_id=user_id)
+                raise TaskCreationException("No se pudieron crear las tareas")
+            created = [TaskResponseDTO.model_validate(row) for row in rows]
+
+        logger.info(
+            "Creación masiva de tareas en el servicio",
+            user_id=user_id, created=len(created), rejected=len(errors)
+        )
+        return TaskBulkCreateResponseDTO(created=created, errors=errors)
+
+    @staticmethod
+    async def bulk_update_tasks(db: AsyncSession, bulk_dto: TaskBulkUpdateDTO, user_id: int) -> TaskBulkResultDTO:
+        """
+        Aplica los mismos cambios a todas las tareas seleccionadas del usuario
+        mediante un único UPDATE ... RETURNING id, sin cargar entidades ORM.
+        """
+        values = bulk_dto.changes.model_dump(exclude_none=True)
+        values["updated_at"] = func.now()
+        result = await TaskService._bulk_apply(db, bulk_dto, user_id, values)
+        logger.info("Actualización masiva de tareas en el servicio", user_id=user_id, affected=len(result.affected_ids))
+        return result
+
+    @staticmethod
+    async def bulk_delete_tasks(db: AsyncSession, selection: TaskBulkSelectionDTO, user_id: int) -> TaskBulkResultDTO:
+        """
+        Realiza el borrado lógico (soft delete) de las tareas seleccionadas del usuario
+        mediante un único UPDATE ... RETURNING id.
+        """
+        values = {"status": TaskStatus.DELETED, "updated_at": func.now()}
+        result = await TaskService._bulk_apply(db, selection, user_id, values)
+        logger.info("Eliminación masiva de tareas (soft delete) en el servicio", user_id=user_id, affected=len(result.affected_ids))
+        return result
+
+    @staticmethod
+    async def _bulk_apply(db: AsyncSession, selection: TaskBulkSelectionDTO, user_id: int, values: dict) -> TaskBulkResultDTO:
+        """
+        Ejecuta un UPDATE acotado por propietario sobre la selección indicada y confirma la transacción.
+
+        La condición `user_id = :uid` forma parte del propio UPDATE, de modo que las tareas
+        ajenas nunca se modifican y aparecen, junto con las inexistentes, en `missing_ids`.
+
+        Raises:
+            BulkLimitExceededException: Si la lista de ids supera TASK_BULK_MAX_ITEMS.
+            UnsupportedTaskQueryException: Si el filtro no está respaldado por un índice.
+        """
+        if selection.ids is not None:
+            if len(selection.ids) > settings.TASK_BULK_MAX_ITEMS:
+                raise BulkLimitExceededException(
+                    f"Se permiten como máximo {settings.TASK_BULK_MAX_ITEMS} tareas por petición"
+                )
+            conditions = TaskQueryBuilder.filter_conditions(user_id, None) + [Task.id.in_(selection.ids)]
+        else:
+            TaskQueryBuilder.find_index(selection.filters, None)
+            conditions = TaskQueryBuilder.filter_conditions(user_id, selection.filters)
+
+        values = {**values, "change_version": await TaskCountService.bump_version(db, user_id)}
+        if "status" in values:
+            # Los contadores por estado necesitan el estado previo de cada fila afectada
+            previous = await TaskService._update_with_previous_status(db, conditions, values)
+            affected_ids = list(previous)
+            deltas = Counter({values["status"]: len(previous)})
+            deltas.subtract(previous.values())
+            await TaskCountService.adjust(db, user_id, deltas)
+        else:
+            stmt = (
+                update(Task)
+                .where(*conditions)
+                .values(**values)
+                .returning(Task.id)
+                .execution_options(synchronize_session=False)
+            )
+            affected_ids = list((await db.execute(stmt)).scalars().all())
+        if affected_ids:
+            await db.commit()
+        else:
+            # Sin filas afectadas no se conserva el incremento de versión
+            await db.rollback()
+
+        missing_ids = sorted(set(selection.ids) - set(affected_ids)) if selection.ids is not None else []
+        return TaskBulkResultDTO(affected_ids=sorted(affected_ids), missing_ids=missing_ids)
+
+    @staticmethod
+    async def _update_with_previous_status(db: AsyncSession, conditions: list, values: dict) -> dict[int, TaskStatus]:
+        """
+        Actualiza las tareas que cumplen `conditions` y devuelve el estado que tenía cada una.
+
+        En PostgreSQL se resuelve en una sola sentencia (UPDATE ... FROM sobre una subconsulta
+        con FOR UPDATE ... RETURNING). SQLite no admite columnas de la subconsulta en RETURNING,
+        por lo que se leen los estados antes del UPDATE dentro de la misma transacción.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            locked = select(Task.id, Task.status).where(*conditions).with_for_update().subquery("previous")
+            stmt = (
+                update(Task)
+                .where(Task.id == locked.c.id)
+                .values(**values)
+                .returning(Task.id, locked.c.status)
+                .execution_options(synchronize_session=False)
+            )
+            return {task_id: TaskStatus(status) for task_id, status in (await db.execute(stmt)).all()}
+
+        previous = {
+            task_id: TaskStatus(status)
+            for task_id, status in (await db.execute(select(Task.id, Task.status).where(*conditions))).all()
+        }
+        if previous:
+            await db.execute(
+                update(Task)
+                .where(Task.id.in_(list(previous)))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        return previous
+
+    @staticmethod
+    def _format_errors(error: ValidationError) -> list[str]:
+        """Resume los errores de validación de Pydantic como 'campo: mensaje'."""
+        messages = []
+        for detail in error.errors(include_url=False):
+            location = ".".join(str(part) for part in detail["loc"]) or "item"
+            messages.append(f"{location}: {detail['msg']}")
+        return messages
+
+    @staticmethod
+    def task_etag(task: Union[Task, TaskResponseDTO]) -> str:
+        """
+        ETag fuerte de una tarea, derivado de su id y su última modificación
+        (la fecha de creación si nunca fue actualizada).
+        """
+        return make_etag("task", task.id, (task.updated_at or task.created_at).isoformat())
+
+    @staticmethod
+    async def list_etag(db: AsyncSession, user_id: int, params: list[tuple[str, str]]) -> str:
+        """
+        ETag de un listado: versión del conjunto de tareas del usuario más los parámetros
+        de la petición. Solo requiere una lectura por clave primaria, sin ejecutar el listado.
+
+        La versión se lee antes que la página, por lo que una escritura concurrente solo
+        puede hacer que el ETag quede más antiguo que el contenido (el cliente recibirá
+        la respuesta completa en la siguiente consulta), nunca un 304 incorrecto.
+        """
+        version = await TaskCountService.get_version(db, user_id)
+        return make_etag("tasks", user_id, version, sorted(params))
+
+    @staticmethod
+    async def get_task_by_id(db: AsyncSession, task_id: int, user_id: int, for_update: bool = False) -> Task:
         """
         Busca una tarea por su ID y verifica que pertenezca al usuario solicitante.
         Lanza excepciones si la tarea no existe o no hay permisos.
+        Con `for_update` la fila queda bloqueada hasta el fin de la transacción.
         """
         # Se filtran las tareas marcadas como eliminadas
-        task = db.query(Task).filter(Task.id == task_id, Task.status != TaskStatus.DELETED).first()
+        query = select(Task).where(Task.id == task_id, Task.status != TaskStatus.DELETED)
+        if for_update:
+            query = query.with_for_update()
+        task = (await db.scalars(query)).first()
         if not task:
             logger.warning("Tarea no encontrada en el servicio", task_id=task_id, user_id=user_id)
             raise TaskNotFoundException(detail=f"Tarea con id {task_id} no encontrada")
@@ -74,28 +535,108 @@ class TaskService:
         return task
 
     @staticmethod
-    def update_task(db: Session, task_id: int, update_dto, user_id: int) -> Task:
+    async def update_task(
+        db: AsyncSession, task_id: int, update_dto, user_id: int, if_match: Optional[str] = None
+    ) -> TaskResponseDTO:
         """
         Actualiza una tarea existente previa validación de propiedad.
+
+        La tarea se modifica con un único UPDATE ... RETURNING acotado por propietario; solo
+        si no afecta a ninguna fila se consulta la tarea para distinguir 404 de 403.
+
+        Si se indica `if_match` (cabecera If-Match), la tarea se bloquea y solo se
+        actualiza si su ETag actual coincide, evitando sobrescribir cambios ajenos.
+
+        Raises:
+            TaskPreconditionFailedException: Si el ETag no coincide con la versión actual.
         """
-        task = TaskService.get_task_by_id(db, task_id, user_id)
-        
-        from app.mappers.task import TaskMapper
-        task = TaskMapper.update_entity(task, update_dto)
-        task.updated_at = datetime.now()
-        db.commit()
-        db.refresh(task)
+        # La fila de versión se bloquea antes que la de la tarea, igual que en las demás escrituras
+        version = await TaskCountService.bump_version(db, user_id)
+        if if_match is not None:
+            task = await TaskService.get_task_by_id(db, task_id, user_id, for_update=True)
+            if not etag_matches(if_match, TaskService.task_etag(task)):
+                await db.rollback()
+                logger.warning("Actualización rechazada por ETag desactualizado", task_id=task_id, user_id=user_id)
+                raise TaskPreconditionFailedException()
+
+        # Igual que antes, solo se aplican los campos informados (no None) del DTO
+        values = {**update_dto.model_dump(exclude_none=True), "updated_at": datetime.now(), "change_version": version}
+        row, previous_status = await TaskService._update_owned_task(db, task_id, user_id, values)
+        if row.status != previous_status:
+            await TaskCountService.adjust(db, user_id, {previous_status: -1, row.status: 1})
+        await db.commit()
         logger.info("Tarea actualizada exitosamente en el servicio", task_id=task_id, user_id=user_id)
-        return task
+        return TaskResponseDTO.model_validate(row)
 
     @staticmethod
-    def delete_task(db: Session, task_id: int, user_id: int) -> None:
+    async def delete_task(db: AsyncSession, task_id: int, user_id: int) -> None:
         """
-        Realiza un borrado lógico (soft delete) de una tarea.
+        Realiza un borrado lógico (soft delete) de una tarea con un único UPDATE acotado por propietario.
         """
-        task = TaskService.get_task_by_id(db, task_id, user_id)
-        
-        task.status = TaskStatus.DELETED
-        task.updated_at = datetime.now()
-        db.commit()
+        version = await TaskCountService.bump_version(db, user_id)
+        values = {"status": TaskStatus.DELETED, "updated_at": datetime.now(), "change_version": version}
+        _, previous_status = await TaskService._update_owned_task(db, task_id, user_id, values)
+        await TaskCountService.adjust(db, user_id, {previous_status: -1, TaskStatus.DELETED: 1})
+        await db.commit()
         logger.info("Tarea eliminada (soft delete) en el servicio", task_id=task_id, user_id=user_id)
+
+    @staticmethod
+    async def _update_owned_task(db: AsyncSession, task_id: int, user_id: int, values: dict) -> tuple[Any, TaskStatus]:
+        """
+        Actualiza una tarea no eliminada del usuario y devuelve la fila resultante
+        (RESPONSE_COLUMNS) junto con el estado previo, necesario para los contadores.
+
+        En PostgreSQL es una sola sentencia (UPDATE ... FROM sobre la fila bloqueada con
+        FOR UPDATE ... RETURNING). En SQLite, que no admite columnas de la subconsulta en
+        RETURNING, el estado previo se lee antes dentro de la misma transacción.
+
+        Raises:
+            TaskNotFoundException: Si la tarea no existe o está eliminada.
+            NotTaskOwnerException: Si la tarea pertenece a otro usuario.
+        """
+        conditions = [Task.id == task_id, Task.user_id == user_id, Task.status != TaskStatus.DELETED]
+        row, previous_status = None, None
+        if db.get_bind().dialect.name == "postgresql":
+            locked = select(Task.id, Task.status).where(*conditions).with_for_update().subquery("previous")
+            stmt = (
+                update(Task)
+                .where(Task.id == locked.c.id)
+                .values(**values)
+                .returning(*RESPONSE_COLUMNS, locked.c.status.label("previous_status"))
+                .execution_options(synchronize_session=False)
+            )
+            row = (await db.execute(stmt)).first()
+            if row is not None:
+                previous_status = TaskStatus(row.previous_status)
+        else:
+            previous_status = await db.scalar(select(Task.status).where(*conditions))
+            if previous_status is not None:
+                stmt = (
+                    update(Task)
+                    .where(Task.id == task_id)
+                    .values(**values)
+                    .returning(*RESPONSE_COLUMNS)
+                    .execution_options(synchronize_session=False)
+                )
+                row = (await db.execute(stmt)).first()
+
+        if row is None:
+            # Sin filas afectadas no se conserva el incremento de versión
+            await db.rollback()
+            await TaskService._raise_not_accessible(db, task_id, user_id)
+        return row, TaskStatus(previous_status)
+
+    @staticmethod
+    async def _raise_not_accessible(db: AsyncSession, task_id: int, user_id: int) -> None:
+        """
+        Tras una escritura acotada por propietario que no afectó a ninguna fila, distingue
+        si la tarea no existe (404) o pertenece a otro usuario (403).
+        """
+        owner_id = await db.scalar(
+            select(Task.user_id).where(Task.id == task_id, Task.status != TaskStatus.DELETED)
+        )
+        if owner_id is None:
+            logger.warning("Tarea no encontrada en el servicio", task_id=task_id, user_id=user_id)
+            raise TaskNotFoundException(detail=f"Tarea con id {task_id} no encontrada")
+        logger.warning("Intento de acceso no autorizado a tarea", task_id=task_id, user_id=user_id, owner_id=owner_id)
+        raise NotTaskOwnerException("No tienes permiso para acceder a este recurso")
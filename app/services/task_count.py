@@ -0,0 +1,166 @@
+import json
+from typing import Awaitable, Callable, Mapping, Optional
+from sqlalchemy import Select, delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.task import Task
+from app.models.task_counter import TaskStatusCounter, TaskListVersion
+from app.core.enums import CountStrategy, TaskStatus
+from app.core.logging import logger
+
+class TaskCountService:
+    """
+    Estrategias intercambiables para obtener el total de tareas de un listado paginado
+    y mantenimiento de los contadores de tareas por usuario y estado y de la
+    versión del listado de cada usuario.
+
+    La estrategia WINDOW no se resuelve aquí: se calcula dentro de la propia consulta
+    de la página en TaskService para evitar el segundo viaje a la base de datos.
+    """
+
+    @staticmethod
+    async def count(db: AsyncSession, query: Select, user_id: int, strategy: CountStrategy) -> Optional[int]:
+        """
+        Calcula el total de registros de `query` según la estrategia indicada.
+        Devuelve None cuando la estrategia es NONE.
+        """
+        if strategy == CountStrategy.NONE:
+            return None
+        handler = COUNT_STRATEGIES.get(strategy, TaskCountService.count_exact)
+        return await handler(db, query, user_id)
+
+    @staticmethod
+    async def count_exact(db: AsyncSession, query: Select, user_id: int) -> int:
+        """Conteo exacto mediante una consulta COUNT(*) independiente."""
+        return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+    @staticmethod
+    async def count_from_counter(db: AsyncSession, query: Select, user_id: int) -> int:
+        """Suma los contadores mantenidos de los estados activos del usuario (lectura por clave primaria)."""
+        active_count = await db.scalar(
+            select(func.sum(TaskStatusCounter.count)).where(
+                TaskStatusCounter.user_id == user_id,
+                TaskStatusCounter.status != TaskStatus.DELETED
+            )
+        )
+        return active_count or 0
+
+    @staticmethod
+    async def count_estimate(db: AsyncSession, query: Select, user_id: int) -> int:
+        """
+        Usa la estimación de filas del planificador de PostgreSQL (EXPLAIN) sin ejecutar la consulta.
+        En otros motores se recurre al conteo exacto.
+        """
+        bind = db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return await TaskCountService.count_exact(db, query, user_id)
+
+        # Se renderizan los parámetros en línea porque EXPLAIN no admite parámetros enlazados
+        compiled = query.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+        connection = await db.connection()
+        plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        # asyncpg entrega las columnas json como texto
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        logger.info("Total estimado por el planificador", user_id=user_id, estimate=estimate)
+        return estimate
+
+    @staticmethod
+    async def summary(db: AsyncSession, user_id: int) -> dict[TaskStatus, int]:
+        """Cantidad de tareas del usuario en cada estado activo, leída de los contadores."""
+        counts = {status: 0 for status in TaskStatus if status != TaskStatus.DELETED}
+        rows = await db.execute(
+            select(TaskStatusCounter.status, TaskStatusCounter.count).where(
+                TaskStatusCounter.user_id == user_id,
+                TaskStatusCounter.status != TaskStatus.DELETED
+            )
+        )
+        for status, count in rows.all():
+            counts[TaskStatus(status)] = count
+        return counts
+
+    @staticmethod
+    async def adjust(db: AsyncSession, user_id: int, deltas: Mapping[TaskStatus, int]) -> None:
+        """
+        Aplica variaciones a los contadores del usuario, por estado (ej. {PENDING: -1, DONE: 1}).
+
+        Se ejecuta como un único UPSERT atómico dentro de la transacción en curso,
+        por lo que los contadores se confirman junto con la escritura de las tareas.
+        """
+        rows = [
+            {"user_id": user_id, "status": status, "count": delta}
+            for status, delta in deltas.items() if delta != 0
+        ]
+        if not rows:
+            return
+        stmt = TaskCountService._upsert(db, TaskStatusCounter).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TaskStatusCounter.user_id, TaskStatusCounter.status],
+            set_={"count": TaskStatusCounter.count + stmt.excluded.count}
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def get_version(db: AsyncSession, user_id: int) -> int:
+        """Versión actual del conjunto de tareas del usuario (0 si nunca se escribió)."""
+        version = await db.scalar(select(TaskListVersion.version).where(TaskListVersion.user_id == user_id))
+        return version or 0
+
+    @staticmethod
+    async def bump_version(db: AsyncSession, user_id: int) -> int:
+        """
+        Incrementa la versión del conjunto de tareas del usuario dentro de la transacción
+        en curso y devuelve la nueva versión, que se asigna como `change_version` a las
+        tareas escritas. Toda escritura sobre sus tareas debe llamarlo antes de modificar
+        filas de `tasks`.
+
+        La fila de versión queda bloqueada hasta el fin de la transacción, de modo que las
+        escrituras de un mismo usuario obtienen versiones en su orden de confirmación
+        (base de la sincronización incremental) y siempre bloquean en el mismo orden.
+        """
+        stmt = TaskCountService._upsert(db, TaskListVersion).values(user_id=user_id, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TaskListVersion.user_id],
+            set_={"version": TaskListVersion.version + 1}
+        ).returning(TaskListVersion.version)
+        return (await db.execute(stmt)).scalar_one()
+
+    @staticmethod
+    def _upsert(db: AsyncSession, model):
+        """Construcción INSERT con soporte de ON CONFLICT según el motor de la sesión."""
+        return sqlite.insert(model) if db.get_bind().dialect.name == "sqlite" else postgresql.insert(model)
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, user_id: Optional[int] = None) -> int:
+        """
+        Recalcula desde cero los contadores de un usuario (o de todos) a partir de la tabla de tareas.
+        Devuelve la cantidad de contadores escritos.
+
+        En PostgreSQL se bloquea la tabla de contadores frente a escrituras durante el
+        recálculo; las transacciones que crean o modifican tareas esperan y aplican su
+        variación sobre los valores ya recalculados.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            await db.execute(text("LOCK TABLE task_status_counters IN SHARE ROW EXCLUSIVE MODE"))
+
+        delete_stmt = delete(TaskStatusCounter)
+        counts = select(Task.user_id, Task.status, func.count()).group_by(Task.user_id, Task.status)
+        if user_id is not None:
+            delete_stmt = delete_stmt.where(TaskStatusCounter.user_id == user_id)
+            counts = counts.where(Task.user_id == user_id)
+
+        await db.execute(delete_stmt)
+        result = await db.execute(
+            insert(TaskStatusCounter).from_select(["user_id", "status", "count"], counts)
+        )
+        await db.commit()
+        logger.info("Contadores de tareas recalculados", user_id=user_id, rows=result.rowcount)
+        return result.rowcount
+
+# Registro de estrategias resueltas mediante una consulta adicional
+COUNT_STRATEGIES: dict[CountStrategy, Callable[[AsyncSession, Select, int], Awaitable[int]]] = {
+    CountStrategy.EXACT: TaskCountService.count_exact,
+    CountStrategy.COUNTER: TaskCountService.count_from_counter,
+    CountStrategy.ESTIMATE: TaskCountService.count_estimate,
+}
@@ -0,0 +1,354 @@
+import csv
+from collections import Counter
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import IO, Any, AsyncIterable, Iterator, Optional, TextIO
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import func, insert, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.models.task import Task
+from app.models.task_import import TaskImport
+from app.exceptions.task import TaskNotFoundException, NotTaskOwnerException, ImportTooLargeException
+from app.mappers.task import TaskMapper
+from app.schemas.task import TaskCreateDTO
+from app.core.enums import TaskStatus, TaskImportFormat, TaskImportStatus
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.task_count import TaskCountService
+from app.services.task import TaskService
+
+"""
+Importación masiva de tareas desde archivos CSV o NDJSON.
+
+El archivo se recorre fila a fila y se valida por lotes contra TaskCreateDTO, de modo
+que la memoria usada depende del tamaño del lote y no del archivo. La lectura y la
+validación de cada lote se ejecutan en el threadpool para no bloquear el bucle de
+eventos. En PostgreSQL cada lote se carga con COPY (copy_records_to_table de asyncpg)
+en una tabla temporal de staging y se fusiona en `tasks` con un único INSERT ... SELECT
+que asigna el propietario; en otros motores se usa un INSERT de múltiples filas. Las
+filas inválidas se escriben en un archivo NDJSON descargable.
+
+El cuerpo de la petición se recibe con un tamaño máximo (TASK_IMPORT_MAX_UPLOAD_BYTES) y
+la importación se procesa en segundo plano con su propia sesión, de modo que la petición
+termina al recibir el archivo y la conexión solo se ocupa mientras se cargan los lotes.
+"""
+
+# Tabla temporal por conexión; se vacía al confirmar cada lote
+STAGING_TABLE = "task_import_staging"
+
+_CREATE_STAGING_SQL = (
+    f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+    "(title text NOT NULL, description text, status text NOT NULL) ON COMMIT DELETE ROWS"
+)
+_MERGE_SQL = text(
+    f"INSERT INTO tasks (title, description, status, user_id, change_version) "
+    f"SELECT title, description, CAST(status AS taskstatus), :user_id, :change_version FROM {STAGING_TABLE}"
+)
+
+# Motivo registrado en las importaciones cuyo procesamiento se perdió
+STALE_IMPORT_ERROR = "La importación se interrumpió al reiniciarse el servidor; las filas de los lotes confirmados se conservan"
+
+# Columnas reconocidas en la cabecera de los archivos CSV (y cargadas en la tabla de staging)
+CSV_COLUMNS = ("title", "description", "status")
+
+
+class TaskImportService:
+    """
+    Gestión de las importaciones masivas de tareas y de su progreso.
+    """
+
+    @staticmethod
+    async def create_import(db: AsyncSession, user_id: int, file_format: TaskImportFormat) -> TaskImport:
+        """Registra una nueva importación en curso para el usuario."""
+        job = TaskImport(
+            user_id=user_id,
+            format=file_format,
+            status=TaskImportStatus.PROCESSING,
+            total_rows=0,
+            imported_rows=0,
+            rejected_rows=0
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        logger.info("Importación de tareas registrada", user_id=user_id, import_id=job.id, format=file_format.value)
+        return job
+
+    @staticmethod
+    async def receive_upload(chunks: AsyncIterable[bytes], declared_size: Optional[int] = None) -> IO[bytes]:
+        """
+        Vuelca el cuerpo recibido en streaming a un archivo temporal (en memoria hasta
+        TASK_IMPORT_SPOOL_MAX_MEMORY bytes) y lo devuelve posicionado al inicio.
+
+        Raises:
+            ImportTooLargeException: Si el tamaño declarado (Content-Length) o el recibido
+                supera TASK_IMPORT_MAX_UPLOAD_BYTES; se comprueba antes de volcar cada fragmento.
+        """
+        limit = settings.TASK_IMPORT_MAX_UPLOAD_BYTES
+        if declared_size is not None and declared_size > limit:
+            raise ImportTooLargeException()
+        upload = tempfile.SpooledTemporaryFile(max_size=settings.TASK_IMPORT_SPOOL_MAX_MEMORY)
+        received = 0
+        try:
+            async for chunk in chunks:
+                received += len(chunk)
+                if received > limit:
+                    raise ImportTooLargeException()
+                upload.write(chunk)
+        except BaseException:
+            upload.close()
+            raise
+        upload.seek(0)
+        return upload
+
+    @staticmethod
+    async def run_import_in_background(session_factory: async_sessionmaker, import_id: int, source: IO[bytes]) -> None:
+        """
+        Procesa una importación registrada fuera de la petición, con una sesión propia,
+        y cierra el archivo recibido al terminar.
+        """
+        try:
+            async with session_factory() as db:
+                job = await db.get(TaskImport, import_id)
+                await TaskImportService.run_import(db, job, source)
+        except Exception as e:
+            logger.error(f"Error al procesar la importación en segundo plano: {e}", import_id=import_id)
+        finally:
+            source.close()
+
+    @staticmethod
+    async def run_import(db: AsyncSession, job: TaskImport, source: IO[bytes]) -> TaskImport:
+        """
+        Procesa el archivo de una importación registrada.
+
+        El progreso (filas leídas, importadas y rechazadas) se confirma al terminar cada
+        lote, aunque no tenga filas válidas, por lo que puede consultarse mientras la
+        importación sigue en curso. Si un lote falla en la base de datos, los lotes
+        anteriores se conservan, el archivo de rechazadas se recorta a lo confirmado y la
+        importación queda en estado FAILED.
+        """
+        # Se leen antes del bucle: tras un rollback los atributos quedan expirados y no
+        # pueden recargarse de forma implícita en una sesión asíncrona
+        user_id, import_id = job.user_id, job.id
+        rows = TaskImportService._read_rows(source, job.format)
+        rejected_file: Optional[TextIO] = None
+        # Posición del archivo de rechazadas que corresponde a `rejected_rows` confirmado
+        committed_rejected = 0
+        try:
+            while True:
+                read, batch, rejected = await run_in_threadpool(
+                    TaskImportService._parse_batch, rows, user_id, settings.TASK_IMPORT_BATCH_SIZE
+                )
+                if not read:
+                    break
+                job.total_rows += read
+                if rejected:
+                    if rejected_file is None:
+                        rejected_file = TaskImportService._open_rejected_file(job)
+                    rejected_file.writelines(rejected)
+                    job.rejected_rows += len(rejected)
+                await TaskImportService._load_batch(db, job, batch)
+                if rejected_file is not None:
+                    committed_rejected = rejected_file.tell()
+            job.status = TaskImportStatus.COMPLETED
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error durante la importación de tareas: {e}", user_id=user_id, import_id=import_id)
+            job.status = TaskImportStatus.FAILED
+            job.error = "La importación se interrumpió; las filas de los lotes anteriores se conservan"
+            if rejected_file is not None:
+                # Se descartan las rechazadas del lote revertido para que coincidan con el contador
+                rejected_file.truncate(committed_rejected)
+        finally:
+            rows.close()
+            if rejected_file is not None:
+                rejected_file.close()
+                # La ruta se vuelve a asignar por si el rollback descartó el valor pendiente
+                if committed_rejected:
+                    job.rejected_path = rejected_file.name
+                else:
+                    os.remove(rejected_file.name)
+                    job.rejected_path = None
+
+        job.finished_at = datetime.now(timezone.utc)
+        await db.commit()
+        await db.refresh(job)
+        logger.info(
+            "Importación de tareas finalizada",
+            user_id=user_id, import_id=job.id, status=job.status.value,
+            total=job.total_rows, imported=job.imported_rows, rejected=job.rejected_rows
+        )
+        return job
+
+    @staticmethod
+    async def fail_stale_imports(db: AsyncSession) -> int:
+        """
+        Marca como fallidas las importaciones en curso sin progreso durante
+        TASK_IMPORT_STALE_SECONDS: su procesamiento en segundo plano se perdió al
+        reiniciarse o detenerse el worker. Se invoca al arrancar la aplicación; el margen
+        evita afectar a las importaciones que siguen activas en otros workers.
+        """
+        result = await db.execute(
+            update(TaskImport)
+            .where(
+                TaskImport.status == TaskImportStatus.PROCESSING,
+                func.coalesce(TaskImport.updated_at, TaskImport.created_at) < TaskImportService._stale_cutoff()
+            )
+            .values(status=TaskImportStatus.FAILED, error=STALE_IMPORT_ERROR, finished_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if result.rowcount:
+            logger.warning("Importaciones interrumpidas marcadas como fallidas", count=result.rowcount)
+        return result.rowcount
+
+    @staticmethod
+    async def get_import(db: AsyncSession, import_id: int, user_id: int) -> TaskImport:
+        """
+        Recupera una importación validando que pertenezca al usuario.
+
+        Raises:
+            TaskNotFoundException: Si la importación no existe.
+            NotTaskOwnerException: Si la importación pertenece a otro usuario.
+        """
+        job = await db.get(TaskImport, import_id)
+        if not job:
+            raise TaskNotFoundException("Importación no encontrada")
+        if job.user_id != user_id:
+            raise NotTaskOwnerException()
+        if job.status == TaskImportStatus.PROCESSING and TaskImportService._is_stale(job):
+            job.status = TaskImportStatus.FAILED
+            job.error = STALE_IMPORT_ERROR
+            job.finished_at = datetime.now(timezone.utc)
+            await db.commit()
+            await db.refresh(job)
+            logger.warning("Importación interrumpida marcada como fallida", user_id=user_id, import_id=import_id)
+        return job
+
+    @staticmethod
+    async def get_rejected_path(db: AsyncSession, import_id: int, user_id: int) -> str:
+        """
+        Ruta del archivo de filas rechazadas de una importación del usuario.
+
+        Raises:
+            TaskNotFoundException: Si la importación no existe o no tiene filas rechazadas.
+            NotTaskOwnerException: Si la importación pertenece a otro usuario.
+        """
+        job = await TaskImportService.get_import(db, import_id, user_id)
+        if not job.rejected_path or not os.path.exists(job.rejected_path):
+            raise TaskNotFoundException("La importación no tiene filas rechazadas")
+        return job.rejected_path
+
+    @staticmethod
+    def _stale_cutoff() -> datetime:
+        """Instante anterior al cual una importación en curso sin progreso se considera interrumpida."""
+        return datetime.now(timezone.utc) - timedelta(seconds=settings.TASK_IMPORT_STALE_SECONDS)
+
+    @staticmethod
+    def _is_stale(job: TaskImport) -> bool:
+        """Indica si la importación lleva más de TASK_IMPORT_STALE_SECONDS sin progreso."""
+        last_progress = job.updated_at or job.created_at
+        if last_progress is None:
+            return False
+        # SQLite devuelve fechas sin zona horaria (en UTC)
+        if last_progress.tzinfo is None:
+            last_progress = last_progress.replace(tzinfo=timezone.utc)
+        return last_progress < TaskImportService._stale_cutoff()
+
+    @staticmethod
+    def _read_rows(source: IO[bytes], file_format: TaskImportFormat) -> Iterator[tuple[int, Any, Optional[str]]]:
+        """
+        Recorre el archivo de forma incremental y produce (línea, fila, error de lectura).
+        """
+        stream = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        try:
+            if file_format == TaskImportFormat.CSV:
+                reader = csv.DictReader(stream)
+                for record in reader:
+                    # Los campos vacíos se interpretan como ausentes para aplicar los valores por defecto
+                    row = {
+                        key: value for key, value in record.items()
+                        if key in CSV_COLUMNS and value not in (None, "")
+                    }
+                    yield reader.line_num, row, None
+            else:
+                for line, raw in enumerate(stream, start=1):
+                    if not raw.strip():
+                        continue
+                    try:
+                        yield line, json.loads(raw), None
+                    except ValueError as e:
+                        yield line, raw.rstrip("\r\n"), f"JSON inválido: {e}"
+        finally:
+            # Se separa el envoltorio para no cerrar el archivo subido, que gestiona el llamador
+            stream.detach()
+
+    @staticmethod
+    def _parse_batch(rows: Iterator[tuple[int, Any, Optional[str]]], user_id: int, size: int) -> tuple[int, list[dict], list[str]]:
+        """
+        Lee y valida hasta `size` filas del archivo. Devuelve la cantidad de filas leídas,
+        los valores de inserción de las válidas y las líneas NDJSON de las rechazadas.
+        Se ejecuta en el threadpool, por lo que no accede a la sesión.
+        """
+        read = 0
+        batch: list[dict] = []
+        rejected: list[str] = []
+        for line, row, parse_error in rows:
+            read += 1
+            errors = [parse_error] if parse_error else []
+            if not errors:
+                try:
+                    batch.append(TaskMapper.to_insert_values(TaskCreateDTO.model_validate(row), user_id))
+                except ValidationError as e:
+                    errors = TaskService._format_errors(e)
+            if errors:
+                rejected.append(json.dumps({"line": line, "errors": errors, "row": row}, ensure_ascii=False) + "\n")
+            if read >= size:
+                break
+        return read, batch, rejected
+
+    @staticmethod
+    async def _load_batch(db: AsyncSession, job: TaskImport, values: list[dict]) -> None:
+        """
+        Inserta las filas válidas del lote (si las hay), actualiza los contadores por estado
+        y confirma el progreso del lote en la misma transacción.
+        """
+        if values:
+            version = await TaskCountService.bump_version(db, job.user_id)
+            if db.get_bind().dialect.name == "postgresql":
+                await TaskImportService._copy_batch(db, job.user_id, version, values)
+            else:
+                await db.execute(insert(Task), [{**row, "change_version": version} for row in values])
+
+            await TaskCountService.adjust(db, job.user_id, Counter(row["status"] for row in values))
+            job.imported_rows += len(values)
+        await db.commit()
+
+    @staticmethod
+    async def _copy_batch(db: AsyncSession, user_id: int, change_version: int, values: list[dict]) -> None:
+        """
+        Carga el lote con COPY en la tabla de staging y lo fusiona en `tasks`.
+        El propietario se asigna en el merge, nunca desde el contenido del archivo.
+        """
+        records = [(row["title"], row["description"], TaskStatus(row["status"]).value) for row in values]
+        await db.execute(text(_CREATE_STAGING_SQL))
+
+        # COPY usa la conexión asyncpg de la transacción en curso (protocolo binario, sin CSV intermedio)
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            STAGING_TABLE, records=records, columns=list(CSV_COLUMNS)
+        )
+        await db.execute(_MERGE_SQL, {"user_id": user_id, "change_version": change_version})
+
+    @staticmethod
+    def _open_rejected_file(job: TaskImport) -> TextIO:
+        """Crea el archivo NDJSON de filas rechazadas y registra su ruta en la importación."""
+        os.makedirs(settings.TASK_IMPORT_REJECTS_DIR, exist_ok=True)
+        path = os.path.join(settings.TASK_IMPORT_REJECTS_DIR, f"import_{job.id}_rejected.ndjson")
+        job.rejected_path = path
+        return open(path, "w", encoding="utf-8")
@@ -0,0 +1,270 @@
+from datetime import datetime
+from typing import Any, Callable, Optional
+from sqlalchemy import false, func, true, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+from app.models.task import Task
+from app.schemas.task import TaskFilterDTO
+from app.exceptions.task import InvalidCursorException, UnsupportedTaskQueryException
+from app.core.enums import TaskStatus
+from app.core.utils import encode_cursor, decode_cursor
+
+"""
+Construcción de las consultas de listado de tareas: filtros, ordenamiento multi-clave,
+paginación por keyset y validación de que cada combinación está respaldada por un índice.
+"""
+
+# Ordenamiento por defecto: más recientes primero
+DEFAULT_SORT = "-created_at"
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if not isinstance(value, str):
+        raise ValueError("Fecha inválida")
+    return datetime.fromisoformat(value)
+
+
+def _parse_title(value: Any) -> str:
+    if not isinstance(value, str):
+        raise ValueError("Título inválido")
+    return value
+
+
+class SortKey:
+    """
+    Clave de ordenamiento admitida en el listado.
+
+    Attributes:
+        name: Nombre público de la clave (parámetro `sort`).
+        expression: Expresión SQL sobre la que se ordena y compara el keyset.
+        value_of: Extrae el valor de la clave desde una entidad Task (para el cursor).
+        parse: Reconstruye el valor a partir del cursor serializado.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        expression: ColumnElement,
+        value_of: Callable[[Task], Any],
+        parse: Callable[[Any], Any]
+    ):
+        self.name = name
+        self.expression = expression
+        self.value_of = value_of
+        self.parse = parse
+
+
+# Fecha de última modificación: la de creación si la tarea nunca fue actualizada
+MODIFIED_AT = func.coalesce(Task.updated_at, Task.created_at)
+
+# Expresión indexada del filtro `has_description` (ix_tasks_user_id_has_description_created_at_id).
+# Se compara por igualdad en ambos sentidos: `description IS NULL` no coincide con el índice
+HAS_DESCRIPTION = Task.description.isnot(None)
+
+SORT_KEYS: dict[str, SortKey] = {
+    "created_at": SortKey("created_at", Task.created_at, lambda t: t.created_at.isoformat(), _parse_datetime),
+    "updated_at": SortKey("updated_at", MODIFIED_AT, lambda t: (t.updated_at or t.created_at).isoformat(), _parse_datetime),
+    "title": SortKey("title", Task.title, lambda t: t.title, _parse_title),
+    "status": SortKey("status", Task.status, lambda t: TaskStatus(t.status).value, TaskStatus),
+}
+
+
+class TaskSort:
+    """Ordenamiento multi-clave ya validado. Todas las claves comparten dirección."""
+
+    def __init__(self, spec: str, keys: list[SortKey], descending: bool):
+        self.spec = spec
+        self.keys = keys
+        self.descending = descending
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """Columnas lógicas del ordenamiento, incluido el desempate por id."""
+        return tuple(key.name for key in self.keys) + ("id",)
+
+
+class TaskListIndex:
+    """
+    Índice compuesto disponible para el listado. Todos comienzan por `user_id`;
+    `columns` describe las columnas lógicas que le siguen, en orden.
+    """
+
+    def __init__(self, name: str, columns: tuple[str, ...]):
+        self.name = name
+        self.columns = columns
+
+
+# Catálogo de índices creados mediante Alembic. Una consulta solo se ejecuta si
+# alguno de ellos cubre sus filtros y su ordenamiento.
+TASK_LIST_INDEXES: tuple[TaskListIndex, ...] = (
+    TaskListIndex("ix_tasks_user_id_created_at_id", ("created_at", "id")),
+    TaskListIndex("ix_tasks_user_id_modified_at_id", ("updated_at", "id")),
+    TaskListIndex("ix_tasks_user_id_title_id", ("title", "id")),
+    TaskListIndex("ix_tasks_user_id_status_created_at_id", ("status", "created_at", "id")),
+    TaskListIndex("ix_tasks_user_id_status_modified_at_id", ("status", "updated_at", "id")),
+    TaskListIndex("ix_tasks_user_id_has_description_created_at_id", ("has_description", "created_at", "id")),
+)
+
+
+class TaskQueryBuilder:
+    """
+    Traduce filtros, ordenamiento y cursor del listado de tareas a expresiones SQLAlchemy.
+    """
+
+    @staticmethod
+    def parse_sort(spec: Optional[str]) -> TaskSort:
+        """
+        Interpreta el parámetro `sort` (ej. `-updated_at` o `status,created_at`).
+        Un prefijo `-` indica orden descendente.
+
+        Raises:
+            UnsupportedTaskQueryException: Si alguna clave no está permitida, se repite
+                o las claves mezclan direcciones.
+        """
+        spec = (spec or DEFAULT_SORT).strip() or DEFAULT_SORT
+        keys: list[SortKey] = []
+        directions: set[bool] = set()
+        for raw in spec.split(","):
+            raw = raw.strip()
+            descending = raw.startswith("-")
+            name = raw.lstrip("-")
+            if name not in SORT_KEYS:
+                raise UnsupportedTaskQueryException(
+                    f"Clave de ordenamiento no permitida: '{name}'. Valores admitidos: {', '.join(SORT_KEYS)}"
+                )
+            if any(key.name == name for key in keys):
+                raise UnsupportedTaskQueryException(f"Clave de ordenamiento repetida: '{name}'")
+            keys.append(SORT_KEYS[name])
+            directions.add(descending)
+
+        if len(directions) > 1:
+            raise UnsupportedTaskQueryException("Todas las claves de ordenamiento deben usar la misma dirección")
+        descending = directions.pop()
+
+        # El estado tiene pocos valores distintos: se desempata por fecha de creación,
+        # que es el orden que ofrece el índice (user_id, status, created_at, id)
+        if keys[-1].name == "status" and all(key.name != "created_at" for key in keys):
+            keys.append(SORT_KEYS["created_at"])
+
+        # Forma canónica del ordenamiento, usada también para validar los cursores
+        prefix = "-" if descending else ""
+        canonical = ",".join(f"{prefix}{key.name}" for key in keys)
+        return TaskSort(canonical, keys, descending)
+
+    @staticmethod
+    def find_index(filters: Optional[TaskFilterDTO], sort: Optional[TaskSort]) -> TaskListIndex:
+        """
+        Busca en el catálogo un índice que cubra los filtros y el ordenamiento solicitados.
+
+        Un índice es válido si sus primeras columnas corresponden a filtros de igualdad
+        (estado, tiene descripción), le siguen exactamente las claves de ordenamiento y,
+        como mucho, hay un filtro de rango sobre la primera clave de ordenamiento.
+        Si `sort` es None basta con que los filtros formen un prefijo del índice.
+
+        Raises:
+            UnsupportedTaskQueryException: Si ningún índice respalda la consulta.
+        """
+        equality, ranges = TaskQueryBuilder._filtered_columns(filters)
+
+        for index in TASK_LIST_INDEXES:
+            if sort is None:
+                prefix = index.columns[:len(equality)]
+                range_column = index.columns[len(equality)] if len(index.columns) > len(equality) else None
+                if set(prefix) == equality and ranges <= {range_column}:
+                    return index
+                continue
+
+            offset = len(index.columns) - len(sort.columns)
+            if offset < 0 or index.columns[offset:] != sort.columns:
+                continue
+            prefix = set(index.columns[:offset])
+            if prefix <= equality <= prefix | set(sort.columns) and ranges <= {sort.columns[0]}:
+                return index
+
+        raise UnsupportedTaskQueryException(
+            "La combinación de filtros y ordenamiento no está respaldada por un índice"
+        )
+
+    @staticmethod
+    def filter_conditions(user_id: int, filters: Optional[TaskFilterDTO]) -> list[ColumnElement]:
+        """
+        Condiciones WHERE del listado: pertenencia, exclusión de borrados y filtros opcionales.
+
+        Raises:
+            UnsupportedTaskQueryException: Si se intenta filtrar por el estado DELETED.
+        """
+        conditions = [Task.status != TaskStatus.DELETED, Task.user_id == user_id]
+        if filters is None:
+            return conditions
+
+        if filters.status:
+            if TaskStatus.DELETED in filters.status:
+                raise UnsupportedTaskQueryException("No es posible listar tareas eliminadas")
+            conditions.append(Task.status.in_(filters.status))
+        if filters.created_from is not None:
+            conditions.append(Task.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            conditions.append(Task.created_at < filters.created_to)
+        if filters.updated_from is not None:
+            conditions.append(MODIFIED_AT >= filters.updated_from)
+        if filters.updated_to is not None:
+            conditions.append(MODIFIED_AT < filters.updated_to)
+        if filters.has_description is not None:
+            conditions.append(HAS_DESCRIPTION == (true() if filters.has_description else false()))
+        return conditions
+
+    @staticmethod
+    def order_by(sort: TaskSort) -> list[ColumnElement]:
+        """Cláusulas ORDER BY del ordenamiento, con el id como desempate final."""
+        expressions = [key.expression for key in sort.keys] + [Task.id]
+        return [expr.desc() if sort.descending else expr.asc() for expr in expressions]
+
+    @staticmethod
+    def keyset_condition(sort: TaskSort, cursor: str) -> ColumnElement:
+        """
+        Condición de keyset que posiciona la consulta justo después del cursor.
+        Al compartir dirección todas las claves, basta una comparación de tuplas.
+
+        Raises:
+            InvalidCursorException: Si el cursor está malformado o pertenece a otro ordenamiento.
+        """
+        try:
+            spec, *values = decode_cursor(cursor)
+            if spec != sort.spec or len(values) != len(sort.keys) + 1:
+                raise ValueError("El cursor no corresponde al ordenamiento")
+            *key_values, task_id = values
+            if not isinstance(task_id, int):
+                raise ValueError("Identificador inválido")
+            parsed = [key.parse(value) for key, value in zip(sort.keys, key_values)] + [task_id]
+        except (ValueError, TypeError):
+            raise InvalidCursorException()
+
+        row = tuple_(*[key.expression for key in sort.keys], Task.id)
+        return row < tuple(parsed) if sort.descending else row > tuple(parsed)
+
+    @staticmethod
+    def encode_next_cursor(sort: TaskSort, last: Task) -> str:
+        """Genera el cursor que apunta a la posición del último elemento devuelto."""
+        return encode_cursor([sort.spec] + [key.value_of(last) for key in sort.keys] + [last.id])
+
+    @staticmethod
+    def is_filtered(filters: Optional[TaskFilterDTO]) -> bool:
+        """Indica si se aplica algún filtro además de la pertenencia y la exclusión de borrados."""
+        equality, ranges = TaskQueryBuilder._filtered_columns(filters)
+        return bool(equality or ranges)
+
+    @staticmethod
+    def _filtered_columns(filters: Optional[TaskFilterDTO]) -> tuple[set[str], set[str]]:
+        """Columnas lógicas filtradas por igualdad y por rango."""
+        equality: set[str] = set()
+        ranges: set[str] = set()
+        if filters is None:
+            return equality, ranges
+        if filters.status:
+            equality.add("status")
+        if filters.has_description is not None:
+            equality.add("has_description")
+        if filters.created_from is not None or filters.created_to is not None:
+            ranges.add("created_at")
+        if filters.updated_from is not None or filters.updated_to is not None:
+            ranges.add("updated_at")
+        return equality, ranges
@@ -0,0 +1,90 @@
+import re
+from sqlalchemy import Double, Select, cast, func, literal_column, table, column, tuple_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql.elements import ColumnElement
+from app.models.task import Task
+from app.exceptions.task import UnsupportedTaskQueryException, InvalidCursorException
+from app.core.utils import encode_cursor, decode_cursor
+
+"""
+Búsqueda de texto completo sobre el título y la descripción de las tareas.
+
+En PostgreSQL se usa la columna generada `tasks.search_vector` (tsvector con las
+configuraciones 'spanish' e 'english') y su índice GIN. En SQLite se usa la tabla
+virtual FTS5 `tasks_fts`, creada junto a la tabla `tasks` (ver app/models/task.py),
+lo que permite probar la búsqueda sin un servidor PostgreSQL.
+"""
+
+# Configuraciones de texto de PostgreSQL: las semillas están en español,
+# pero los usuarios también redactan tareas en inglés
+SEARCH_CONFIGS = ("spanish", "english")
+
+# Columna generada en la migración; no se mapea en el modelo porque solo existe en PostgreSQL
+search_vector = literal_column("tasks.search_vector", TSVECTOR)
+
+tasks_fts = table("tasks_fts", column("rowid"))
+
+# Identificador del ordenamiento por relevancia dentro de los cursores
+RELEVANCE_SORT = "relevance"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class TaskSearch:
+    """
+    Expresiones de búsqueda para un término y un motor concretos.
+
+    Attributes:
+        rank: Relevancia de cada fila (mayor es más relevante).
+    """
+
+    def __init__(self, dialect_name: str, term: str):
+        """
+        Raises:
+            UnsupportedTaskQueryException: Si el término no contiene ninguna palabra.
+        """
+        term = term.strip()
+        words = _WORD_RE.findall(term)
+        if not words:
+            raise UnsupportedTaskQueryException("La búsqueda debe contener al menos una palabra")
+
+        self.dialect_name = dialect_name
+        if dialect_name == "sqlite":
+            # Cada palabra se entrecomilla para que la sintaxis de FTS5 no sea interpretada
+            match_query = " ".join(f'"{word}"' for word in words)
+            self._match = literal_column("tasks_fts").op("MATCH")(match_query)
+            # bm25 devuelve valores menores para los resultados más relevantes
+            self.rank = -func.bm25(literal_column("tasks_fts"))
+        else:
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIGS[0], term)
+            for config in SEARCH_CONFIGS[1:]:
+                ts_query = ts_query.op("||")(func.websearch_to_tsquery(config, term))
+            self._match = search_vector.op("@@")(ts_query)
+            # Se convierte a double precision para que el valor del cursor se compare sin pérdida
+            self.rank = cast(func.ts_rank_cd(search_vector, ts_query), Double)
+
+    def apply(self, query: Select) -> Select:
+        """Restringe la consulta a las tareas que coinciden con el término de búsqueda."""
+        if self.dialect_name == "sqlite":
+            query = query.join(tasks_fts, tasks_fts.c.rowid == Task.id)
+        return query.where(self._match)
+
+    def keyset_condition(self, cursor: str) -> ColumnElement:
+        """
+        Condición de keyset que continúa la búsqueda después de la posición del cursor.
+
+        Raises:
+            InvalidCursorException: Si el cursor está malformado o no es de una búsqueda.
+        """
+        try:
+            spec, rank, task_id = decode_cursor(cursor)
+            if spec != RELEVANCE_SORT or not isinstance(rank, (int, float)) or not isinstance(task_id, int):
+                raise ValueError("El cursor no corresponde a una búsqueda")
+        except (ValueError, TypeError):
+            raise InvalidCursorException()
+        return tuple_(self.rank, Task.id) < (rank, task_id)
+
+    @staticmethod
+    def encode_next_cursor(rank: float, task_id: int) -> str:
+        """Genera el cursor que apunta a la posición del último resultado devuelto."""
+        return encode_cursor([RELEVANCE_SORT, rank, task_id])
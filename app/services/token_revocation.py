@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import delete, exists, or_, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.revoked_token import RevokedToken
+from app.core.revocation import revocation_filter, jti_key, user_key
+from app.core.principal_cache import invalidation_backend
+from app.core.logging import logger
+
+
+class TokenRevocationService:
+    """
+    Revocación de tokens de acceso. La tabla `revoked_tokens` es la fuente de verdad;
+    el filtro en memoria (`revocation_filter`) solo evita consultarla en cada petición.
+
+    Cada revocación se añade al filtro del proceso actual y se publica en la transacción
+    por el canal de invalidaciones (backend postgres), de modo que los demás workers la
+    añaden al confirmarse. Con el backend memory los demás procesos la incorporan en su
+    siguiente refresco (AUTH_REVOCATION_REFRESH_SECONDS).
+    """
+
+    @staticmethod
+    async def _publish(db: AsyncSession, key: str) -> None:
+        """Publica la clave de revocación en la transacción en curso (se entrega solo si se confirma)."""
+        await db.run_sync(lambda session: invalidation_backend.publish(session, [key]))
+
+    @staticmethod
+    async def revoke_token(db: AsyncSession, jti: str, user_id: int, expires_at: Optional[datetime]) -> None:
+        """Revoca un token concreto (ej. logout) hasta su expiración."""
+        db.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        await TokenRevocationService._publish(db, jti_key(jti))
+        await db.commit()
+        revocation_filter.add(jti_key(jti))
+        logger.info("Token revocado", user_id=user_id, jti=jti)
+
+    @staticmethod
+    async def revoke_user(db: AsyncSession, user_id: int) -> None:
+        """
+        Revoca todos los tokens del usuario hasta `restore_user`. Es el punto de enganche
+        para deshabilitar una cuenta (aún no hay un flujo de administración que lo invoque).
+        """
+        db.add(RevokedToken(jti=None, user_id=user_id, expires_at=None))
+        await TokenRevocationService._publish(db, user_key(user_id))
+        await db.commit()
+        revocation_filter.add(user_key(user_id))
+        logger.info("Tokens del usuario revocados", user_id=user_id)
+
+    @staticmethod
+    async def restore_user(db: AsyncSession, user_id: int) -> None:
+        """Elimina la revocación general del usuario; los tokens revocados individualmente siguen revocados."""
+        await db.execute(
+            delete(RevokedToken).where(RevokedToken.user_id == user_id, RevokedToken.jti.is_(None))
+        )
+        await db.commit()
+        # Un filtro de Bloom no admite borrados: se reconstruye
+        await revocation_filter.rebuild(lambda: TokenRevocationService.load_keys(db))
+        logger.info("Revocación de tokens del usuario eliminada", user_id=user_id)
+
+    @staticmethod
+    async def is_revoked(db: AsyncSession, jti: Optional[str], user_id: int) -> bool:
+        """Comprobación exacta en la base de datos; confirma los positivos del filtro."""
+        condition = and_(RevokedToken.user_id == user_id, RevokedToken.jti.is_(None))
+        if jti is not None:
+            condition = or_(condition, RevokedToken.jti == jti)
+        return bool(await db.scalar(select(exists().where(condition))))
+
+    @staticmethod
+    async def load_keys(db: AsyncSession) -> list[str]:
+        """Claves del filtro para las revocaciones vigentes (sin expiración o no vencidas)."""
+        rows = await db.execute(
+            select(RevokedToken.jti, RevokedToken.user_id).where(
+                or_(RevokedToken.expires_at.is_(None), RevokedToken.expires_at > datetime.now(timezone.utc))
+            )
+        )
+        return [jti_key(jti) if jti is not None else user_key(user_id) for jti, user_id in rows.all()]
@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+import httpx
+from fastapi import FastAPI, Request
+from pydantic import TypeAdapter
+from app.api.responses import LEAN_MEDIA_TYPE, json_response, render_json
+from app.core.enums import TaskStatus
+from app.schemas.auth import CustomResponse
+from app.schemas.pagination import PaginatedResponse
+from app.schemas.task import TaskResponseDTO
+
+"""
+Benchmark de la serialización de una página de tareas.
+
+Compara el camino anterior (devolver `CustomResponse` y dejar que FastAPI lo procese según
+`response_model`) con `json_response` (una sola serialización a bytes con Pydantic) y con
+el perfil lean sin sobre. Se mide:
+
+* El paso de serialización aislado, donde el camino anterior reproduce los pasos clásicos
+  de FastAPI para un `response_model` (volcado a diccionario, revalidación, conversión a
+  tipos JSON y json.dumps).
+* La petición completa contra una aplicación FastAPI en proceso, sin base de datos, con la
+  versión de FastAPI instalada (las recientes ya serializan el `response_model` con
+  Pydantic, por lo que allí la diferencia se reduce a la revalidación omitida).
+
+Uso:
+
+    python -m benchmarks.serialization [--iterations N] [--page-size N]
+"""
+
+PageType = PaginatedResponse[TaskResponseDTO]
+EnvelopeType = CustomResponse[PageType]
+MESSAGE = "Tareas listadas exitosamente"
+
+
+def build_page(page_size: int) -> PageType:
+    created = datetime(2026, 1, 1, 12, 0)
+    items = [
+        TaskResponseDTO(
+            id=i, title=f"Tarea {i}", description=f"Descripción de la tarea {i}" if i % 3 else None,
+            status=list(TaskStatus)[i % 3], user_id=1,
+            created_at=created + timedelta(minutes=i), updated_at=created + timedelta(hours=i) if i % 2 else None
+        )
+        for i in range(1, page_size + 1)
+    ]
+    return PageType(items=items, total=1000, page=1, page_size=page_size, total_pages=1000 // page_size)
+
+
+def legacy_serialize(page: PageType, adapter: TypeAdapter) -> bytes:
+    """Pasos clásicos de FastAPI para un `response_model`: volcado, revalidación, modo JSON y json.dumps."""
+    envelope = CustomResponse(success=True, code=200, message=MESSAGE, data=page)
+    validated = adapter.validate_python(envelope.model_dump())
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_app(page: PageType) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/legacy", response_model=EnvelopeType)
+    async def legacy():
+        return CustomResponse(success=True, code=200, message=MESSAGE, data=page)
+
+    @app.get("/fast", response_model=EnvelopeType)
+    async def fast(request: Request):
+        return json_response(request, page, PageType, MESSAGE)
+
+    return app
+
+
+def measure(function, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def measure_requests(client: httpx.AsyncClient, path: str, headers: dict, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(title: str, results: dict[str, tuple[list[float], int]]) -> None:
+    print(title)
+    print(f"{'implementación':<22} {'p50 ms':>8} {'p95 ms':>8} {'media ms':>9} {'bytes':>8}")
+    for name, (timings, size) in results.items():
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        print(f"{name:<22} {statistics.median(timings):>8.3f} {p95:>8.3f} {statistics.fmean(timings):>9.3f} {size:>8}")
+    print()
+
+
+async def main(iterations: int, page_size: int) -> None:
+    page = build_page(page_size)
+    adapter = TypeAdapter(EnvelopeType)
+    envelope_prefix = b'{"success":true,"code":200,"message":"%s","data":' % MESSAGE.encode()
+
+    report(f"Serialización de una página de {page_size} tareas", {
+        "response_model clásico": (measure(lambda: legacy_serialize(page, adapter), iterations), len(legacy_serialize(page, adapter))),
+        "dump_json (actual)": (
+            measure(lambda: envelope_prefix + render_json(page, PageType) + b"}", iterations),
+            len(envelope_prefix + render_json(page, PageType) + b"}")
+        ),
+        "lean": (measure(lambda: render_json(page, PageType), iterations), len(render_json(page, PageType))),
+    })
+
+    transport = httpx.ASGITransport(app=build_app(page))
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        cases = {
+            "fastapi instalado": ("/legacy", {}),
+            "dump_json (actual)": ("/fast", {}),
+            "lean": ("/fast", {"Accept": LEAN_MEDIA_TYPE}),
+        }
+        results = {}
+        for name, (path, headers) in cases.items():
+            # Calentamiento: construcción perezosa de validadores y adaptadores
+            size = len((await client.get(path, headers=headers)).content)
+            results[name] = (await measure_requests(client, path, headers, iterations), size)
+        report(f"Petición completa (ASGI en proceso) de una página de {page_size} tareas", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara la serialización de las respuestas de tareas.")
+    parser.add_argument("--iterations", type=int, default=500, help="Repeticiones por implementación")
+    parser.add_argument("--page-size", type=int, default=100, help="Tareas por página")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.page_size))
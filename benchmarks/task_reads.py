@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from sqlalchemy import func, insert, select
+from app.api.responses import render_json
+from app.core.enums import CountStrategy, TaskStatus
+from app.db.session import AsyncSessionLocal, dispose_engines
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.pagination import PaginatedResponse
+from app.schemas.task import TaskResponseDTO
+from app.services.task import TaskService
+from app.services.task_query import TaskQueryBuilder
+
+"""
+Benchmark del listado de tareas (consulta, conversión y serialización de una página).
+
+Compara el camino anterior basado en el ORM (entidades Task en el identity map y
+TaskResponseDTO.model_validate por fila) con el actual de TaskService.list_tasks
+(proyección de columnas y modelos de lectura serializados con orjson). Mide la latencia
+por página y, en una pasada separada con tracemalloc, la memoria asignada por página.
+Se ejecuta contra DATABASE_URL; si el usuario tiene menos tareas que el tamaño de página
+se crean las que falten. Uso:
+
+    python -m benchmarks.task_reads [--iterations N] [--page-size N] [--email EMAIL]
+"""
+
+PageType = PaginatedResponse[TaskResponseDTO]
+
+
+# Camino anterior basado en el ORM, reproducido aquí como referencia de la comparación
+async def legacy_page(db, page_size: int, user_id: int) -> bytes:
+    sort = TaskQueryBuilder.parse_sort(None)
+    rows = (await db.scalars(
+        select(Task)
+        .where(*TaskQueryBuilder.filter_conditions(user_id, None))
+        .order_by(*TaskQueryBuilder.order_by(sort))
+        .limit(page_size + 1)
+    )).all()
+    items = rows[:page_size]
+    next_cursor = TaskQueryBuilder.encode_next_cursor(sort, items[-1]) if len(rows) > page_size else None
+    page = PageType(
+        items=[TaskResponseDTO.model_validate(item) for item in items],
+        total=None, page=1, page_size=page_size, total_pages=None, next_cursor=next_cursor
+    )
+    return render_json(page, PageType)
+
+
+async def current_page(db, page_size: int, user_id: int) -> bytes:
+    page = await TaskService.list_tasks(db, 1, page_size, user_id, count_strategy=CountStrategy.NONE)
+    return render_json(page, PageType)
+
+
+IMPLEMENTATIONS = {
+    "orm (anterior)": legacy_page,
+    "columnas (actual)": current_page,
+}
+
+
+async def ensure_tasks(user_id: int, page_size: int) -> None:
+    async with AsyncSessionLocal() as db:
+        existing = await db.scalar(
+            select(func.count()).select_from(Task).where(Task.user_id == user_id, Task.status != TaskStatus.DELETED)
+        )
+        missing = page_size + 1 - existing
+        if missing > 0:
+            await db.execute(insert(Task), [
+                {"title": f"Benchmark lectura {i}", "description": "Tarea de benchmark", "user_id": user_id}
+                for i in range(missing)
+            ])
+            await db.commit()
+
+
+async def measure(function, iterations: int, page_size: int, user_id: int) -> tuple[list[float], int]:
+    timings = []
+    size = 0
+    for _ in range(iterations):
+        # Una sesión por página, como en una petición
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            size = len(await function(db, page_size, user_id))
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings, size
+
+
+async def measure_memory(function, iterations: int, page_size: int, user_id: int) -> float:
+    """Pico medio de memoria asignada (KiB) durante la obtención de una página."""
+    peaks = []
+    for _ in range(iterations):
+        async with AsyncSessionLocal() as db:
+            tracemalloc.start()
+            await function(db, page_size, user_id)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+    return statistics.fmean(peaks)
+
+
+async def run(iterations: int, page_size: int, email: str) -> None:
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(select(User.id).where(User.email == email))
+    if user_id is None:
+        raise SystemExit(f"No existe el usuario {email}")
+    await ensure_tasks(user_id, page_size)
+
+    results = {}
+    for name, function in IMPLEMENTATIONS.items():
+        # Calentamiento: conexiones del pool y compilación de sentencias en caché
+        await measure(function, 5, page_size, user_id)
+        timings, size = await measure(function, iterations, page_size, user_id)
+        memory = await measure_memory(function, max(1, iterations // 10), page_size, user_id)
+        results[name] = (timings, size, memory)
+
+    print(f"Página de {page_size} tareas")
+    print(f"{'implementación':<20} {'p50 ms':>8} {'p95 ms':>8} {'media ms':>9} {'pico KiB':>9} {'bytes':>8}")
+    for name, (timings, size, memory) in results.items():
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        print(
+            f"{name:<20} {statistics.median(timings):>8.2f} {p95:>8.2f} "
+            f"{statistics.fmean(timings):>9.2f} {memory:>9.1f} {size:>8}"
+        )
+    legacy, current = results.values()
+    print(f"Ahorro en p50: {statistics.median(legacy[0]) - statistics.median(current[0]):.2f} ms")
+
+
+async def main(iterations: int, page_size: int, email: str) -> None:
+    try:
+        await run(iterations, page_size, email)
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara la latencia y la memoria del listado de tareas.")
+    parser.add_argument("--iterations", type=int, default=300, help="Páginas obtenidas por implementación")
+    parser.add_argument("--page-size", type=int, default=100, help="Tareas por página (máximo 100)")
+    parser.add_argument("--email", default="admin@logika.com", help="Usuario propietario de las tareas")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.page_size, args.email))
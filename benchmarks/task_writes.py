@@ -0,0 +1,134 @@
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from sqlalchemy import event, select
+from app.db.session import AsyncSessionLocal, dispose_engines, engine
+from app.mappers.task import TaskMapper
+from app.core.enums import TaskStatus
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.task import TaskCreateDTO, TaskUpdateDTO, TaskResponseDTO
+from app.services.task import TaskService
+from app.services.task_count import TaskCountService
+
+"""
+Benchmark de las escrituras individuales de tareas (crear, actualizar, eliminar).
+
+Compara el camino anterior basado en el ORM (add + commit + refresh, select + commit +
+refresh, select + commit) con el actual de TaskService (una sola sentencia
+INSERT/UPDATE ... RETURNING por tarea). Mide la latencia de cada operación y las
+sentencias enviadas a la base de datos. Se ejecuta contra DATABASE_URL, por lo que
+conviene usar una base de datos de pruebas: las tareas creadas quedan eliminadas
+lógicamente. Uso:
+
+    python -m benchmarks.task_writes [--iterations N] [--email EMAIL]
+"""
+
+
+class StatementCounter:
+    """Cuenta las sentencias ejecutadas por el engine de tareas."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+# Camino anterior basado en el ORM, reproducido aquí como referencia de la comparación
+async def legacy_create(db, task_dto: TaskCreateDTO, user_id: int) -> TaskResponseDTO:
+    task = Task(title=task_dto.title, description=task_dto.description, status=task_dto.status, user_id=user_id)
+    task.change_version = await TaskCountService.bump_version(db, user_id)
+    db.add(task)
+    await TaskCountService.adjust(db, user_id, {task.status or TaskStatus.PENDING: 1})
+    await db.commit()
+    await db.refresh(task)
+    return TaskMapper.to_dto(task)
+
+
+async def legacy_update(db, task_id: int, update_dto: TaskUpdateDTO, user_id: int) -> TaskResponseDTO:
+    version = await TaskCountService.bump_version(db, user_id)
+    task = await TaskService.get_task_by_id(db, task_id, user_id)
+    for field in ("title", "description", "status"):
+        if getattr(update_dto, field) is not None:
+            setattr(task, field, getattr(update_dto, field))
+    task.updated_at = datetime.now()
+    task.change_version = version
+    await db.commit()
+    await db.refresh(task)
+    return TaskMapper.to_dto(task)
+
+
+async def legacy_delete(db, task_id: int, user_id: int) -> None:
+    task = await TaskService.get_task_by_id(db, task_id, user_id)
+    previous_status = task.status
+    task.status = TaskStatus.DELETED
+    task.updated_at = datetime.now()
+    task.change_version = await TaskCountService.bump_version(db, user_id)
+    await TaskCountService.adjust(db, user_id, {previous_status: -1, TaskStatus.DELETED: 1})
+    await db.commit()
+
+
+IMPLEMENTATIONS = {
+    "orm (anterior)": (legacy_create, legacy_update, legacy_delete),
+    "returning (actual)": (TaskService.create_task, TaskService.update_task, TaskService.delete_task),
+}
+
+
+async def run(iterations: int, email: str) -> None:
+    counter = StatementCounter()
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(select(User.id).where(User.email == email))
+    if user_id is None:
+        raise SystemExit(f"No existe el usuario {email}")
+
+    results: dict[str, dict[str, tuple[list[float], int]]] = {}
+    for name, (create, update, delete) in IMPLEMENTATIONS.items():
+        timings = {"create": [], "update": [], "delete": []}
+        statements = {"create": 0, "update": 0, "delete": 0}
+        for i in range(iterations):
+            # Una sesión por operación, como en una petición
+            for operation in ("create", "update", "delete"):
+                async with AsyncSessionLocal() as db:
+                    before = counter.count
+                    started = time.perf_counter()
+                    if operation == "create":
+                        task = await create(db, TaskCreateDTO(title=f"Benchmark {i}"), user_id)
+                    elif operation == "update":
+                        await update(db, task.id, TaskUpdateDTO(title=f"Benchmark {i} editada"), user_id)
+                    else:
+                        await delete(db, task.id, user_id)
+                    timings[operation].append((time.perf_counter() - started) * 1000)
+                    statements[operation] += counter.count - before
+        results[name] = {op: (timings[op], statements[op] / iterations) for op in timings}
+
+    print(f"{'implementación':<20} {'operación':<10} {'p50 ms':>8} {'p95 ms':>8} {'media ms':>9} {'sentencias':>11}")
+    for name, operations in results.items():
+        for operation, (timings, statements) in operations.items():
+            p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+            print(
+                f"{name:<20} {operation:<10} {statistics.median(timings):>8.2f} {p95:>8.2f} "
+                f"{statistics.fmean(timings):>9.2f} {statements:>11.1f}"
+            )
+    legacy, current = results.values()
+    for operation in ("create", "update", "delete"):
+        saved = statistics.median(legacy[operation][0]) - statistics.median(current[operation][0])
+        print(f"Ahorro en p50 de {operation}: {saved:.2f} ms")
+
+
+async def main(iterations: int, email: str) -> None:
+    try:
+        await run(iterations, email)
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara la latencia de las escrituras de tareas.")
+    parser.add_argument("--iterations", type=int, default=200, help="Tareas creadas, editadas y eliminadas por implementación")
+    parser.add_argument("--email", default="admin@logika.com", help="Usuario propietario de las tareas del benchmark")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.email))
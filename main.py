@@ -1,9 +1,18 @@
 from fastapi import FastAPI
 from app.api import router as api_router
-from app.core.logging import configure_logger, logger
+from app.api.endpoints.metrics import router as metrics_router
+from app.core.metrics import MetricsMiddleware
+from app.core.logging import configure_logger, shutdown_logger, logger
 from app.core.exception_registry import register_exception_handlers
 from app.db.init_db import init_db
-from app.db.session import SessionLocal
+from app.core.principal_cache import principal_cache, invalidation_backend
+from app.core.revocation import revocation_filter
+from app.core.hashing import password_executor
+from app.core.security import configure_bcrypt_rounds
+from app.services.task_import import TaskImportService
+from app.services.token_revocation import TokenRevocationService
+from app.db.instrumentation import QueryWatchMiddleware, instrument_engines
+from app.db.session import AsyncSessionLocal, AuthSessionLocal, dispose_engines, prewarm_pools, wait_for_database
 
 # Configuración inicial del logger estructurado
 configure_logger()
@@ -29,12 +38,18 @@ logger.info("Iniciando aplicación", title=app.title)
 
 # Registro de rutas modulares
 app.include_router(api_router, prefix="/api")
+app.include_router(metrics_router, prefix="/metrics")
 logger.info("Rutas de la API registradas")
 
 # Registro centralizado de manejadores de excepciones
 register_exception_handlers(app)
 logger.info("Manejadores de excepciones registrados")
 
+# Presupuesto de consultas por petición y métricas por plantilla de ruta (el último
+# middleware añadido es el más externo: las métricas incluyen el tiempo del resto)
+app.add_middleware(QueryWatchMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 @app.on_event("startup")
 async def startup_event() -> None:
     """
@@ -42,14 +57,35 @@ async def startup_event() -> None:
     Se utiliza para realizar la inicialización de la base de datos y semillas.
     """
     logger.info("Ejecutando evento de inicio (startup)")
-    db = SessionLocal()
-    try:
-        init_db(db)
-        logger.info("Base de datos inicializada correctamente")
-    except Exception as e:
-        logger.error(f"Error durante la inicialización de la base de datos: {e}")
-    finally:
-        db.close()
+    await configure_bcrypt_rounds()
+    instrument_engines()
+    await wait_for_database()
+    await prewarm_pools()
+    # Las revocaciones de tokens de otros workers llegan por el canal de invalidaciones
+    invalidation_backend.subscribe(revocation_filter.add)
+    await invalidation_backend.start(principal_cache)
+    async with AsyncSessionLocal() as db:
+        try:
+            await init_db(db)
+            logger.info("Base de datos inicializada correctamente")
+            # Las importaciones que procesaba un worker detenido no volverán a avanzar
+            await TaskImportService.fail_stale_imports(db)
+        except Exception as e:
+            logger.error(f"Error durante la inicialización de la base de datos: {e}")
+    await revocation_filter.start(AuthSessionLocal, TokenRevocationService.load_keys)
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """
+    Cierra las conexiones de los pools de la base de datos al detener el servidor
+    y vacía el buffer de logs.
+    """
+    await revocation_filter.stop()
+    await invalidation_backend.stop()
+    await dispose_engines()
+    password_executor.shutdown()
+    logger.info("Conexiones a la base de datos cerradas")
+    shutdown_logger()
 
 @app.get("/", summary="Bienvenida", tags=["General"])
 async def root():
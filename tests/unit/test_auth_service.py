@@ -1,40 +1,87 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.auth import authenticate_user
-from app.exceptions.auth import InvalidCredentialsException, UserNotFoundException
+from app.core.security import calibrate_bcrypt_rounds
+from app.core.login_throttle import LoginThrottle, MemoryThrottleStore
+from app.exceptions.auth import InvalidCredentialsException, UserNotFoundException, LoginThrottledException
 from app.models.user import User
 
-@patch("app.services.auth.verify_password")
+pytestmark = pytest.mark.anyio
+
+def mock_session(user) -> AsyncMock:
+    """Sesión asíncrona simulada cuya consulta de usuario devuelve `user`."""
+    db = AsyncMock(spec=AsyncSession)
+    db.execute.return_value = MagicMock()
+    db.execute.return_value.scalars.return_value.first.return_value = user
+    return db
+
+@patch("app.services.auth.verify_and_update_password_async")
 @patch("app.services.auth.create_access_token")
-def test_authenticate_user_success(mock_create_token, mock_verify):
+async def test_authenticate_user_success(mock_create_token, mock_verify):
     """Prueba la autenticación exitosa de un usuario."""
-    db = MagicMock()
     mock_user = User(id=1, email="admin@logika.com", hashed_password="hashed")
-    db.query().filter().first.return_value = mock_user
-    mock_verify.return_value = True
+    db = mock_session(mock_user)
+    mock_verify.return_value = (True, None)
     mock_create_token.return_value = "fake-jwt-token"
     
-    token = authenticate_user(db, "admin@logika.com", "password")
+    token = await authenticate_user(db, "admin@logika.com", "password")
     
     assert token == "fake-jwt-token"
-    mock_verify.assert_called_once()
+    mock_verify.assert_awaited_once()
     mock_create_token.assert_called_once()
+    db.commit.assert_not_awaited()
+
+@patch("app.services.auth.verify_and_update_password_async")
+@patch("app.services.auth.create_access_token")
+async def test_authenticate_user_rehashes_outdated_cost(mock_create_token, mock_verify):
+    """Prueba que un hash con un coste distinto del configurado se reemplace tras verificarlo."""
+    mock_user = User(id=1, email="admin@logika.com", hashed_password="$2b$10$antiguo")
+    db = mock_session(mock_user)
+    mock_verify.return_value = (True, "$2b$12$nuevo")
+
+    await authenticate_user(db, "admin@logika.com", "password")
 
-def test_authenticate_user_not_found():
+    assert mock_user.hashed_password == "$2b$12$nuevo"
+    db.commit.assert_awaited_once()
+
+async def test_authenticate_user_not_found():
     """Prueba el fallo cuando el usuario no existe."""
-    db = MagicMock()
-    db.query().filter().first.return_value = None
+    db = mock_session(None)
     
     with pytest.raises(UserNotFoundException):
-        authenticate_user(db, "no@existe.com", "password")
+        await authenticate_user(db, "no@existe.com", "password")
 
-@patch("app.services.auth.verify_password")
-def test_authenticate_user_wrong_password(mock_verify):
+@patch("app.services.auth.verify_and_update_password_async")
+async def test_authenticate_user_wrong_password(mock_verify):
     """Prueba el fallo cuando la contraseña es incorrecta."""
-    db = MagicMock()
     mock_user = User(id=1, email="admin@logika.com", hashed_password="hashed")
-    db.query().filter().first.return_value = mock_user
-    mock_verify.return_value = False
+    db = mock_session(mock_user)
+    mock_verify.return_value = (False, None)
     
     with pytest.raises(InvalidCredentialsException):
-        authenticate_user(db, "admin@logika.com", "wrong")
+        await authenticate_user(db, "admin@logika.com", "wrong")
+
+async def test_authenticate_user_throttled_skips_lookup_and_bcrypt():
+    """Prueba que un intento bloqueado se rechace sin consultar la base de datos ni ejecutar bcrypt."""
+    throttle = LoginThrottle(MemoryThrottleStore(100, 3600), 60, 3, 5, 10, 60)
+    db = mock_session(None)
+    with patch("app.services.auth.login_throttle", throttle):
+        for _ in range(3):
+            with pytest.raises(UserNotFoundException):
+                await authenticate_user(db, "no@existe.com", "password", "10.0.0.1")
+        db.execute.reset_mock()
+
+        with patch("app.services.auth.verify_and_update_password_async") as mock_verify:
+            with pytest.raises(LoginThrottledException):
+                await authenticate_user(db, "no@existe.com", "password", "10.0.0.1")
+
+    db.execute.assert_not_awaited()
+    mock_verify.assert_not_called()
+
+def test_calibrate_bcrypt_rounds_picks_highest_cost_within_budget():
+    """Prueba que la calibración elija el mayor coste que no supera el objetivo y deje de medir."""
+    timings = {10: 60.0, 11: 120.0, 12: 240.0, 13: 480.0}
+    with patch("app.core.security.measure_bcrypt_ms", side_effect=timings.get) as measure:
+        assert calibrate_bcrypt_rounds(250) == 12
+    assert measure.call_count == 4
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio.engine import create_async_engine
+from app.core.metrics import WaitStats
+from app.db.pool import InstrumentedAsyncPool, pool_status, prewarm_pool
+
+# Se usa `sqlalchemy.ext.asyncio.engine.create_async_engine` porque conftest sustituye
+# `sqlalchemy.ext.asyncio.create_async_engine`.
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncPool, pool_logging_name="tasks",
+        pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    yield engine
+    await engine.dispose()
+
+def test_wait_histogram_is_cumulative():
+    """Prueba que el histograma de espera acumule las observaciones por límite superior."""
+    stats = WaitStats()
+    for elapsed_ms in (0.4, 3, 3, 20000):
+        stats.observe_wait(elapsed_ms)
+
+    histogram = stats.wait_histogram()
+
+    assert (histogram["1"], histogram["5"], histogram["10000"], histogram["+Inf"]) == (1, 3, 3, 4)
+    assert stats.wait_count == 4
+
+async def test_pool_counts_waits_and_timeouts(engine):
+    """Prueba que el pool registre las esperas y cuente los timeouts cuando está agotado."""
+    assert await prewarm_pool(engine) == 1
+
+    async with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            async with engine.connect():
+                pass
+        status = pool_status(engine)
+
+    assert (status["checked_out"], status["overflow"], status["timeouts"]) == (1, 0, 1)
+    assert status["wait_ms_buckets"]["+Inf"] == 2
+
+    await engine.dispose()
+    # Las estadísticas sobreviven a la recreación del pool
+    assert pool_status(engine)["timeouts"] == 1
@@ -0,0 +1,45 @@
+import pytest
+import structlog
+from unittest.mock import patch
+from app.core.log_sampling import KeepRule, RateLimitProcessor, SamplingProcessor
+
+@pytest.fixture
+def keep():
+    return KeepRule("warning", slow_ms=500)
+
+def test_sampling_keeps_warnings_and_slow_requests(keep):
+    """Prueba que el muestreo descarte eventos de la ruta caliente pero conserve advertencias y peticiones lentas."""
+    sampler = SamplingProcessor({"Petición para listar tareas": 0.1}, 1.0, keep)
+
+    with patch("app.core.log_sampling.random.random", return_value=0.5):
+        with pytest.raises(structlog.DropEvent):
+            sampler(None, "info", {"event": "Petición para listar tareas", "level": "info"})
+        assert sampler(None, "info", {"event": "Otro evento", "level": "info"})["event"] == "Otro evento"
+        assert sampler(None, "warning", {"event": "Petición para listar tareas", "level": "warning"})
+        assert sampler(None, "info", {"event": "Petición para listar tareas", "level": "info", "duration_ms": 800})
+
+    with patch("app.core.log_sampling.random.random", return_value=0.05):
+        kept = sampler(None, "info", {"event": "Petición para listar tareas", "level": "info"})
+    assert kept["sample_rate"] == 0.1
+    assert sampler.sampled_out == 1
+
+def test_rate_limit_per_key_reports_suppressed_events(keep):
+    """Prueba el límite por clave y que el primer evento de la ventana siguiente informe los suprimidos."""
+    limiter = RateLimitProcessor(2, 1.0, ["event", "user_id"], max_keys=100, keep=keep)
+    event = {"event": "Tarea obtenida", "level": "info", "user_id": 1}
+
+    with patch("app.core.log_sampling.time.monotonic", return_value=10.0) as clock:
+        limiter(None, "info", dict(event))
+        limiter(None, "info", dict(event))
+        for _ in range(3):
+            with pytest.raises(structlog.DropEvent):
+                limiter(None, "info", dict(event))
+        # Otra clave y los errores no se ven afectados
+        assert limiter(None, "info", {**event, "user_id": 2})
+        assert limiter(None, "error", {**event, "level": "error"})
+
+        clock.return_value = 11.5
+        kept = limiter(None, "info", dict(event))
+
+    assert kept["suppressed"] == 3
+    assert limiter.rate_limited == 3
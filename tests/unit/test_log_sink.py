@@ -0,0 +1,34 @@
+import io
+import orjson
+from app.core.logging import BatchingLogSink
+
+def test_sink_writes_batches_and_flushes_on_stop():
+    """Prueba que el sink escriba por lotes todas las líneas encoladas al detenerse."""
+    stream = io.BytesIO()
+    sink = BatchingLogSink(stream, max_queue=100, batch_size=4, flush_interval=0.01)
+    for i in range(10):
+        sink.emit(orjson.dumps({"event": "evento", "n": i}))
+
+    sink.start()
+    sink.stop()
+
+    lines = [orjson.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["n"] for line in lines] == list(range(10))
+    assert sink.stats()["written"] == 10
+
+def test_sink_drops_and_counts_when_buffer_is_full():
+    """Prueba que con el buffer lleno los eventos se descarten sin bloquear y se informe la cantidad."""
+    stream = io.BytesIO()
+    sink = BatchingLogSink(stream, max_queue=2, batch_size=10, flush_interval=0.01)
+    # Sin iniciar el hilo nada consume la cola
+    for i in range(5):
+        sink.emit(b'{"n": %d}' % i)
+
+    sink.start()
+    sink.stop()
+    sink.emit(b'{"n": 99}')
+
+    lines = [orjson.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line.get("n") for line in lines] == [0, 1, None, 99]
+    assert lines[2]["dropped"] == 3
+    assert sink.stats()["dropped"] == 3
@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import patch
+from app.core.login_throttle import LoginThrottle, MemoryThrottleStore
+from app.exceptions.auth import LoginThrottledException
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def throttle():
+    return LoginThrottle(
+        MemoryThrottleStore(max_entries=100, ttl_seconds=3600),
+        window_seconds=60, max_failures_per_email=3, max_failures_per_ip=5,
+        lockout_seconds=10, max_lockout_seconds=25
+    )
+
+async def test_lockout_grows_exponentially_up_to_the_maximum(throttle):
+    """Prueba que cada bloqueo consecutivo duplique la duración del anterior, hasta el máximo."""
+    with patch("app.core.login_throttle.time.time", return_value=1000.0) as clock:
+        durations = []
+        for _ in range(3):
+            for _ in range(3):
+                await throttle.register_failure("Juan@Example.com ", None)
+            with pytest.raises(LoginThrottledException) as exc_info:
+                await throttle.check("juan@example.com", None)
+            durations.append(exc_info.value.retry_after)
+            clock.return_value += exc_info.value.retry_after
+
+        # Tras el bloqueo puede volver a intentarlo
+        await throttle.check("juan@example.com", None)
+
+    assert durations == [10, 20, 25]
+
+async def test_failures_outside_the_window_are_forgotten(throttle):
+    """Prueba que solo cuenten los fallos dentro de la ventana deslizante."""
+    with patch("app.core.login_throttle.time.time", return_value=1000.0) as clock:
+        await throttle.register_failure("juan@example.com", None)
+        await throttle.register_failure("juan@example.com", None)
+        clock.return_value = 1061.0
+        await throttle.register_failure("juan@example.com", None)
+
+        await throttle.check("juan@example.com", None)
+
+async def test_ip_is_locked_across_emails_and_success_resets_email(throttle):
+    """Prueba el contador por IP entre emails distintos y que un login correcto reinicie el del email."""
+    for _ in range(2):
+        await throttle.register_failure("juan@example.com", "10.0.0.1")
+    await throttle.register_success("juan@example.com")
+    await throttle.register_failure("juan@example.com", "10.0.0.1")
+    await throttle.check("juan@example.com", None)
+
+    for i in range(2):
+        await throttle.register_failure(f"otro{i}@example.com", "10.0.0.1")
+    with pytest.raises(LoginThrottledException):
+        await throttle.check("maria@example.com", "10.0.0.1")
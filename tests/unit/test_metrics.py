@@ -0,0 +1,78 @@
+from unittest.mock import patch
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from app.core.metrics import MetricsMiddleware, MetricsRegistry, current_request_queries, http_request_db_queries, http_requests_total
+
+def test_registry_renders_text_exposition_format():
+    """Prueba el formato de exposición: HELP/TYPE, etiquetas escapadas y buckets acumulados con +Inf."""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Peticiones.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latencia.", (), buckets=(0.1, 1.0))
+    registry.gauge_callback("pool_size", "Tamaño.", ("pool",), lambda: [(("tasks",), 10)])
+
+    requests.inc('/a"b')
+    requests.inc('/a"b')
+    latency.observe(0.05)
+    latency.observe(0.1)
+    latency.observe(3)
+
+    lines = registry.render().splitlines()
+    assert lines[:3] == ["# HELP requests_total Peticiones.", "# TYPE requests_total counter", 'requests_total{route="/a\\"b"} 2']
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+    assert 'pool_size{pool="tasks"} 10' in lines
+
+def test_middleware_labels_requests_by_route_template():
+    """Prueba que el middleware agrupe por plantilla de ruta (con el prefijo del router) y cuente las consultas."""
+    router = APIRouter()
+
+    @router.get("/{item_id}")
+    async def get_item(item_id: int):
+        # Simula dos sentencias registradas por los eventos del engine
+        current_request_queries.get().count += 2
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1/metrics-items")
+    app.add_middleware(MetricsMiddleware)
+    route = "/api/v1/metrics-items/{item_id}"
+    before = http_requests_total.value("GET", route, "200")
+
+    client = TestClient(app)
+    client.get("/api/v1/metrics-items/1")
+    client.get("/api/v1/metrics-items/2")
+    client.get("/api/v1/metrics-items/no-numerico")
+    client.get("/sin-ruta")
+
+    assert http_requests_total.value("GET", route, "200") == before + 2
+    assert http_requests_total.value("GET", route, "422") >= 1
+    assert http_requests_total.value("GET", "unmatched", "404") >= 1
+    assert http_request_db_queries.count("GET", route) >= 3
+    assert current_request_queries.get() is None
+
+def test_middleware_logs_slow_requests_with_duration():
+    """Prueba que solo las peticiones que superan LOG_SLOW_REQUEST_MS se registren, con su duración."""
+    app = FastAPI()
+
+    @app.get("/slow-items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware)
+    client = TestClient(app)
+
+    with patch("app.core.metrics.settings") as settings, patch("app.core.metrics.logger") as logger:
+        settings.LOG_SLOW_REQUEST_MS = 60_000
+        client.get("/slow-items/1")
+        logger.warning.assert_not_called()
+
+        settings.LOG_SLOW_REQUEST_MS = 0
+        client.get("/slow-items/1")
+
+    assert logger.warning.call_args.args[0] == "Petición HTTP lenta"
+    fields = logger.warning.call_args.kwargs
+    assert fields["route"] == "/slow-items/{item_id}"
+    assert fields["status_code"] == 200
+    assert fields["duration_ms"] >= 0
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.core.hashing import BoundedExecutor
+from app.exceptions.auth import PasswordHashingSaturatedException, PasswordHashingTimeoutException
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor("test-hash", max_workers=1, queue_size=1, queue_timeout=5)
+    yield executor
+    executor.shutdown()
+
+async def test_rejects_immediately_when_queue_is_full(executor):
+    """Prueba que con el hilo ocupado y la cola llena la siguiente tarea se rechace sin esperar."""
+    release = threading.Event()
+    running = asyncio.ensure_future(executor.run(release.wait))
+    queued = asyncio.ensure_future(executor.run(lambda: "encolada"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHashingSaturatedException) as exc_info:
+        await executor.run(lambda: "rechazada")
+
+    release.set()
+    assert await queued == "encolada"
+    await running
+    assert exc_info.value.retry_after == 5
+    status = executor.status()
+    assert (status["completed"], status["rejected"], status["in_flight"]) == (2, 1, 0)
+
+async def test_discards_tasks_that_waited_too_long(executor):
+    """Prueba que una tarea que superó la espera máxima en cola se descarte sin ejecutarse."""
+    executor.queue_timeout = 0.05
+    calls = []
+    slow = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHashingTimeoutException):
+        await executor.run(calls.append, "no debe ejecutarse")
+
+    await slow
+    assert calls == []
+    assert executor.status()["timeouts"] == 1
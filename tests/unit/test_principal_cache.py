@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio.engine import create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.api.deps import get_current_user, get_token_claims
+from app.core.principal_cache import PostgresInvalidationBackend, TTLCache, principal_cache
+from app.core.security import create_access_token
+from app.db.session import Base
+from app.models.user import User
+from app.schemas.auth import UserPrincipal
+
+# Se usa `sqlalchemy.ext.asyncio.engine.create_async_engine` porque conftest sustituye
+# `sqlalchemy.ext.asyncio.create_async_engine`.
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+def test_ttl_cache_evicts_least_recently_used_and_expires():
+    """Prueba que la caché desaloje la entrada menos usada y descarte las vencidas."""
+    cache = TTLCache(max_entries=2, ttl_seconds=10)
+    with patch("app.core.principal_cache.time.monotonic", return_value=100.0) as clock:
+        cache.set(1, "a")
+        cache.set(2, "b")
+        assert cache.get(1) == "a"
+        cache.set(3, "c")
+        assert cache.get(2) is None
+
+        clock.return_value = 111.0
+        assert cache.get(1) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]) == (1, 2, 1, 1)
+
+def test_ttl_cache_discards_values_read_before_an_invalidation():
+    """Prueba que no se guarde un valor leído de la fuente antes de una invalidación concurrente."""
+    cache = TTLCache(max_entries=10, ttl_seconds=10)
+    snapshot = cache.snapshot()
+    cache.invalidate(1)
+
+    cache.set(1, "obsoleto", snapshot)
+
+    assert cache.get(1) is None
+
+async def test_get_current_user_reads_database_once():
+    """Prueba que las peticiones siguientes del mismo usuario se resuelvan desde la caché."""
+    db = AsyncMock(spec=AsyncSession)
+    db.get.return_value = User(id=7, email="juan@example.com", hashed_password="x", full_name="Juan")
+    auth = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": "7"}))
+
+    claims = await get_token_claims(auth)
+
+    first = await get_current_user(db, claims)
+    second = await get_current_user(db, claims)
+
+    assert first == second == UserPrincipal(id=7, email="juan@example.com", full_name="Juan")
+    db.get.assert_awaited_once()
+    assert principal_cache.stats()["hits"] == 1
+
+async def test_committed_user_changes_invalidate_cache():
+    """Prueba que modificar un usuario mediante el ORM invalide su entrada solo al confirmar."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as db:
+        user = User(id=1, email="juan@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        principal_cache.set(1, UserPrincipal.model_validate(user))
+
+        user.full_name = "Juan Pérez"
+        await db.flush()
+        await db.rollback()
+        assert principal_cache.get(1) is not None
+
+        user.full_name = "Juan Pérez"
+        await db.commit()
+        assert principal_cache.get(1) is None
+    await engine.dispose()
+
+async def test_postgres_backend_reconnects_and_clears_cache_after_losing_connection():
+    """Prueba que, al perder la conexión LISTEN, se reconecte (con reintento) y se vacíe la caché."""
+    connections = []
+
+    def new_connection():
+        connection = MagicMock(add_listener=AsyncMock(), close=AsyncMock())
+        connection.add_termination_listener.side_effect = lambda callback: setattr(connection, "on_close", callback)
+        connection.is_closed.return_value = False
+        connections.append(connection)
+        return connection
+
+    # `asyncio.sleep` se sustituye para no esperar entre reintentos; se cede el control con la original
+    yield_control = asyncio.sleep
+    attempts = [new_connection(), OSError("sin conexión"), new_connection()]
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    backend = PostgresInvalidationBackend(health_check_seconds=60, reconnect_max_seconds=0.01)
+
+    with patch("asyncpg.connect", AsyncMock(side_effect=attempts)), \
+            patch("app.core.principal_cache.asyncio.sleep", AsyncMock()):
+        await backend.start(cache)
+        cache.set(1, "obsoleto")
+
+        connections[0].on_close(connections[0])
+        for _ in range(100):
+            if backend.reconnects:
+                break
+            await yield_control(0)
+        await backend.stop()
+
+    assert backend.reconnects == 1
+    assert cache.get(1) is None
+    connections[1].add_listener.assert_awaited_once()
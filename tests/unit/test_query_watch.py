@@ -0,0 +1,70 @@
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio.engine import create_async_engine
+from app.core.metrics import current_request_queries
+from app.db.instrumentation import QueryBudgetExceeded, QueryWatchMiddleware, instrument_engine, normalize_sql, query_budget
+
+# Se usa `sqlalchemy.ext.asyncio.engine.create_async_engine` porque conftest sustituye
+# `sqlalchemy.ext.asyncio.create_async_engine`.
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'watch.db'}")
+    instrument_engine(engine, "watch")
+    yield engine
+    await engine.dispose()
+
+def test_normalize_sql_collapses_literals_and_parameter_lists():
+    """Prueba que la normalización unifique las ejecuciones de una misma consulta."""
+    statement = "SELECT tasks.id\n  FROM tasks WHERE tasks.id IN ($1::INTEGER, $2::INTEGER) AND title = 'a''b' LIMIT 10"
+
+    assert normalize_sql(statement) == "SELECT tasks.id FROM tasks WHERE tasks.id IN (?) AND title = ? LIMIT ?"
+    assert normalize_sql("SELECT anon_1.id FROM t WHERE id IN (?, ?, ?)") == "SELECT anon_1.id FROM t WHERE id IN (?)"
+
+async def test_repeated_and_slow_statements_are_logged(engine):
+    """Prueba la detección de N+1, el registro de consultas lentas y el presupuesto de consultas."""
+    with patch("app.db.instrumentation.settings") as settings, patch("app.db.instrumentation.logger") as logger:
+        settings.DB_N_PLUS_ONE_THRESHOLD = 3
+        settings.DB_SLOW_QUERY_MS = 0
+        with pytest.raises(QueryBudgetExceeded):
+            with query_budget(3) as queries:
+                async with engine.connect() as conn:
+                    for task_id in range(4):
+                        await conn.execute(text("SELECT :id"), {"id": task_id})
+
+    assert queries.count == 4
+    assert queries.statements == {"SELECT ?": 4}
+    events = [call.args[0] for call in logger.warning.call_args_list]
+    assert events.count("Posible consulta N+1: sentencia repetida en la petición") == 1
+    assert events.count("Consulta lenta") == 4
+
+def test_middleware_enforces_query_budget():
+    """Prueba que, con DB_QUERY_BUDGET_ENFORCE, una petición que supera el presupuesto responda 500."""
+    app = FastAPI()
+
+    @app.get("/items")
+    async def list_items():
+        current_request_queries.get().count += 3
+        return []
+
+    app.add_middleware(QueryWatchMiddleware)
+    client = TestClient(app)
+
+    with patch("app.db.instrumentation.settings") as settings, patch("app.db.instrumentation.logger") as logger:
+        settings.DB_QUERY_BUDGET_ENFORCE = False
+        settings.DB_QUERY_BUDGET = 2
+        assert client.get("/items").status_code == 200
+        logger.warning.assert_called_once()
+        assert logger.warning.call_args.kwargs["endpoint"] == "GET /items"
+
+        settings.DB_QUERY_BUDGET_ENFORCE = True
+        response = client.get("/items")
+
+    # El 500 sustituye a la respuesta antes de enviarla (no llega el cuerpo del endpoint)
+    assert response.status_code == 500
+    assert response.json() == {"success": False, "code": 500, "message": "GET /items ejecutó 3 consultas (presupuesto: 2)"}
@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio.engine import create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.db.session import Base
+from app.models.user import User
+from app.models.task import Task
+from app.models.task_counter import TaskStatusCounter
+from app.services.task import TaskService
+from app.services.task_count import TaskCountService
+from app.schemas.task import TaskCreateDTO, TaskUpdateDTO, TaskFilterDTO, TaskBulkSelectionDTO, TaskBulkUpdateDTO
+from app.core.enums import TaskStatus
+
+# Se usa `sqlalchemy.ext.asyncio.engine.create_async_engine` porque conftest sustituye
+# `sqlalchemy.ext.asyncio.create_async_engine`.
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add_all([User(id=1, email="juan@example.com", hashed_password="x"),
+                     User(id=2, email="maria@example.com", hashed_password="x")])
+    await session.commit()
+    yield session
+    await session.close()
+    await engine.dispose()
+
+async def test_summary_follows_task_writes(db):
+    """Prueba que el resumen refleje creaciones, cambios de estado y borrados (individuales y masivos)."""
+    await TaskService.bulk_create_tasks(db, [{"title": "A"}, {"title": "B"}, {"title": "C", "status": "done"}], 1)
+    task = await TaskService.create_task(db, TaskCreateDTO(title="D", status=TaskStatus.IN_PROGRESS), 1)
+    await TaskService.create_task(db, TaskCreateDTO(title="Ajena"), 2)
+
+    await TaskService.update_task(db, task.id, TaskUpdateDTO(status=TaskStatus.DONE), 1)
+    await TaskService.bulk_update_tasks(
+        db, TaskBulkUpdateDTO(filters=TaskFilterDTO(status=[TaskStatus.PENDING]), changes=TaskUpdateDTO(status=TaskStatus.IN_PROGRESS)), 1
+    )
+    await TaskService.bulk_delete_tasks(db, TaskBulkSelectionDTO(ids=[task.id]), 1)
+
+    summary = await TaskService.get_summary(db, 1)
+
+    assert (summary.pending, summary.in_progress, summary.done, summary.total) == (0, 2, 1, 3)
+    assert (await TaskService.get_summary(db, 2)).pending == 1
+
+async def test_rebuild_repairs_drifted_counters(db):
+    """Prueba que el recálculo reconstruya los contadores a partir de la tabla de tareas."""
+    db.add_all([Task(title="A", status=TaskStatus.PENDING, user_id=1),
+                Task(title="B", status=TaskStatus.DELETED, user_id=1),
+                Task(title="C", status=TaskStatus.DONE, user_id=2)])
+    db.add(TaskStatusCounter(user_id=1, status=TaskStatus.DONE, count=7))
+    await db.commit()
+
+    await TaskCountService.rebuild(db, user_id=1)
+
+    rows = await db.execute(
+        select(TaskStatusCounter.status, TaskStatusCounter.count).where(TaskStatusCounter.user_id == 1)
+    )
+    assert dict(rows.all()) == {TaskStatus.PENDING: 1, TaskStatus.DELETED: 1}
+    # El recálculo de un usuario no toca los contadores de los demás
+    assert await db.scalar(select(func.count()).where(TaskStatusCounter.user_id == 2)) == 0
+    assert await TaskCountService.count_from_counter(db, None, 1) == 1
+
+async def test_get_changes_returns_updates_and_tombstones(db):
+    """Prueba que la sincronización incremental devuelva cambios y tombstones desde el token."""
+    first, second, third = [await TaskService.create_task(db, TaskCreateDTO(title=title), 1) for title in ("A", "B", "C")]
+
+    initial = await TaskService.get_changes(db, 1, None, 2)
+    rest = await TaskService.get_changes(db, 1, initial.sync_token, 2)
+    assert [task.title for task in initial.changed + rest.changed] == ["A", "B", "C"]
+    assert initial.has_more and not rest.has_more
+
+    await TaskService.update_task(db, first.id, TaskUpdateDTO(title="A2"), 1)
+    await TaskService.delete_task(db, second.id, 1)
+    delta = await TaskService.get_changes(db, 1, rest.sync_token, 10)
+
+    assert [task.title for task in delta.changed] == ["A2"]
+    assert [tombstone.id for tombstone in delta.deleted] == [second.id]
+    assert (await TaskService.get_changes(db, 1, delta.sync_token, 10)).changed == []
@@ -4,15 +4,16 @@ from main import app
 from app.api.deps import get_db, get_current_user
 from app.models.user import User
 from app.core.enums import TaskStatus
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
 # Mock de usuario
 MOCK_USER = User(id=1, email="test@example.com", full_name="Test User")
 
 # Override de dependencias
-def override_get_db():
-    return MagicMock()
+async def override_get_db():
+    return AsyncMock(spec=AsyncSession)
 
 def override_get_current_user():
     return MOCK_USER
@@ -25,16 +26,16 @@ client = TestClient(app)
 @patch("app.services.task.TaskService.create_task")
 def test_create_task_endpoint(mock_create):
     """Prueba el endpoint de creación de tareas."""
-    from app.models.task import Task
-    mock_task = Task(
+    from app.schemas.task import TaskResponseDTO
+    mock_create.return_value = TaskResponseDTO(
         id=1, 
         title="API Task", 
         description="Desc", 
         status=TaskStatus.PENDING, 
         user_id=1,
-        created_at=datetime.now() # Agregado para validatión Pydantic
+        created_at=datetime.now(),
+        updated_at=None
     )
-    mock_create.return_value = mock_task
     
     response = client.post("/api/v1/tasks/", json={"title": "API Task", "description": "Desc"})
     
@@ -73,3 +74,123 @@ def test_get_task_not_found_endpoint(mock_get):
     assert response.status_code == 404
     assert response.json()["success"] is False
     assert "No encontrada" in response.json()["message"]
+
+@patch("app.services.task.TaskService.export_tasks", new_callable=MagicMock)
+def test_export_tasks_endpoint_streams_ndjson(mock_export):
+    """Prueba que la exportación se sirva como NDJSON en streaming."""
+    async def chunks():
+        for chunk in ['{"id": 1}\n{"id": 2}\n', '{"id": 3}\n']:
+            yield chunk
+    mock_export.return_value = chunks()
+
+    response = client.get("/api/v1/tasks/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.text.splitlines() == ['{"id": 1}', '{"id": 2}', '{"id": 3}']
+
+@patch("app.services.task.TaskService.get_task_by_id")
+def test_get_task_endpoint_supports_conditional_get(mock_get):
+    """Prueba que la tarea se sirva con ETag y que un If-None-Match vigente devuelva 304 sin cuerpo."""
+    from app.models.task import Task
+    mock_get.return_value = Task(
+        id=1, title="Task", description=None, status=TaskStatus.PENDING,
+        user_id=1, created_at=datetime(2026, 1, 10, 12, 0), updated_at=None
+    )
+
+    first = client.get("/api/v1/tasks/1")
+    etag = first.headers["etag"]
+    second = client.get("/api/v1/tasks/1", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+@patch("app.services.task.TaskService.list_tasks")
+@patch("app.services.task.TaskService.list_etag", return_value='"v1"')
+def test_list_tasks_endpoint_not_modified(mock_etag, mock_list):
+    """Prueba que el listado responda 304 sin ejecutarse cuando el ETag del usuario sigue vigente."""
+    response = client.get("/api/v1/tasks/?page=2", headers={"If-None-Match": 'W/"v1"'})
+
+    assert response.status_code == 304
+    mock_list.assert_not_called()
+
+@patch("app.services.task.TaskService.list_tasks")
+@patch("app.services.task.TaskService.list_etag", return_value='"v1"')
+def test_list_tasks_endpoint_lean_profile(mock_etag, mock_list):
+    """Prueba que el sobre serializado coincida con el modelo y que el perfil lean devuelva solo `data`."""
+    from app.api.responses import LEAN_MEDIA_TYPE
+    from app.schemas.auth import CustomResponse
+    from app.schemas.pagination import PaginatedResponse
+    from app.schemas.task import TaskResponseDTO
+
+    page = PaginatedResponse[TaskResponseDTO](
+        items=[TaskResponseDTO(
+            id=1, title="Tarea ñ", description=None, status=TaskStatus.DONE,
+            user_id=1, created_at=datetime(2026, 1, 10, 12, 0), updated_at=None
+        )],
+        total=1, page=1, page_size=10, total_pages=1
+    )
+    mock_list.return_value = page
+
+    envelope = client.get("/api/v1/tasks/")
+    lean = client.get("/api/v1/tasks/", headers={"Accept": f"{LEAN_MEDIA_TYPE}, application/json;q=0.5"})
+
+    expected = CustomResponse(success=True, code=200, message="Tareas listadas exitosamente", data=page)
+    assert envelope.json() == expected.model_dump(mode="json")
+    assert lean.status_code == 200
+    assert lean.headers["content-type"] == LEAN_MEDIA_TYPE
+    assert envelope.headers["etag"] == '"v1"'
+    assert lean.headers["etag"] == '"v1-lean"'
+    assert lean.headers["vary"] == "Accept"
+    assert lean.json() == page.model_dump(mode="json")
+
+    # El ETag de una representación no revalida la otra; el 304 también varía según Accept
+    lean_headers = {"Accept": LEAN_MEDIA_TYPE}
+    assert client.get("/api/v1/tasks/", headers={**lean_headers, "If-None-Match": '"v1"'}).status_code == 200
+    revalidated = client.get("/api/v1/tasks/", headers={**lean_headers, "If-None-Match": '"v1-lean"'})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == '"v1-lean"'
+    assert revalidated.headers["vary"] == "Accept"
+
+@patch("app.services.task.TaskService.update_task")
+def test_update_task_endpoint_accepts_lean_etag_in_if_match(mock_update):
+    """Prueba que If-Match acepte el ETag de la representación lean como el del recurso."""
+    from app.api.responses import LEAN_MEDIA_TYPE
+    from app.schemas.task import TaskResponseDTO
+    mock_update.return_value = TaskResponseDTO(
+        id=1, title="Nuevo", description=None, status=TaskStatus.PENDING,
+        user_id=1, created_at=datetime(2026, 1, 10, 12, 0), updated_at=None
+    )
+
+    response = client.put(
+        "/api/v1/tasks/1", json={"title": "Nuevo"},
+        headers={"Accept": LEAN_MEDIA_TYPE, "If-Match": '"v1-lean"'}
+    )
+
+    assert response.status_code == 200
+    assert mock_update.call_args.kwargs["if_match"] == '"v1"'
+    assert response.headers["etag"].endswith('-lean"')
+
+@patch("app.services.task.TaskService.list_tasks")
+def test_list_tasks_endpoint_serializes_read_models_like_dtos(mock_list):
+    """Prueba que la página de modelos de lectura produzca el mismo JSON que la de DTOs."""
+    from datetime import timezone
+    from app.mappers.task import TaskMapper
+    from app.schemas.pagination import PaginatedResponse
+    from app.schemas.task import TaskResponseDTO
+
+    row = (7, "Tarea ñ", "Desc", TaskStatus.IN_PROGRESS, 1,
+           datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc), datetime(2026, 1, 11, 8, 30, 0, 125, tzinfo=timezone.utc))
+    items = TaskMapper.to_read_models([row])
+    mock_list.return_value = TaskMapper.to_paginated_read(items, 11, 1, 10, "cursor")
+
+    response = client.get("/api/v1/tasks/")
+
+    expected = PaginatedResponse[TaskResponseDTO](
+        items=[TaskResponseDTO.model_validate(items[0], from_attributes=True)],
+        total=11, page=1, page_size=10, total_pages=2, next_cursor="cursor"
+    )
+    assert response.status_code == 200
+    assert response.json()["data"] == expected.model_dump(mode="json")
@@ -0,0 +1,211 @@
+import io
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio.engine import create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.db.session import Base
+from app.models.user import User
+from app.models.task import Task
+from app.models.task_counter import TaskStatusCounter
+from app.services.task_import import TaskImportService
+from app.models.task_import import TaskImport
+from app.exceptions.task import ImportTooLargeException
+from app.core.enums import TaskStatus, TaskImportFormat, TaskImportStatus
+
+# Se usa `sqlalchemy.ext.asyncio.engine.create_async_engine` porque conftest sustituye
+# `sqlalchemy.ext.asyncio.create_async_engine`.
+# En SQLite los lotes se insertan con INSERT de múltiples filas en lugar de COPY.
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with factory() as session:
+        session.add(User(id=1, email="juan@example.com", hashed_password="x"))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+@pytest.fixture
+async def db(session_factory):
+    session = session_factory()
+    yield session
+    await session.close()
+
+@pytest.fixture(autouse=True)
+def import_settings(tmp_path):
+    with patch("app.services.task_import.settings") as mock_settings:
+        mock_settings.TASK_IMPORT_BATCH_SIZE = 2
+        mock_settings.TASK_IMPORT_REJECTS_DIR = str(tmp_path)
+        mock_settings.TASK_IMPORT_SPOOL_MAX_MEMORY = 4
+        mock_settings.TASK_IMPORT_MAX_UPLOAD_BYTES = 10
+        mock_settings.TASK_IMPORT_STALE_SECONDS = 60
+        yield mock_settings
+
+async def test_run_import_csv_loads_valid_rows_in_batches(db):
+    """Prueba que el CSV se cargue por lotes, asigne el propietario y reporte las filas rechazadas."""
+    data = (
+        "title,description,status\n"
+        'Tarea A,"varias\nlíneas",done\n'
+        "Tarea B,,\n"
+        ",sin título,pending\n"
+        "Tarea C,,in_progress\n"
+    ).encode()
+    job = await TaskImportService.create_import(db, 1, TaskImportFormat.CSV)
+
+    with patch.object(TaskImportService, "_load_batch", wraps=TaskImportService._load_batch) as load_batch:
+        job = await TaskImportService.run_import(db, job, io.BytesIO(data))
+
+    assert load_batch.call_count == 2
+    assert job.status == TaskImportStatus.COMPLETED
+    assert (job.total_rows, job.imported_rows, job.rejected_rows) == (4, 3, 1)
+
+    tasks = (await db.scalars(select(Task).order_by(Task.id))).all()
+    assert [(t.title, t.description, t.status) for t in tasks] == [
+        ("Tarea A", "varias\nlíneas", TaskStatus.DONE),
+        ("Tarea B", None, TaskStatus.PENDING),
+        ("Tarea C", None, TaskStatus.IN_PROGRESS),
+    ]
+    assert all(t.user_id == 1 for t in tasks)
+    rows = await db.execute(
+        select(TaskStatusCounter.status, TaskStatusCounter.count).where(TaskStatusCounter.user_id == 1)
+    )
+    assert dict(rows.all()) == {TaskStatus.DONE: 1, TaskStatus.PENDING: 1, TaskStatus.IN_PROGRESS: 1}
+
+    with open(await TaskImportService.get_rejected_path(db, job.id, 1)) as rejected:
+        lines = [json.loads(line) for line in rejected]
+    assert lines == [{"line": 5, "errors": ["title: Field required"], "row": {"description": "sin título", "status": "pending"}}]
+
+async def test_run_import_ndjson_rejects_malformed_lines(db):
+    """Prueba que las líneas con JSON inválido se rechacen sin interrumpir la importación."""
+    data = b'{"title": "Tarea A"}\n\n{malformado\n{"title": "Tarea B", "user_id": 99}\n'
+    job = await TaskImportService.create_import(db, 1, TaskImportFormat.NDJSON)
+
+    job = await TaskImportService.run_import(db, job, io.BytesIO(data))
+
+    assert (job.total_rows, job.imported_rows, job.rejected_rows) == (3, 2, 1)
+    # El propietario siempre es el usuario de la importación, nunca el indicado en el archivo
+    assert set((await db.scalars(select(Task.user_id))).all()) == {1}
+
+async def test_run_import_marks_failed_and_keeps_previous_batches(db):
+    """Prueba que un error de base de datos deje la importación en FAILED conservando los lotes confirmados."""
+    data = b'{"title": "A"}\n{"title": "B"}\n{"title": "C"}\n'
+    job = await TaskImportService.create_import(db, 1, TaskImportFormat.NDJSON)
+    original = TaskImportService._load_batch
+    calls = []
+
+    async def failing_load_batch(session, import_job, values):
+        calls.append(values)
+        if len(calls) > 1:
+            raise RuntimeError("conexión perdida")
+        await original(session, import_job, values)
+
+    with patch.object(TaskImportService, "_load_batch", side_effect=failing_load_batch):
+        job = await TaskImportService.run_import(db, job, io.BytesIO(data))
+
+    assert job.status == TaskImportStatus.FAILED
+    assert job.imported_rows == 2
+    assert await db.scalar(select(func.count()).select_from(Task)) == 2
+
+async def test_run_import_commits_rejected_only_batches_and_trims_rejects_on_failure(db, session_factory):
+    """Prueba que un lote sin filas válidas confirme su progreso y que un fallo no deje rechazadas sin contar."""
+    data = b'{malformado\n{"description": "sin t\xc3\xadtulo"}\n{"title": "A"}\n{otro malformado\n'
+    job = await TaskImportService.create_import(db, 1, TaskImportFormat.NDJSON)
+    original = TaskImportService._load_batch
+
+    async def failing_load_batch(session, import_job, values):
+        if values:
+            raise RuntimeError("conexión perdida")
+        await original(session, import_job, values)
+
+    with patch.object(TaskImportService, "_load_batch", side_effect=failing_load_batch):
+        job = await TaskImportService.run_import(db, job, io.BytesIO(data))
+
+    async with session_factory() as session:
+        stored = await session.get(TaskImport, job.id)
+        assert stored.status == TaskImportStatus.FAILED
+        assert (stored.total_rows, stored.imported_rows, stored.rejected_rows) == (2, 0, 2)
+    with open(await TaskImportService.get_rejected_path(db, job.id, 1)) as rejected:
+        assert [json.loads(line)["line"] for line in rejected] == [1, 2]
+
+async def test_stale_processing_imports_are_marked_failed(db, session_factory):
+    """Prueba que las importaciones en curso sin progreso se marquen como fallidas al arrancar y al consultarlas."""
+    long_ago = datetime.now(timezone.utc) - timedelta(minutes=5)
+    stale = await TaskImportService.create_import(db, 1, TaskImportFormat.CSV)
+    active = await TaskImportService.create_import(db, 1, TaskImportFormat.CSV)
+    await db.execute(update(TaskImport).where(TaskImport.id == stale.id).values(created_at=long_ago, updated_at=None))
+    await db.commit()
+
+    assert await TaskImportService.fail_stale_imports(db) == 1
+    # Una importación que deja de avanzar después del arranque se detecta al consultarla
+    stale_on_read = await TaskImportService.create_import(db, 1, TaskImportFormat.CSV)
+    await db.execute(update(TaskImport).where(TaskImport.id == stale_on_read.id).values(updated_at=long_ago))
+    await db.commit()
+
+    async with session_factory() as session:
+        assert (await TaskImportService.get_import(session, stale.id, 1)).status == TaskImportStatus.FAILED
+        assert (await TaskImportService.get_import(session, active.id, 1)).status == TaskImportStatus.PROCESSING
+        job = await TaskImportService.get_import(session, stale_on_read.id, 1)
+        assert (job.status, job.finished_at is not None) == (TaskImportStatus.FAILED, True)
+        assert job.error.startswith("La importación se interrumpió")
+
+async def test_receive_upload_enforces_max_size_before_spooling():
+    """Prueba que el tamaño máximo se compruebe con Content-Length y mientras se recibe el cuerpo."""
+    consumed = []
+
+    async def chunks(*parts):
+        for part in parts:
+            consumed.append(part)
+            yield part
+
+    upload = await TaskImportService.receive_upload(chunks(b"12345", b"67890"))
+    assert upload.read() == b"1234567890"
+    upload.close()
+
+    with pytest.raises(ImportTooLargeException):
+        await TaskImportService.receive_upload(chunks(b"x"), declared_size=11)
+    consumed.clear()
+    with pytest.raises(ImportTooLargeException):
+        await TaskImportService.receive_upload(chunks(b"123456", b"789012", b"no se lee"))
+    assert consumed == [b"123456", b"789012"]
+
+async def test_run_import_in_background_uses_its_own_session(session_factory, db):
+    """Prueba que la importación en segundo plano se complete con su propia sesión y cierre el archivo."""
+    job = await TaskImportService.create_import(db, 1, TaskImportFormat.NDJSON)
+    source = io.BytesIO(b'{"title": "A"}\n{"title": "B"}\n')
+
+    await TaskImportService.run_import_in_background(session_factory, job.id, source)
+
+    assert source.closed
+    async with session_factory() as session:
+        finished = await session.get(TaskImport, job.id)
+        assert (finished.status, finished.imported_rows) == (TaskImportStatus.COMPLETED, 2)
+
+async def test_copy_batch_stages_rows_and_merges_with_owner():
+    """Prueba que en PostgreSQL el lote se envíe con COPY y se fusione asignando el propietario."""
+    db = AsyncMock(spec=AsyncSession)
+    raw_connection = db.connection.return_value.get_raw_connection.return_value
+    copy_records = raw_connection.driver_connection.copy_records_to_table = AsyncMock()
+    values = [
+        {"title": 'Dice "hola"', "description": None, "status": TaskStatus.PENDING, "user_id": 7},
+        {"title": "B", "description": "", "status": TaskStatus.DONE, "user_id": 7},
+    ]
+
+    await TaskImportService._copy_batch(db, 7, 3, values)
+
+    # NULL y la cadena vacía se conservan sin codificación intermedia
+    copy_records.assert_awaited_once_with(
+        "task_import_staging",
+        records=[('Dice "hola"', None, "pending"), ("B", "", "done")],
+        columns=["title", "description", "status"]
+    )
+    merge_params = db.execute.call_args[0][1]
+    assert merge_params == {"user_id": 7, "change_version": 3}
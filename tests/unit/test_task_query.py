@@ -0,0 +1,61 @@
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy.dialects import postgresql
+from app.services.task_query import TaskQueryBuilder
+from app.schemas.task import TaskFilterDTO
+from app.models.task import Task
+from app.exceptions.task import UnsupportedTaskQueryException, InvalidCursorException
+from app.core.enums import TaskStatus
+
+def test_parse_sort_default_and_status_tiebreak():
+    """Prueba el ordenamiento por defecto y el desempate implícito del estado."""
+    assert TaskQueryBuilder.parse_sort(None).spec == "-created_at"
+
+    sort = TaskQueryBuilder.parse_sort("-status")
+    assert sort.spec == "-status,-created_at"
+    assert sort.descending is True
+
+@pytest.mark.parametrize("spec", ["description", "title,-created_at", "title,title"])
+def test_parse_sort_rejects_invalid_specs(spec):
+    """Prueba que se rechacen claves no permitidas, direcciones mezcladas y repeticiones."""
+    with pytest.raises(UnsupportedTaskQueryException):
+        TaskQueryBuilder.parse_sort(spec)
+
+def test_find_index_maps_filters_to_composite_index():
+    """Prueba que cada combinación soportada se resuelva a su índice compuesto."""
+    by_status = TaskFilterDTO(status=[TaskStatus.PENDING])
+    updated_range = TaskFilterDTO(updated_from=datetime(2026, 1, 1, tzinfo=timezone.utc))
+
+    assert TaskQueryBuilder.find_index(None, TaskQueryBuilder.parse_sort(None)).name == "ix_tasks_user_id_created_at_id"
+    assert TaskQueryBuilder.find_index(by_status, TaskQueryBuilder.parse_sort("-updated_at")).name == "ix_tasks_user_id_status_modified_at_id"
+    assert TaskQueryBuilder.find_index(updated_range, TaskQueryBuilder.parse_sort("-updated_at")).name == "ix_tasks_user_id_modified_at_id"
+    assert TaskQueryBuilder.find_index(by_status, None).name == "ix_tasks_user_id_status_created_at_id"
+
+def test_find_index_rejects_unindexed_combination():
+    """Prueba que un filtro sin índice que lo respalde sea rechazado."""
+    filters = TaskFilterDTO(has_description=True)
+
+    with pytest.raises(UnsupportedTaskQueryException):
+        TaskQueryBuilder.find_index(filters, TaskQueryBuilder.parse_sort("title"))
+
+@pytest.mark.parametrize("has_description", [True, False])
+def test_has_description_filter_matches_index_expression(has_description):
+    """Prueba que el filtro compare la expresión indexada en ambos sentidos (no `description IS NULL`)."""
+    dialect = postgresql.dialect()
+    index = next(i for i in Task.__table__.indexes if i.name == "ix_tasks_user_id_has_description_created_at_id")
+    indexed = str(index.expressions[1].compile(dialect=dialect))
+
+    condition = TaskQueryBuilder.filter_conditions(1, TaskFilterDTO(has_description=has_description))[-1]
+    compiled = str(condition.compile(dialect=dialect))
+
+    assert compiled == f"({indexed}) = {str(has_description).lower()}"
+    assert TaskQueryBuilder.find_index(TaskFilterDTO(has_description=has_description), None).name == index.name
+
+def test_cursor_is_bound_to_its_sort():
+    """Prueba que un cursor emitido para un ordenamiento no sirva para otro."""
+    task = Task(id=7, title="Informe", created_at=datetime(2026, 1, 5, tzinfo=timezone.utc))
+    cursor = TaskQueryBuilder.encode_next_cursor(TaskQueryBuilder.parse_sort("title"), task)
+
+    TaskQueryBuilder.keyset_condition(TaskQueryBuilder.parse_sort("title"), cursor)
+    with pytest.raises(InvalidCursorException):
+        TaskQueryBuilder.keyset_condition(TaskQueryBuilder.parse_sort("-created_at"), cursor)
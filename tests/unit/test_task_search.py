@@ -0,0 +1,75 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio.engine import create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.db.session import Base
+from app.models.user import User
+from app.models.task import Task
+from app.services.task import TaskService
+from app.core.enums import TaskStatus
+from app.exceptions.task import UnsupportedTaskQueryException
+
+# Se usa `sqlalchemy.ext.asyncio.engine.create_async_engine` porque conftest sustituye
+# `sqlalchemy.ext.asyncio.create_async_engine`.
+# La búsqueda corre sobre la tabla FTS5 de SQLite, sin necesidad de PostgreSQL.
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add_all([User(id=1, email="juan@example.com", hashed_password="x"),
+                     User(id=2, email="maria@example.com", hashed_password="x")])
+    base = datetime(2026, 1, 1, 9, 0)
+    tasks = [
+        ("Revisión de código", "Revisar los Pull Requests pendientes del backend.", 1),
+        ("Optimizar base de datos", "Analizar índices y planes de ejecución.", 1),
+        ("Revisión de logs", "Buscar errores recurrentes en producción.", 1),
+        ("Reunión con cliente", "Discutir requerimientos del módulo de inventario.", 1),
+        ("Revisión de presupuesto", "Código de costos del trimestre.", 2),
+    ]
+    for i, (title, description, user_id) in enumerate(tasks):
+        session.add(Task(title=title, description=description, user_id=user_id,
+                         status=TaskStatus.PENDING, created_at=base + timedelta(minutes=i)))
+    await session.commit()
+    yield session
+    await session.close()
+    await engine.dispose()
+
+async def test_search_tasks_ranks_title_matches_first(db):
+    """Prueba que la búsqueda ignore tildes, respete la propiedad y priorice coincidencias en el título."""
+    result = await TaskService.search_tasks(db, "codigo", 1, 10, 1)
+
+    assert [task.title for task in result.items] == ["Revisión de código"]
+    assert result.total == 1
+
+async def test_search_tasks_keyset_pagination(db):
+    """Prueba que el cursor de la búsqueda recorra todos los resultados sin repetir."""
+    first = await TaskService.search_tasks(db, "revision", 1, 1, 1)
+    second = await TaskService.search_tasks(db, "revision", 1, 1, 1, cursor=first.next_cursor)
+
+    titles = {task.title for task in first.items + second.items}
+    assert titles == {"Revisión de código", "Revisión de logs"}
+    assert first.page == 1
+    assert second.page is None
+    assert second.next_cursor is None
+
+async def test_search_tasks_excludes_deleted(db):
+    """Prueba que las tareas eliminadas no aparezcan en la búsqueda."""
+    task = (await db.scalars(select(Task).where(Task.title == "Revisión de logs"))).one()
+    task.status = TaskStatus.DELETED
+    await db.commit()
+
+    result = await TaskService.search_tasks(db, "logs", 1, 10, 1)
+
+    assert result.items == []
+
+async def test_search_tasks_requires_words(db):
+    """Prueba que una búsqueda sin palabras sea rechazada."""
+    with pytest.raises(UnsupportedTaskQueryException):
+        await TaskService.search_tasks(db, "  ** ", 1, 10, 1)
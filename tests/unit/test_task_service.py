@@ -1,61 +1,258 @@
+import json
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.task import TaskService
 from app.models.task import Task
-from app.schemas.task import TaskCreateDTO
-from app.exceptions.task import TaskNotFoundException, NotTaskOwnerException
-from app.core.enums import TaskStatus
+from app.schemas.task import TaskCreateDTO, TaskUpdateDTO, TaskFilterDTO, TaskBulkSelectionDTO, TaskBulkUpdateDTO
+from app.exceptions.task import (
+    TaskNotFoundException, NotTaskOwnerException, InvalidCursorException, BulkLimitExceededException,
+    TaskPreconditionFailedException
+)
+from app.core.config import settings
+from app.core.enums import TaskStatus, CountStrategy
+from app.core.utils import encode_cursor, decode_cursor
+from datetime import datetime, timezone
+from types import SimpleNamespace
 
-def test_create_task_success():
+pytestmark = pytest.mark.anyio
+
+def mock_session() -> AsyncMock:
+    """Sesión asíncrona simulada; los resultados de las consultas se configuran como mocks síncronos."""
+    db = AsyncMock(spec=AsyncSession)
+    db.execute.return_value = MagicMock()
+    db.scalars.return_value = MagicMock()
+    db.stream.return_value = MagicMock()
+    return db
+
+def returned_row(status: TaskStatus, previous_status: TaskStatus = None, **values) -> SimpleNamespace:
+    """Fila devuelta por un INSERT/UPDATE ... RETURNING (con el estado previo, si se indica)."""
+    row = {"id": 1, "title": "T", "description": None, "status": status, "user_id": 1,
+           "created_at": datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc), "updated_at": None, **values}
+    if previous_status is not None:
+        row["previous_status"] = previous_status.value
+    return SimpleNamespace(**row)
+
+def task_row(task_id: int, title: str, created_at: datetime, *extra) -> tuple:
+    """Fila proyectada por las lecturas (columnas de TaskReadModel y columnas adicionales al final)."""
+    return (task_id, title, None, TaskStatus.PENDING, 1, created_at, None, *extra)
+
+async def test_create_task_success():
     """Prueba la creación exitosa de una tarea en el servicio."""
-    db = MagicMock()
+    db = mock_session()
+    db.execute.return_value.one.return_value = returned_row(TaskStatus.PENDING, title="Test Task", description="Desc")
     task_dto = TaskCreateDTO(title="Test Task", description="Desc")
     user_id = 1
     
-    task = TaskService.create_task(db, task_dto, user_id)
+    task = await TaskService.create_task(db, task_dto, user_id)
     
     assert task.title == "Test Task"
     assert task.user_id == user_id
-    db.add.assert_called_once()
-    db.commit.assert_called_once()
-    db.refresh.assert_called_once()
+    # La tarea se obtiene del INSERT ... RETURNING, sin recargarla
+    assert "RETURNING tasks.id" in str(db.execute.call_args_list[1].args[0])
+    db.commit.assert_awaited_once()
+    db.refresh.assert_not_awaited()
 
-def test_get_task_by_id_success():
+async def test_get_task_by_id_success():
     """Prueba la obtención exitosa de una tarea propia."""
-    db = MagicMock()
+    db = mock_session()
     mock_task = Task(id=1, title="My Task", user_id=1, status=TaskStatus.PENDING)
-    db.query().filter().first.return_value = mock_task
+    db.scalars.return_value.first.return_value = mock_task
     
-    task = TaskService.get_task_by_id(db, 1, 1)
+    task = await TaskService.get_task_by_id(db, 1, 1)
     
     assert task.id == 1
     assert task.title == "My Task"
 
-def test_get_task_not_found():
+async def test_get_task_not_found():
     """Prueba que el servicio lance una excepción si la tarea no existe."""
-    db = MagicMock()
-    db.query().filter().first.return_value = None
+    db = mock_session()
+    db.scalars.return_value.first.return_value = None
     
     with pytest.raises(TaskNotFoundException):
-        TaskService.get_task_by_id(db, 999, 1)
+        await TaskService.get_task_by_id(db, 999, 1)
 
-def test_get_task_not_owner():
+async def test_get_task_not_owner():
     """Prueba que el servicio deniegue el acceso a tareas ajenas."""
-    db = MagicMock()
+    db = mock_session()
     mock_task = Task(id=1, title="Other's Task", user_id=2, status=TaskStatus.PENDING)
-    db.query().filter().first.return_value = mock_task
+    db.scalars.return_value.first.return_value = mock_task
     
     with pytest.raises(NotTaskOwnerException):
-        TaskService.get_task_by_id(db, 1, 1)
+        await TaskService.get_task_by_id(db, 1, 1)
 
-def test_delete_task_soft_delete():
+async def test_delete_task_soft_delete():
     """Prueba que la eliminación sea un borrado lógico (soft delete)."""
-    db = MagicMock()
-    mock_task = Task(id=1, title="To Delete", user_id=1, status=TaskStatus.PENDING)
-    # Mocking get_task_by_id internally by making the query return current task
-    db.query().filter().first.return_value = mock_task
+    db = mock_session()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    db.execute.return_value.first.return_value = returned_row(TaskStatus.DELETED, TaskStatus.PENDING)
     
-    TaskService.delete_task(db, 1, 1)
+    await TaskService.delete_task(db, 1, 1)
     
-    assert mock_task.status == TaskStatus.DELETED
-    db.commit.assert_called()
+    stmt = db.execute.call_args_list[1].args[0]
+    assert stmt.compile().params["status"] == TaskStatus.DELETED
+    assert "tasks.user_id" in str(stmt) and "RETURNING" in str(stmt)
+    db.commit.assert_awaited()
+
+@pytest.mark.parametrize("owner_id, exception", [(None, TaskNotFoundException), (2, NotTaskOwnerException)])
+async def test_update_task_distinguishes_missing_and_foreign_tasks(owner_id, exception):
+    """Prueba que un UPDATE sin filas afectadas se resuelva como 404 o 403 según el propietario."""
+    db = mock_session()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    db.execute.return_value.first.return_value = None
+    db.scalar.return_value = owner_id
+
+    with pytest.raises(exception):
+        await TaskService.update_task(db, 1, TaskUpdateDTO(title="Nuevo"), 1)
+
+    db.rollback.assert_awaited_once()
+    db.commit.assert_not_awaited()
+
+async def test_list_tasks_cursor_mode_returns_next_cursor():
+    """Prueba que el modo cursor omita la página y devuelva el cursor siguiente."""
+    db = mock_session()
+    created = datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc)
+    db.scalar.return_value = 5
+    db.execute.return_value.all.return_value = [task_row(i, f"T{i}", created) for i in (3, 2, 1)]
+
+    cursor = encode_cursor(["-created_at", created.isoformat(), 4])
+    result = await TaskService.list_tasks(db, 1, 2, 1, cursor=cursor)
+
+    assert result.page is None
+    assert [item.id for item in result.items] == [3, 2]
+    assert decode_cursor(result.next_cursor) == ["-created_at", created.isoformat(), 2]
+
+async def test_list_tasks_invalid_cursor():
+    """Prueba que un cursor manipulado sea rechazado."""
+    db = mock_session()
+
+    with pytest.raises(InvalidCursorException):
+        await TaskService.list_tasks(db, 1, 10, 1, cursor="no-es-un-cursor")
+
+async def test_list_tasks_window_count_single_round_trip():
+    """Prueba que la estrategia WINDOW lea el total de la propia consulta de la página."""
+    db = mock_session()
+    created = datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc)
+    db.execute.return_value.all.return_value = [task_row(1, "T1", created, 42)]
+
+    result = await TaskService.list_tasks(db, 1, 10, 1, count_strategy=CountStrategy.WINDOW)
+
+    assert result.total == 42
+    assert result.total_pages == 5
+    assert result.items[0].title == "T1"
+    db.scalar.assert_not_awaited()
+
+async def test_list_tasks_without_count():
+    """Prueba que la estrategia NONE omita el total y el número de páginas."""
+    db = mock_session()
+    db.execute.return_value.all.return_value = []
+
+    result = await TaskService.list_tasks(db, 1, 10, 1, count_strategy=CountStrategy.NONE)
+
+    assert result.total is None
+    assert result.total_pages is None
+    db.scalar.assert_not_awaited()
+
+async def test_create_and_delete_task_maintain_counter():
+    """Prueba que crear, actualizar y eliminar tareas actualice los contadores por estado."""
+    db = mock_session()
+    db.execute.return_value.one.return_value = returned_row(TaskStatus.PENDING)
+    with patch("app.services.task.TaskCountService.adjust") as mock_adjust:
+        await TaskService.create_task(db, TaskCreateDTO(title="Nueva"), 1)
+        mock_adjust.assert_called_with(db, 1, {TaskStatus.PENDING: 1})
+
+        db.get_bind.return_value.dialect.name = "postgresql"
+        db.execute.return_value.first.return_value = returned_row(TaskStatus.DONE, TaskStatus.PENDING)
+        await TaskService.update_task(db, 1, TaskUpdateDTO(status=TaskStatus.DONE), 1)
+        mock_adjust.assert_called_with(db, 1, {TaskStatus.PENDING: -1, TaskStatus.DONE: 1})
+
+        db.execute.return_value.first.return_value = returned_row(TaskStatus.DELETED, TaskStatus.DONE)
+        await TaskService.delete_task(db, 1, 1)
+        mock_adjust.assert_called_with(db, 1, {TaskStatus.DONE: -1, TaskStatus.DELETED: 1})
+
+async def test_export_tasks_streams_batches_as_ndjson():
+    """Prueba que la exportación emita un fragmento NDJSON por lote del cursor de servidor."""
+    db = mock_session()
+    created = datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc)
+    rows = [task_row(i, f"T{i}", created) for i in (1, 2, 3)]
+    db.stream.return_value.partitions.return_value.__aiter__.return_value = [rows[:2], rows[2:]]
+    db.stream.return_value.close = AsyncMock()
+
+    chunks = [chunk async for chunk in TaskService.export_tasks(db, 1)]
+
+    assert len(chunks) == 2
+    lines = b"".join(chunks).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+    assert json.loads(lines[0])["created_at"] == "2026-01-10T12:00:00Z"
+    stmt = db.stream.call_args.args[0]
+    assert stmt.get_execution_options()["yield_per"] > 0
+    db.stream.return_value.close.assert_awaited_once()
+
+async def test_bulk_create_tasks_reports_item_errors():
+    """Prueba que la creación masiva inserte los válidos en una sola sentencia y reporte los inválidos."""
+    db = mock_session()
+    created = datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc)
+    db.execute.return_value.all.return_value = [
+        Task(id=10, title="A", description=None, status=TaskStatus.PENDING, user_id=1, created_at=created),
+        Task(id=11, title="C", description="x", status=TaskStatus.DONE, user_id=1, created_at=created),
+    ]
+    items = [{"title": "A"}, {"description": "sin título"}, {"title": "C", "description": "x", "status": "done"}]
+
+    result = await TaskService.bulk_create_tasks(db, items, 1)
+
+    assert [task.id for task in result.created] == [10, 11]
+    assert [error.index for error in result.errors] == [1]
+    assert result.errors[0].errors[0].startswith("title")
+    inserted = db.execute.call_args_list[1].args[1]
+    assert [row["title"] for row in inserted] == ["A", "C"]
+    assert all(row["user_id"] == 1 for row in inserted)
+    db.commit.assert_awaited_once()
+
+async def test_bulk_create_tasks_enforces_limit():
+    """Prueba que se rechacen las peticiones que superan el máximo configurado."""
+    db = mock_session()
+    items = [{"title": "T"}] * (settings.TASK_BULK_MAX_ITEMS + 1)
+
+    with pytest.raises(BulkLimitExceededException):
+        await TaskService.bulk_create_tasks(db, items, 1)
+    db.execute.assert_not_awaited()
+
+async def test_bulk_delete_tasks_reports_missing_ids():
+    """Prueba que el borrado masivo use un único UPDATE acotado por propietario y reporte los ids ausentes."""
+    db = mock_session()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    db.execute.return_value.all.return_value = [(3, "pending"), (1, "done")]
+
+    with patch("app.services.task.TaskCountService.adjust") as mock_adjust:
+        result = await TaskService.bulk_delete_tasks(db, TaskBulkSelectionDTO(ids=[1, 2, 3, 4]), 1)
+
+    assert result.affected_ids == [1, 3]
+    assert result.missing_ids == [2, 4]
+    mock_adjust.assert_called_once_with(db, 1, {TaskStatus.DELETED: 2, TaskStatus.PENDING: -1, TaskStatus.DONE: -1})
+    stmt = db.execute.call_args_list[1].args[0]
+    assert "tasks.user_id" in str(stmt) and "RETURNING tasks.id, previous.status" in str(stmt)
+    db.commit.assert_awaited_once()
+
+def test_bulk_selection_requires_single_selector():
+    """Prueba que la selección masiva exija ids o filtro, pero no ambos."""
+    with pytest.raises(ValueError):
+        TaskBulkSelectionDTO()
+    with pytest.raises(ValueError):
+        TaskBulkSelectionDTO(ids=[1], filters=TaskFilterDTO())
+    with pytest.raises(ValueError):
+        TaskBulkUpdateDTO(ids=[1], changes=TaskUpdateDTO())
+
+async def test_update_task_rejects_stale_if_match():
+    """Prueba que una actualización con un ETag desactualizado se rechace sin modificar la tarea."""
+    db = mock_session()
+    task = Task(id=1, title="T", user_id=1, status=TaskStatus.PENDING,
+                created_at=datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc),
+                updated_at=datetime(2026, 1, 11, 8, 30, tzinfo=timezone.utc))
+    db.scalars.return_value.first.return_value = task
+    stale_etag = TaskService.task_etag(Task(id=1, created_at=task.created_at))
+
+    with pytest.raises(TaskPreconditionFailedException):
+        await TaskService.update_task(db, 1, TaskUpdateDTO(title="Nuevo"), 1, if_match=stale_etag)
+
+    assert task.title == "T"
+    db.commit.assert_not_awaited()
@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio.engine import create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.api.deps import get_current_user, get_token_claims
+from app.core.enums import PrincipalMode
+from app.core.principal_cache import TTLCache, _dispatch, principal_cache
+from app.core.revocation import BloomFilter, revocation_filter, jti_key, user_key
+from app.core.security import create_access_token
+from app.db.session import Base
+from app.models.user import User
+from app.schemas.auth import UserPrincipal
+from app.services.token_revocation import TokenRevocationService
+from app.exceptions.auth import RevokedTokenException
+
+# Se usa `sqlalchemy.ext.asyncio.engine.create_async_engine` porque conftest sustituye
+# `sqlalchemy.ext.asyncio.create_async_engine`.
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+def clear_auth_state():
+    revocation_filter.replace([])
+    principal_cache.clear()
+    yield
+    revocation_filter.replace([])
+    principal_cache.clear()
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add(User(id=1, email="juan@example.com", hashed_password="x", full_name="Juan"))
+    await session.commit()
+    yield session
+    await session.close()
+    await engine.dispose()
+
+async def claims_for(user_id: int) -> dict:
+    token = create_access_token({"sub": str(user_id), "email": "juan@example.com", "name": "Juan"})
+    return await get_token_claims(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    """Prueba que el filtro reconozca todas las claves añadidas y acote los falsos positivos."""
+    bloom = BloomFilter(capacity=2000, false_positive_rate=0.01)
+    for i in range(2000):
+        bloom.add(jti_key(f"revocado-{i}"))
+
+    assert all(jti_key(f"revocado-{i}") in bloom for i in range(2000))
+    false_positives = sum(jti_key(f"vigente-{i}") in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+
+async def test_claims_mode_builds_principal_without_database():
+    """Prueba que en modo claims el usuario se construya desde el token sin consultar la base de datos."""
+    db = AsyncMock(spec=AsyncSession)
+    claims = await claims_for(7)
+
+    with patch("app.api.deps.settings.AUTH_PRINCIPAL_MODE", PrincipalMode.CLAIMS):
+        principal = await get_current_user(db, claims)
+
+    assert principal == UserPrincipal(id=7, email="juan@example.com", full_name="Juan")
+    db.get.assert_not_awaited()
+    db.scalar.assert_not_awaited()
+
+async def test_revoked_tokens_are_rejected(db):
+    """Prueba que se rechacen el token revocado y, tras revocar al usuario, todos sus tokens."""
+    revoked, other = await claims_for(1), await claims_for(1)
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+    with patch("app.api.deps.settings.AUTH_PRINCIPAL_MODE", PrincipalMode.CLAIMS):
+        await TokenRevocationService.revoke_token(db, revoked["jti"], 1, expires_at)
+        with pytest.raises(RevokedTokenException):
+            await get_current_user(db, revoked)
+        assert (await get_current_user(db, other)).id == 1
+
+        await TokenRevocationService.revoke_user(db, 1)
+        with pytest.raises(RevokedTokenException):
+            await get_current_user(db, other)
+
+        await TokenRevocationService.restore_user(db, 1)
+        assert (await get_current_user(db, other)).id == 1
+        with pytest.raises(RevokedTokenException):
+            await get_current_user(db, revoked)
+
+async def test_load_keys_skips_expired_revocations(db):
+    """Prueba que el filtro se reconstruya solo con las revocaciones vigentes."""
+    now = datetime.now(timezone.utc)
+    await TokenRevocationService.revoke_token(db, "vencido", 1, now - timedelta(minutes=1))
+    await TokenRevocationService.revoke_token(db, "vigente", 1, now + timedelta(minutes=1))
+    await TokenRevocationService.revoke_user(db, 1)
+
+    assert sorted(await TokenRevocationService.load_keys(db)) == ["jti:vigente", "user:1"]
+
+async def test_rebuild_keeps_keys_added_while_loading():
+    """Prueba que una revocación local hecha mientras se lee la instantánea no se pierda al sustituir el filtro."""
+    loading, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_load():
+        loading.set()
+        await release.wait()
+        return [jti_key("anterior")]
+
+    rebuild = asyncio.create_task(revocation_filter.rebuild(slow_load))
+    await loading.wait()
+    revocation_filter.add(jti_key("logout-concurrente"))
+    release.set()
+    await rebuild
+
+    assert revocation_filter.might_be_revoked("logout-concurrente", 1)
+    assert revocation_filter.might_be_revoked("anterior", 1)
+    assert not revocation_filter._added_during_rebuild
+
+async def test_revocations_are_published_to_other_workers(db):
+    """Prueba que la revocación se publique en la transacción y que los demás workers la añadan al recibirla."""
+    backend = MagicMock()
+    with patch("app.services.token_revocation.invalidation_backend", backend):
+        await TokenRevocationService.revoke_token(db, "abc", 1, None)
+        await TokenRevocationService.revoke_user(db, 1)
+
+    published = [call.args[1] for call in backend.publish.call_args_list]
+    assert published == [[jti_key("abc")], [user_key(1)]]
+
+    # Otro worker: el payload recibido por el canal llega al filtro, no a la caché de principals
+    received = []
+    _dispatch(TTLCache(10, 60), [received.append], jti_key("abc"))
+    assert received == [jti_key("abc")]